@@ -0,0 +1,72 @@
+"""
+Microbenchmarks for configuration reads.
+
+    python -m benchmarks.bench_accessor [--number 200000]
+"""
+import argparse
+import timeit
+from dataclasses import dataclass
+
+from confidante.binding import bind
+from confidante.utils import ConfigAccessor
+
+class LegacyAccessor:
+    # The accessor before child caching, kept for comparison.
+    def __init__(self, data):
+        self._data = data
+
+    def __getattr__(self, item):
+        if item in self._data and isinstance(self._data[item], dict):
+            return LegacyAccessor(self._data[item])
+        elif item in self._data:
+            return self._data[item]
+        else:
+            raise AttributeError(item)
+
+@dataclass(frozen=True)
+class Pool:
+    size: int
+    timeout: int
+
+@dataclass(frozen=True)
+class Db:
+    pool: Pool
+
+@dataclass(frozen=True)
+class Settings:
+    db: Db
+
+# Attribute chains must beat the previous accessor by at least this much.
+MIN_SPEEDUP = 1.5
+
+DATA = {"db": {"pool": {"size": 5, "timeout": 30}}, "servers": [{"host": "a"}]}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=200_000)
+    args = parser.parse_args()
+
+    legacy = LegacyAccessor(DATA)
+    accessor = ConfigAccessor(DATA)
+    compiled = accessor.compile_path("db.pool.size")
+    settings = bind(Settings, DATA)
+    cases = {
+        "dict lookups": lambda: DATA["db"]["pool"]["size"],
+        "legacy accessor attributes": lambda: legacy.db.pool.size,
+        "accessor attributes": lambda: accessor.db.pool.size,
+        "accessor items": lambda: accessor["db"]["pool"]["size"],
+        "accessor.get()": lambda: accessor.get("db.pool.size"),
+        "compiled path": compiled,
+        "bound dataclass": lambda: settings.db.pool.size,
+    }
+    timings = {}
+    for name, case in cases.items():
+        assert case() == 5
+        timings[name] = min(timeit.repeat(case, number=args.number, repeat=5)) / args.number
+        print(f"{name:<28}{timings[name] * 1e9:>10.0f} ns")
+    speedup = timings["legacy accessor attributes"] / timings["accessor attributes"]
+    print(f"attribute access is {speedup:.1f}x the legacy accessor")
+    assert speedup > MIN_SPEEDUP, f"attribute access is not faster than the legacy accessor ({speedup:.2f}x)"
+
+if __name__ == "__main__":
+    main()
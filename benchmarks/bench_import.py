@@ -0,0 +1,51 @@
+"""
+Import time of the library and the CLI entry point, measured with
+``python -X importtime`` in fresh interpreters. Exits with status 1 when the
+median exceeds its threshold or a deferred dependency is imported eagerly.
+
+    python -m benchmarks.bench_import [--runs 9] [--max-ms 100] [--cli-max-ms 150]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+# Only imported once a file of that format is loaded or a secret decrypted.
+DEFERRED = ("cryptography", "yaml", "tomllib", "tomli", "tomli_w", "orjson", "ctypes", "http.client")
+
+def import_time(module):
+    # Cumulative microseconds reported for the module itself.
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1])
+    raise RuntimeError(f"no importtime line for {module}")
+
+def eager_imports(module):
+    code = f"import sys, {module}; print(' '.join(m for m in {DEFERRED!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=9)
+    parser.add_argument("--max-ms", type=float, default=100.0, help="threshold for import confidante")
+    parser.add_argument("--cli-max-ms", type=float, default=150.0, help="threshold for import confidante.cli")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'module':<18}{'median ms':>11}{'min ms':>9}{'limit ms':>10}  eager imports")
+    for module, limit in (("confidante", args.max_ms), ("confidante.cli", args.cli_max_ms)):
+        times = [import_time(module) / 1000 for _ in range(args.runs)]
+        median = statistics.median(times)
+        eager = eager_imports(module)
+        print(f"{module:<18}{median:>11.1f}{min(times):>9.1f}{limit:>10.0f}  {' '.join(eager) or '-'}")
+        failed = failed or median > limit or bool(eager)
+    if failed:
+        print("import time regression", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Parse representative configs in every format with each available backend.
+
+    python -m benchmarks.bench_parsers [--sections 2000] [--repeat 5]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.bench_save import make_tree
+from confidante.loaders import json_loader, yaml_loader
+from confidante.loaders.json_loader import JsonLoader
+from confidante.loaders.toml_loader import TomlLoader
+from confidante.loaders.yaml_loader import YamlLoader
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sections", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    data = make_tree(args.sections)
+    cases = [("json", name, JsonLoader(backend=name)) for name in json_loader.BACKENDS]
+    cases += [("json", f"{name} (lazy)", JsonLoader(lazy=True, backend=name)) for name in json_loader.BACKENDS]
+    cases += [("yaml", name, YamlLoader(backend=name)) for name in yaml_loader.BACKENDS]
+    cases += [("toml", TomlLoader.backend, TomlLoader())]
+
+    print(f"{'format':<8}{'backend':<18}{'load ms':>10}{'dump ms':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt, name, loader in cases:
+            path = os.path.join(tmp, f"config.{fmt}")
+            dump = best_of(lambda: loader.dump(data, path), args.repeat)
+            load = best_of(lambda: loader.load(path), args.repeat)
+            print(f"{fmt:<8}{name:<18}{load * 1000:>10.2f}{dump * 1000:>10.2f}")
+
+if __name__ == "__main__":
+    main()
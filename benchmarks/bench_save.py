@@ -0,0 +1,80 @@
+"""
+Compare save latency and peak memory across formats, atomic streaming
+writes against serializing the whole document to a string first.
+
+    python -m benchmarks.bench_save [--sections 2000] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+import tomli_w
+import yaml
+
+from confidante.loaders.json_loader import JsonLoader
+from confidante.loaders.toml_loader import TomlLoader
+from confidante.loaders.yaml_loader import YamlLoader
+
+def make_tree(sections):
+    return {
+        f"service_{i}": {
+            "host": f"host-{i}.example.com",
+            "port": 8000 + i,
+            "tags": ["a", "b", "c"],
+            "pool": {"size": i % 32, "timeout": 30.5, "enabled": bool(i % 2)},
+        }
+        for i in range(sections)
+    }
+
+def write_json(data, path):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(data, indent=2, ensure_ascii=False))
+
+def write_yaml(data, path):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(yaml.safe_dump(data, sort_keys=True))
+
+def write_toml(data, path):
+    with open(path, "wb") as f:
+        f.write(tomli_w.dumps(data).encode())
+
+def measure(fn, data, path, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(data, path)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn(data, path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sections", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    data = make_tree(args.sections)
+    cases = [
+        ("json", "string + write", write_json),
+        ("json", "atomic stream", JsonLoader().dump),
+        ("yaml", "string + write", write_yaml),
+        ("yaml", "atomic stream", YamlLoader().dump),
+        ("toml", "string + write", write_toml),
+        ("toml", "atomic stream", TomlLoader().dump),
+    ]
+    print(f"{'format':<8}{'writer':<18}{'best ms':>10}{'peak KiB':>12}{'size KiB':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt, name, fn in cases:
+            path = os.path.join(tmp, f"config.{fmt}")
+            best, peak = measure(fn, data, path, args.repeat)
+            size = os.path.getsize(path)
+            print(f"{fmt:<8}{name:<18}{best * 1000:>10.2f}{peak / 1024:>12.0f}{size / 1024:>12.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Validate large generated configs against a compiled schema (and against
+jsonschema, when installed, for comparison).
+
+    python -m benchmarks.bench_schema [--sections 20000] [--repeat 5]
+"""
+import argparse
+import time
+
+from benchmarks.bench_save import make_tree
+from confidante.schema import Schema
+
+SCHEMA = {
+    "type": "object",
+    "patternProperties": {
+        "^service_[0-9]+$": {
+            "type": "object",
+            "required": ["host", "port"],
+            "additionalProperties": False,
+            "properties": {
+                "host": {"type": "string", "pattern": r"^[a-z0-9.-]+$"},
+                "port": {"type": "integer", "minimum": 1, "maximum": 65535},
+                "tags": {"type": "array", "items": {"type": "string"}, "maxItems": 16},
+                "pool": {"$ref": "#/definitions/pool"},
+            },
+        },
+    },
+    "additionalProperties": False,
+    "definitions": {
+        "pool": {
+            "type": "object",
+            "properties": {
+                "size": {"type": "integer", "minimum": 0},
+                "timeout": {"type": "number", "exclusiveMinimum": 0},
+                "enabled": {"type": "boolean"},
+            },
+        },
+    },
+}
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sections", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    data = make_tree(args.sections)
+    values = args.sections * 10
+    compile_time = best_of(lambda: Schema(SCHEMA), args.repeat)
+    schema = Schema(SCHEMA)
+    assert schema.errors(data) == []
+    validate_time = best_of(lambda: schema.errors(data), args.repeat)
+    print(f"{args.sections} sections, ~{values} values")
+    print(f"{'validator':<24}{'compile ms':>12}{'validate ms':>13}{'values/s':>14}")
+    print(f"{'confidante.schema':<24}{compile_time * 1000:>12.3f}{validate_time * 1000:>13.1f}{values / validate_time:>14,.0f}")
+    try:
+        import jsonschema
+    except ImportError:
+        print(f"{'jsonschema':<24}{'not installed':>25}")
+        return
+    compile_time = best_of(lambda: jsonschema.Draft7Validator(SCHEMA), args.repeat)
+    validator = jsonschema.Draft7Validator(SCHEMA)
+    validate_time = best_of(lambda: list(validator.iter_errors(data)), args.repeat)
+    print(f"{'jsonschema':<24}{compile_time * 1000:>12.3f}{validate_time * 1000:>13.1f}{values / validate_time:>14,.0f}")
+
+if __name__ == "__main__":
+    main()
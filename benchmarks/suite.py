@@ -0,0 +1,235 @@
+"""
+Benchmark suite over synthetic configs, with JSON baselines and regression checks.
+
+    python -m benchmarks.suite run [--sizes small,medium] [--formats json,yaml,toml]
+                                   [--densities 0,0.1,0.5] [--output results.json]
+    python -m benchmarks.suite run --compare benchmarks/baselines/main.json
+    python -m benchmarks.suite compare baseline.json results.json [--threshold 0.15]
+
+Each case reports the median and best latency of ``--repeat`` runs, a
+throughput (MB/s for parsing and writing, values/s for the rest) and the
+peak memory traced during one further run. ``compare`` checks the best
+latency, which is the least affected by noise, and peak memory of the cases
+both files share, and exits with status 1 when one got worse than the
+thresholds allow.
+"""
+import argparse
+import datetime
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from benchmarks.synthetic import SIZES, leaf_paths, make_config
+from confidante.core import Confidante
+from confidante.crypto.asymmetric import AsymmetricCrypto
+from confidante.crypto.symmetric import SymmetricCrypto
+from confidante.environment import invalidate_env_index, merge_env
+from confidante.loaders import loader_for
+from confidante.tidy import tidy_data
+
+FORMATS = ("json", "yaml", "toml")
+# Fractions of secret leaves the unlock cases run at; the other cases use 0.1.
+DENSITIES = (0.0, 0.1, 0.5)
+DEFAULT_DENSITY = 0.1
+READS = 10_000
+ENV_OVERRIDES = 50
+
+def measure(setup, fn, repeat):
+    """Time ``fn(setup())`` ``repeat`` times, then trace one more run's peak memory."""
+    times = []
+    for _ in range(repeat):
+        arg = setup()
+        start = time.perf_counter()
+        fn(arg)
+        times.append(time.perf_counter() - start)
+    arg = setup()
+    tracemalloc.start()
+    fn(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), min(times), peak
+
+def write_key(directory):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    path = os.path.join(directory, "rsa.pem")
+    with open(path, "wb") as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                  serialization.NoEncryption()))
+    return path
+
+def cases(fmt, size, tmp, fernet_key, rsa_path, densities=DENSITIES):
+    """Yield (case, setup, fn, amount, unit) for one format and size."""
+    sections, depth = SIZES[size]
+    files = {}
+    secrets = {}
+    for density in sorted(set(densities) | {DEFAULT_DENSITY}):
+        for mode, backend in (("symmetric", SymmetricCrypto(fernet_key)), ("asymmetric", AsymmetricCrypto(rsa_path))):
+            files[mode, density] = os.path.join(tmp, f"{size}-{mode}-{density:g}.{fmt}")
+            config = make_config(sections, depth, secret_density=density, backend=backend)
+            loader_for(files[mode, density]).dump(config, files[mode, density])
+        secrets[density] = sum(1 for p in leaf_paths(config) if p.rpartition(".")[2].startswith("password"))
+    path = files["symmetric", DEFAULT_DENSITY]
+    mb = os.path.getsize(path) / 1e6
+    loaded = Confidante.load(path, snapshot=False)
+    data = loaded._data
+    leaves = leaf_paths(data)
+    # Evenly spread over the tree, repeating paths in small configs.
+    paths = [leaves[i * len(leaves) // READS] for i in range(READS)]
+    save_path = os.path.join(tmp, f"{size}-save.{fmt}")
+
+    def load(_):
+        Confidante.load(path, snapshot=False)
+    yield "load", lambda: None, load, mb, "MB/s"
+
+    def unlock_setup(mode, density):
+        return lambda: Confidante.load(files[mode, density], snapshot=False)
+    for density in densities:
+        # The density is part of the name, e.g. unlock_symmetric@0.5/json/small.
+        yield (f"unlock_symmetric@{density:g}", unlock_setup("symmetric", density),
+               lambda conf: conf.unlock(key=fernet_key, eager=True), secrets[density], "values/s")
+        yield (f"unlock_asymmetric@{density:g}", unlock_setup("asymmetric", density),
+               lambda conf: conf.unlock(private_key_path=rsa_path, eager=True), secrets[density], "values/s")
+
+    def reads(accessor):
+        get = accessor.get
+        for p in paths:
+            get(p)
+    yield "reads", lambda: loaded.config, reads, READS, "values/s"
+
+    yield "tidy_data", lambda: data, tidy_data, len(leaves), "values/s"
+
+    overrides = {f"CONFIDANTE__section_{i}__port": str(1000 + i) for i in range(min(ENV_OVERRIDES, sections))}
+
+    def env_setup():
+        os.environ.update(overrides)
+        invalidate_env_index()
+        return data
+    yield "merge_env", env_setup, merge_env, len(overrides), "values/s"
+
+    def save_setup():
+        for name in overrides:
+            os.environ.pop(name, None)
+        return Confidante(data, save_path, loaded._loader)
+    # A full dump; an incremental save of an unchanged tree writes nothing.
+    yield "save", save_setup, lambda conf: conf.save(incremental=False), mb, "MB/s"
+
+    edit_path = os.path.join(tmp, f"{size}-edit.{fmt}")
+    loaded._loader.dump(data, edit_path)
+    edited = next(p for p in leaves[len(leaves) // 2:] if p.endswith(".host")).split(".")
+    edits = itertools.count()
+
+    def edit_setup():
+        # One changed value per run, saved in place of the previous one.
+        conf = Confidante.load(edit_path, snapshot=False)
+        conf._set_nested_value(edited, f"edited-{next(edits)}.example.com")
+        return conf
+    yield "save_incremental", edit_setup, lambda conf: conf.save(), mb, "MB/s"
+
+def run(args):
+    results = {}
+    fernet_key = Fernet.generate_key().decode()
+    with tempfile.TemporaryDirectory() as tmp:
+        rsa_path = write_key(tmp)
+        for size in args.sizes:
+            for fmt in args.formats:
+                for case, setup, fn, amount, unit in cases(fmt, size, tmp, fernet_key, rsa_path, args.densities):
+                    median, best, peak = measure(setup, fn, args.repeat)
+                    name = f"{case}/{fmt}/{size}"
+                    results[name] = {
+                        "median_ms": median * 1000,
+                        "min_ms": best * 1000,
+                        "throughput": amount / median if median else 0.0,
+                        "unit": unit,
+                        "peak_kib": peak / 1024,
+                    }
+                    print(f"{name:<32}{median * 1000:>10.2f} ms{amount / median:>14,.1f} {unit:<9}"
+                          f"{peak / 1024:>10,.0f} KiB", flush=True)
+    report = {
+        "meta": {
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "densities": list(args.densities),
+        },
+        "results": results,
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            return compare(json.load(f), report, args.threshold, args.memory_threshold)
+    return 0
+
+def compare(baseline, current, threshold, memory_threshold):
+    """Print the change of every case against the baseline; return 1 on any regression."""
+    base, new = baseline["results"], current["results"]
+    shared = sorted(set(base) & set(new))
+    regressions = 0
+    print(f"{'case':<32}{'base ms':>10}{'new ms':>10}{'change':>9}{'memory':>9}")
+    for name in shared:
+        b, n = base[name], new[name]
+        time_change = n["min_ms"] / b["min_ms"] - 1 if b["min_ms"] else 0.0
+        memory_change = n["peak_kib"] / b["peak_kib"] - 1 if b["peak_kib"] else 0.0
+        flags = []
+        if time_change > threshold:
+            flags.append("SLOWER")
+        if memory_change > memory_threshold:
+            flags.append("MORE MEMORY")
+        regressions += bool(flags)
+        print(f"{name:<32}{b['min_ms']:>10.2f}{n['min_ms']:>10.2f}{time_change:>+9.0%}"
+              f"{memory_change:>+9.0%}  {' '.join(flags)}".rstrip())
+    unmatched = len(set(base) ^ set(new))
+    if unmatched:
+        print(f"{unmatched} case(s) appear in only one of the files and were skipped")
+    print(f"{regressions} regression(s) (thresholds: time {threshold:+.0%}, memory {memory_threshold:+.0%})")
+    return 1 if regressions else 0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run the suite")
+    run_parser.add_argument("--sizes", type=lambda s: s.split(","), default=["small", "medium"],
+                            help=f"comma-separated, from {', '.join(SIZES)}")
+    run_parser.add_argument("--formats", type=lambda s: s.split(","), default=list(FORMATS))
+    run_parser.add_argument("--densities", type=lambda s: [float(d) for d in s.split(",")], default=list(DENSITIES),
+                            help="comma-separated fractions of secret leaves for the unlock cases")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--output", help="write the results to this JSON file (e.g. a new baseline)")
+    run_parser.add_argument("--compare", help="baseline JSON to check the results against")
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("results")
+    for p in (run_parser, compare_parser):
+        p.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown of the best run")
+        p.add_argument("--memory-threshold", type=float, default=0.25, help="allowed growth of peak memory")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        unknown = [s for s in args.sizes if s not in SIZES] + [f for f in args.formats if f not in FORMATS]
+        if unknown:
+            parser.error(f"unknown size or format: {', '.join(unknown)}")
+        if any(not 0 <= d < 1 for d in args.densities):
+            parser.error("densities must be at least 0 and below 1")
+        sys.exit(run(args))
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.results, encoding="utf-8") as f:
+        results = json.load(f)
+    sys.exit(compare(baseline, results, args.threshold, args.memory_threshold))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Synthetic configuration trees of a given size, depth and secret density.
+
+    python -m benchmarks.synthetic config.yaml [--sections 1000] [--depth 3] [--secrets 0.1] [--key KEY]
+"""
+import argparse
+import random
+
+from confidante.crypto.base import METADATA_KEY
+from confidante.loaders import loader_for
+
+# name -> (sections, depth); each level below a section holds FANOUT mappings.
+SIZES = {
+    "small": (50, 2),
+    "medium": (1000, 3),
+    "large": (5000, 4),
+}
+FANOUT = 3
+
+def make_config(sections, depth=2, secret_density=0.1, backend=None, seed=0):
+    """
+    ``sections`` top-level mappings, each nested ``depth`` levels deep, with
+    string, number, bool and list leaves. About ``secret_density`` (below 1)
+    of the scalar leaves are secrets named ``password``, ``password_1``, ...,
+    encrypted with ``backend`` when one is given (its
+    metadata is stored in the tree, as ``encrypt_value`` would).
+    """
+    rng = random.Random(seed)
+    secrets = []
+
+    def node(prefix, level):
+        values = {
+            "host": f"{prefix}.example.com",
+            "port": rng.randrange(1024, 65536),
+            "ratio": round(rng.random(), 3),
+            "enabled": rng.random() < 0.5,
+            "tags": [f"tag-{rng.randrange(100)}" for _ in range(3)],
+        }
+        # Secrets are added as extra leaves, about secret_density of them all.
+        scalars = sum(not isinstance(v, list) for v in values.values())
+        expected = secret_density * scalars / (1 - secret_density)
+        for i in range(int(expected) + (rng.random() < expected % 1)):
+            key = f"password_{i}" if i else "password"
+            values[key] = f"secret-{prefix}-{i}"
+            secrets.append((values, key))
+        if level < depth:
+            for i in range(FANOUT):
+                values[f"child_{i}"] = node(f"{prefix}-{i}", level + 1)
+        return values
+
+    tree = {f"section_{i}": node(f"s{i}", 1) for i in range(sections)}
+    if backend is not None and secrets:
+        tokens = backend.encrypt_many([m[k] for m, k in secrets])
+        for (mapping, key), token in zip(secrets, tokens):
+            mapping[key] = token
+        tree[METADATA_KEY] = backend.dump_metadata()
+    return tree
+
+def leaf_paths(tree, prefix=""):
+    """Dotted paths of every scalar leaf, e.g. ``section_3.child_1.port``."""
+    paths = []
+    for key, value in tree.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            paths.extend(leaf_paths(value, path))
+        elif not isinstance(value, list):
+            paths.append(path)
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", help="output file; the suffix picks the format")
+    parser.add_argument("--sections", type=int, default=1000)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--secrets", type=float, default=0.1, help="fraction of secret leaves")
+    parser.add_argument("--key", help="Fernet key or passphrase to encrypt the secrets with")
+    args = parser.parse_args()
+    if not 0 <= args.secrets < 1:
+        parser.error("--secrets must be at least 0 and below 1")
+
+    backend = None
+    if args.key:
+        from confidante.crypto.symmetric import SymmetricCrypto
+        backend = SymmetricCrypto(args.key)
+    tree = make_config(args.sections, args.depth, args.secrets, backend)
+    loader_for(args.path).dump(tree, args.path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+from __future__ import annotations
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import IO, Callable, Iterator, Optional
+
+BUFFER_SIZE = 1 << 16
+
+def _read_umask() -> Optional[int]:
+    # Linux reports the umask without having to change it.
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+_umask = _read_umask()
+if _umask is None:
+    # Elsewhere reading it means changing it for the whole process for a
+    # moment; that is done once, at import.
+    _umask = os.umask(0)
+    os.umask(_umask)
+
+def _default_mode() -> int:
+    # mkstemp creates 0600 files; new config files get the usual 0666 & ~umask.
+    umask = _read_umask()
+    return 0o666 & ~(_umask if umask is None else umask)
+
+@contextmanager
+def atomic_write(path: str, mode: str = "w", encoding: str = "utf-8",
+        verify: Optional[Callable[[str], None]] = None) -> Iterator[IO]:
+    """
+    Write ``path`` through a buffered temporary file in the same directory,
+    fsync it and move it into place with ``os.replace``. Readers see either
+    the old or the new content; on error the original file is untouched.
+    ``verify`` is called with the temporary path before the replace and may
+    raise to abort it.
+    """
+    # A symlinked config is written through the link, as open() would.
+    path = os.path.realpath(path)
+    directory, name = os.path.split(path)
+    fd, tmp = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, mode, buffering=BUFFER_SIZE, encoding=None if "b" in mode else encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        if verify is not None:
+            verify(tmp)
+        try:
+            os.chmod(tmp, os.stat(path).st_mode & 0o7777)
+        except FileNotFoundError:
+            os.chmod(tmp, _default_mode())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+    _fsync_directory(directory)
+
+def backup_file(path: str, suffix: str = ".bak") -> Optional[str]:
+    """Keep the current content of ``path`` as ``path + suffix``; return its path."""
+    if not os.path.exists(path):
+        return None
+    backup = path + suffix
+    tmp = f"{backup}.{os.getpid()}.tmp"
+    try:
+        # A hard link costs nothing and stays valid once path is replaced.
+        os.link(path, tmp)
+    except OSError:
+        shutil.copy2(path, tmp)
+    os.replace(tmp, backup)
+    return backup
+
+def _fsync_directory(directory: str) -> None:
+    # Persist the rename itself; not possible on every platform.
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
@@ -0,0 +1,115 @@
+from __future__ import annotations
+import glob
+import os
+from functools import lru_cache, partial
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from .core import Confidante
+from .crypto.base import CryptoBackend
+from .loaders.registry import loader_for, registered_suffixes
+from .loaders.snapshot_loader import SUFFIX as SNAPSHOT_SUFFIX
+from .rekey import rekey_file
+from .schema import Schema
+
+# Backends by role ("current", or "old" and "new" for rekeying).
+Backends = dict[str, CryptoBackend]
+# A task processes one file with the worker's backends and returns a short
+# status message and the number of values it handled.
+BatchTask = Callable[[str, Backends], tuple[str, int]]
+# (path, message, values, error): error is None on success.
+BatchResult = tuple[str, Optional[str], int, Optional[str]]
+
+# The backends of a pool worker, built once by _init_worker and shared by
+# every file the worker processes.
+_backends: Backends = {}
+
+def make_backend(key: Optional[str] = None, private_key_path: Optional[str] = None,
+        passphrase: Optional[str] = None) -> Optional[CryptoBackend]:
+    from .crypto.asymmetric import AsymmetricCrypto
+    from .crypto.symmetric import SymmetricCrypto
+    if private_key_path is not None:
+        return AsymmetricCrypto(private_key_path=private_key_path, passphrase=passphrase)
+    if key is not None:
+        return SymmetricCrypto(key)
+    return None
+
+def expand_paths(patterns: Iterable[str]) -> list[str]:
+    """
+    Files named by ``patterns``: paths, globs (``**`` matches any depth) and
+    directories, which are searched recursively. Globs and directories only
+    yield files in a registered format; snapshots are skipped.
+    """
+    suffixes = set(registered_suffixes()) - {SNAPSHOT_SUFFIX}
+    found: dict[str, None] = {}
+    for pattern in patterns:
+        magic = glob.has_magic(pattern)
+        for match in sorted(glob.glob(pattern, recursive=True)) if magic else [pattern]:
+            if os.path.isdir(match):
+                for root, dirs, files in os.walk(match):
+                    dirs.sort()
+                    for name in sorted(files):
+                        if os.path.splitext(name)[1] in suffixes:
+                            found[os.path.join(root, name)] = None
+            elif not magic or os.path.splitext(match)[1] in suffixes:
+                found[match] = None
+    return list(found)
+
+def run_batch(task: BatchTask, paths: list[str], jobs: int = 1,
+        backend_options: Optional[dict[str, dict[str, Any]]] = None) -> Iterator[BatchResult]:
+    """
+    Run ``task`` over ``paths`` on ``jobs`` worker processes, yielding results
+    in order. Each worker builds its backends once from ``backend_options``
+    (role -> ``make_backend`` arguments) and reuses them for all its files.
+    """
+    backend_options = backend_options or {}
+    if jobs <= 1 or len(paths) < 2:
+        backends = _make_backends(backend_options)
+        for path in paths:
+            yield _execute(task, backends, path)
+        return
+    # Large chunks amortize the pickling round trips over many small files.
+    chunksize = max(1, len(paths) // (jobs * 4))
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(backend_options,)) as pool:
+        yield from pool.map(partial(_run_in_worker, task), paths, chunksize=chunksize)
+
+def _make_backends(backend_options: dict[str, dict[str, Any]]) -> Backends:
+    backends = {role: make_backend(**options) for role, options in backend_options.items()}
+    return {role: backend for role, backend in backends.items() if backend is not None}
+
+def _init_worker(backend_options: dict[str, dict[str, Any]]) -> None:
+    global _backends
+    _backends = _make_backends(backend_options)
+
+def _run_in_worker(task: BatchTask, path: str) -> BatchResult:
+    return _execute(task, _backends, path)
+
+def _execute(task: BatchTask, backends: Backends, path: str) -> BatchResult:
+    # One bad file must not abort a run over thousands.
+    try:
+        message, values = task(path, backends)
+        return path, message, values, None
+    except Exception as e:
+        return path, None, 0, str(e) or type(e).__name__
+
+def tidy_file(path: str, backends: Backends) -> tuple[str, int]:
+    Confidante.load(path, snapshot=False).tidy()
+    return "tidied", 0
+
+@lru_cache(maxsize=8)
+def load_schema(path: str) -> Schema:
+    # Compiled once per worker process and reused for every file.
+    return Schema(loader_for(path).load(path))
+
+def validate_file(path: str, backends: Backends, schema_path: Optional[str] = None) -> tuple[str, int]:
+    config = Confidante.load(path, snapshot=False, schema=load_schema(schema_path) if schema_path else None)
+    if "current" not in backends:
+        return "valid", 0
+    # Decrypting every value proves the key matches the whole file.
+    secrets = len(config.index.encrypted)
+    config.unlock(backend=backends["current"], eager=True)
+    return "valid", secrets
+
+def rekey_task(path: str, backends: Backends, workers: int = 1) -> tuple[str, int]:
+    count = rekey_file(path, backends["old"], backends["new"], workers=workers)
+    return (f"{count} values rekeyed" if count else "up to date"), count
@@ -0,0 +1,194 @@
+from __future__ import annotations
+import dataclasses
+import enum
+import types
+import typing
+from collections.abc import Mapping, Sequence
+from functools import lru_cache
+from typing import Any, Callable, Optional, TypeVar, Union
+
+from .environment import _FALSE, _TRUE
+from .exceptions import ConfidanteError
+from .lazy import LazyMapping
+from .utils import SECRET_PREFIXES
+
+T = TypeVar("T")
+Decrypt = Optional[Callable[[str], str]]
+# (raw subtree, bound value) from the previous binding of the same field
+Previous = Optional[tuple[Any, Any]]
+Converter = Callable[[Any, str, Decrypt, Previous], Any]
+
+def bind(cls: type[T], data: Any, decrypt: Decrypt = None, previous: Previous = None, path: str = "") -> T:
+    """
+    Map ``data`` onto the frozen dataclass ``cls``, coercing values to the
+    annotated field types; nested dataclasses, ``Optional``, ``list``/``tuple``
+    (bound as tuples), ``dict`` (bound as read-only mappings), enums and
+    ``Literal`` are supported. A field is read from the key of the same name,
+    or from ``field(metadata={"key": ...})``. With ``previous`` (the raw tree
+    and instance of an earlier binding), fields whose subtree is unchanged
+    reuse the earlier value, and the earlier instance itself is returned when
+    nothing changed.
+    """
+    if not isinstance(data, (dict, LazyMapping)):
+        raise ConfidanteError(f"{path or '<root>'}: expected a mapping for {cls.__name__}, got {type(data).__name__}")
+    old_data, old_instance = previous if previous is not None else (None, None)
+    if old_data is data:
+        return old_instance
+    values = {}
+    reused = old_instance is not None
+    for name, key, convert, required in _plan(cls):
+        child = f"{path}.{key}" if path else key
+        if key not in data:
+            if required:
+                raise ConfidanteError(f"{child}: required key is missing")
+            reused = reused and (old_data is None or key not in old_data)
+            continue
+        raw = data[key]
+        field_previous = None
+        if old_instance is not None and key in old_data:
+            field_previous = (old_data[key], getattr(old_instance, name))
+        values[name] = _apply(convert, raw, child, decrypt, field_previous)
+        reused = reused and field_previous is not None and values[name] is field_previous[1]
+    return old_instance if reused else cls(**values)
+
+@lru_cache(maxsize=None)
+def _plan(cls: type) -> tuple[tuple[str, str, Converter, bool], ...]:
+    # (attribute, key, converter, required) per field, computed once per class.
+    if not dataclasses.is_dataclass(cls) or not cls.__dataclass_params__.frozen:
+        raise ConfidanteError(f"{cls.__name__} must be a frozen dataclass.")
+    hints = typing.get_type_hints(cls)
+    plan = []
+    for f in dataclasses.fields(cls):
+        if not f.init:
+            continue
+        required = f.default is dataclasses.MISSING and f.default_factory is dataclasses.MISSING
+        plan.append((f.name, f.metadata.get("key", f.name), _converter(hints[f.name]), required))
+    return tuple(plan)
+
+def _apply(convert: Converter, raw: Any, path: str, decrypt: Decrypt, previous: Previous) -> Any:
+    if previous is not None and type(previous[0]) is type(raw) and previous[0] == raw:
+        return previous[1]
+    if decrypt is not None and isinstance(raw, str) and raw.startswith(SECRET_PREFIXES):
+        raw = decrypt(raw)
+    return convert(raw, path, decrypt, previous)
+
+def _fail(path: str, expected: str, raw: Any) -> ConfidanteError:
+    return ConfidanteError(f"{path or '<root>'}: expected {expected}, got {raw!r}")
+
+def _converter(tp: Any) -> Converter:
+    origin, args = typing.get_origin(tp), typing.get_args(tp)
+    if tp is Any or tp is object:
+        return lambda raw, path, decrypt, previous: _freeze(raw)
+    if origin is Union or origin is getattr(types, "UnionType", None):
+        return _union(args)
+    if origin is typing.Literal:
+        def literal(raw: Any, path: str, decrypt: Decrypt, previous: Previous) -> Any:
+            if raw not in args:
+                raise _fail(path, f"one of {list(args)!r}", raw)
+            return raw
+        return literal
+    if origin in (list, tuple, Sequence) or tp in (list, tuple):
+        return _sequence(tp, args)
+    if origin in (dict, Mapping) or tp is dict:
+        return _mapping(args[1] if args else Any)
+    if isinstance(tp, type) and dataclasses.is_dataclass(tp):
+        return lambda raw, path, decrypt, previous: bind(tp, raw, decrypt, previous, path)
+    if tp is bool:
+        return _bool
+    if tp in (int, float, str):
+        return _scalar(tp)
+    if isinstance(tp, type) and issubclass(tp, enum.Enum):
+        def to_enum(raw: Any, path: str, decrypt: Decrypt, previous: Previous) -> Any:
+            try:
+                return tp(raw)
+            except ValueError:
+                raise _fail(path, tp.__name__, raw) from None
+        return to_enum
+    if isinstance(tp, type):
+        # Any other class (Path, Decimal, ...) is built from the raw value.
+        def construct(raw: Any, path: str, decrypt: Decrypt, previous: Previous) -> Any:
+            if isinstance(raw, tp):
+                return raw
+            try:
+                return tp(raw)
+            except (TypeError, ValueError):
+                raise _fail(path, tp.__name__, raw) from None
+        return construct
+    raise ConfidanteError(f"Unsupported field type: {tp!r}")
+
+def _union(args: tuple[Any, ...]) -> Converter:
+    optional = type(None) in args
+    options = [_converter(a) for a in args if a is not type(None)]
+
+    def convert(raw: Any, path: str, decrypt: Decrypt, previous: Previous) -> Any:
+        if raw is None and optional:
+            return None
+        for option in options:
+            try:
+                return option(raw, path, decrypt, previous)
+            except ConfidanteError as e:
+                error = e
+        raise error
+    return convert
+
+def _sequence(tp: Any, args: tuple[Any, ...]) -> Converter:
+    if len(args) == 2 and args[1] is Ellipsis or len(args) == 1:
+        item = _converter(args[0])
+        fixed = None
+    elif args:
+        item, fixed = None, [_converter(a) for a in args]
+    else:
+        item, fixed = _converter(Any), None
+
+    def convert(raw: Any, path: str, decrypt: Decrypt, previous: Previous) -> Any:
+        if not isinstance(raw, (list, tuple)):
+            raise _fail(path, "a list", raw)
+        if fixed is not None:
+            if len(raw) != len(fixed):
+                raise _fail(path, f"{len(fixed)} items", raw)
+            return tuple(_apply(c, v, f"{path}[{i}]", decrypt, None) for i, (c, v) in enumerate(zip(fixed, raw)))
+        return tuple(_apply(item, v, f"{path}[{i}]", decrypt, None) for i, v in enumerate(raw))
+    return convert
+
+def _mapping(value_type: Any) -> Converter:
+    value = _converter(value_type)
+
+    def convert(raw: Any, path: str, decrypt: Decrypt, previous: Previous) -> Any:
+        if not isinstance(raw, (dict, LazyMapping)):
+            raise _fail(path, "a mapping", raw)
+        return types.MappingProxyType({
+            k: _apply(value, v, f"{path}.{k}" if path else str(k), decrypt, None) for k, v in raw.items()
+        })
+    return convert
+
+def _bool(raw: Any, path: str, decrypt: Decrypt, previous: Previous) -> bool:
+    if isinstance(raw, bool):
+        return raw
+    if isinstance(raw, str):
+        lowered = raw.strip().lower()
+        if lowered in _TRUE:
+            return True
+        if lowered in _FALSE:
+            return False
+    raise _fail(path, "bool", raw)
+
+def _scalar(tp: type) -> Converter:
+    def convert(raw: Any, path: str, decrypt: Decrypt, previous: Previous) -> Any:
+        if type(raw) is tp:
+            return raw
+        if isinstance(raw, bool) or not isinstance(raw, (int, float, str)):
+            raise _fail(path, tp.__name__, raw)
+        if tp is int and isinstance(raw, float) and not raw.is_integer():
+            raise _fail(path, "int", raw)
+        try:
+            return tp(raw)
+        except ValueError:
+            raise _fail(path, tp.__name__, raw) from None
+    return convert
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, (dict, LazyMapping)):
+        return types.MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
@@ -0,0 +1,82 @@
+from __future__ import annotations
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+from . import instrument
+from .lazy import LazyMapping
+from .loaders.base import ConfigLoader
+
+class ConfigCache:
+    """
+    LRU cache of parsed configuration trees keyed on the resolved file path
+    and the loader reading it (its class, backend and lazy flag), so a lazy
+    tree is never handed to an eager load or one backend's to another.
+
+    An entry is reused only while the file's (mtime_ns, size, inode) stamp is
+    unchanged. Cached trees are shared between callers and must not be
+    mutated; ``Confidante`` copies a shared tree before its first write.
+    """
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, tuple[tuple[int, int, int], dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str, loader: ConfigLoader) -> dict[str, Any]:
+        resolved = os.path.realpath(path)
+        stat = os.stat(resolved)
+        stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        key = (resolved, type(loader), getattr(loader, "backend", None), getattr(loader, "lazy", False))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                instrument.count("cache.hit")
+                return entry[1]
+            self.misses += 1
+        instrument.count("cache.miss")
+        data = loader.load(resolved)
+        with self._lock:
+            self._entries[key] = (stamp, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return data
+
+    def invalidate(self, path: str) -> None:
+        resolved = os.path.realpath(path)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == resolved]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+# Used by Confidante.load(path, cache=True)
+default_cache = ConfigCache()
+
+def copy_tree(data: Any, memo: Optional[dict[int, Any]] = None) -> Any:
+    # Configuration trees only hold dicts, lists and immutable scalars, so a
+    # structural copy is enough (and much cheaper than copy.deepcopy). Lazy
+    # mappings are decoded into plain dicts on the way. Containers shared by
+    # trees copied with the same memo stay shared in the copies.
+    if memo is not None and id(data) in memo:
+        return memo[id(data)]
+    if isinstance(data, (dict, LazyMapping)):
+        copied: Any = {k: copy_tree(v, memo) for k, v in data.items()}
+    elif isinstance(data, list):
+        copied = [copy_tree(i, memo) for i in data]
+    else:
+        return data
+    if memo is not None:
+        memo[id(data)] = copied
+    return copied
@@ -1,9 +1,16 @@
 import click
 import json
 import sys
+import time
 from pathlib import Path
+from contextlib import nullcontext
+from functools import partial
+from confidante.batch import expand_paths, load_schema, rekey_task, run_batch, tidy_file, validate_file
 from confidante.core import Confidante
 from confidante.exceptions import ConfidanteError
+from confidante.instrument import Profile
+from confidante.lazy import materialize
+from confidante.loaders.snapshot_loader import compile_snapshot, snapshot_path_for
 
 @click.group()
 def main():
@@ -14,28 +21,28 @@ def main():
 @click.argument('path', type=click.Path(exists=True))
 @click.option('--decrypted', is_flag=True, help="Attempt to decrypt values")
 @click.option('--key', help='Symmetric key for decryption')
-def load(path, decrypted, key):
+@click.option('--workers', type=int, default=1, show_default=True, help='Threads used to decrypt values')
+@click.option('--profile', is_flag=True, help='Print a timing breakdown to stderr')
+def load(path, decrypted, key, workers, profile):
     """Load and print configuration."""
     try:
-        config = Confidante.load(path)
-        if decrypted:
-            config.unlock(key if key else None, prompt=True)
-        click.echo(json.dumps(config.config._data, indent=2))
+        with Profile() if profile else nullcontext() as measured:
+            config = Confidante.load(path)
+            if decrypted:
+                config.unlock(key if key else None, prompt=True, eager=True, workers=workers)
+        click.echo(json.dumps(materialize(config.config._data), indent=2))
+        if measured is not None:
+            click.echo(measured.report(), err=True)
     except ConfidanteError as e:
         click.echo(str(e), err=True)
         sys.exit(1)
 
 @main.command()
-@click.argument('path', type=click.Path(exists=True))
-def tidy(path):
-    """Tidy up the configuration file."""
-    try:
-        config = Confidante.load(path)
-        config.tidy()
-        click.echo("Configuration file tidied successfully.")
-    except ConfidanteError as e:
-        click.echo(str(e), err=True)
-        sys.exit(1)
+@click.argument('paths', nargs=-1, required=True)
+@click.option('--jobs', type=int, default=1, show_default=True, help='Worker processes')
+def tidy(paths, jobs):
+    """Tidy up configuration files (paths, globs or directories)."""
+    _batch(tidy_file, paths, jobs, "tidied", done="Configuration file tidied successfully.")
 
 @main.command()
 @click.argument('path', type=click.Path(exists=True))
@@ -46,7 +53,7 @@ def unlock(path, key, private_key_path, prompt):
     """Unlock a configuration file."""
     try:
         config = Confidante.load(path)
-        config.unlock(key=key, private_key_path=private_key_path, prompt=prompt)
+        config.unlock(key=key, private_key_path=private_key_path, prompt=prompt, eager=True)
         click.echo("Configuration unlocked.")
     except ConfidanteError as e:
         click.echo(str(e), err=True)
@@ -71,14 +78,126 @@ def encrypt_key(path, key_path, value, key, private_key_path, passphrase):
         click.echo(str(e), err=True)
         sys.exit(1)
 
-@main.command()
+@main.command(name="encrypt-many")
 @click.argument('path', type=click.Path(exists=True))
-def validate(path):
-    """Validate configuration."""
+@click.option('--from', 'source', required=True, type=click.File('r', encoding='utf-8'),
+              help='File of KEY=value lines; KEY is a dotted path or SECTION__KEY')
+@click.option('--key', help='Symmetric key for encryption')
+@click.option('--private-key-path', help='Private key path (if asymmetric)')
+@click.option('--passphrase', help='Passphrase for private key')
+def encrypt_many(path, source, key, private_key_path, passphrase):
+    """Encrypt many values in one load and save."""
     try:
+        secrets = _read_secrets(source)
         config = Confidante.load(path)
-        # Placeholder for schema validation
-        click.echo("Configuration is valid.")
+        config.unlock(key=key, private_key_path=private_key_path, passphrase=passphrase, prompt=(key is None and private_key_path is None))
+        for key_path, value in secrets:
+            config.encrypt_value(key_path, value)
+        config.save()
+        click.echo(f"{len(secrets)} secrets encrypted and saved.")
+    except ConfidanteError as e:
+        click.echo(str(e), err=True)
+        sys.exit(1)
+
+@main.command()
+@click.argument('paths', nargs=-1, required=True)
+@click.option('--jobs', type=int, default=1, show_default=True, help='Worker processes')
+@click.option('--schema', 'schema_path', type=click.Path(exists=True, dir_okay=False),
+              help='JSON-Schema-style schema (JSON, YAML or TOML) the files must match')
+@click.option('--key', help='Symmetric key; also check that every secret decrypts')
+@click.option('--private-key-path', help='Private key path (if asymmetric)')
+@click.option('--passphrase', help='Passphrase for private key')
+def validate(paths, jobs, schema_path, key, private_key_path, passphrase):
+    """Validate configuration files (paths, globs or directories)."""
+    if schema_path is not None:
+        # Fail once on a broken schema rather than once per file.
+        try:
+            load_schema(schema_path)
+        except ConfidanteError as e:
+            click.echo(f"Invalid schema: {e}", err=True)
+            sys.exit(1)
+    backend_options = {"current": {"key": key, "private_key_path": private_key_path, "passphrase": passphrase}}
+    _batch(partial(validate_file, schema_path=schema_path), paths, jobs, "valid", backend_options,
+           done="Configuration is valid.")
+
+@main.command()
+@click.argument('paths', nargs=-1, required=True)
+@click.option('--jobs', type=int, default=1, show_default=True, help='Worker processes')
+@click.option('--workers', type=int, default=1, show_default=True, help='Threads per file')
+@click.option('--old-key', help='Current symmetric key')
+@click.option('--old-private-key-path', help='Current private key path (if asymmetric)')
+@click.option('--old-passphrase', help='Passphrase for the current private key')
+@click.option('--new-key', help='New symmetric key')
+@click.option('--new-private-key-path', help='New private key path (if asymmetric)')
+@click.option('--new-passphrase', help='Passphrase for the new private key')
+def rekey(paths, jobs, workers, old_key, old_private_key_path, old_passphrase, new_key, new_private_key_path, new_passphrase):
+    """Re-encrypt secrets under a new key (paths, globs or directories)."""
+    if (old_key is None and old_private_key_path is None) or (new_key is None and new_private_key_path is None):
+        click.echo("Both the current and the new key are required.", err=True)
+        sys.exit(1)
+    backend_options = {
+        "old": {"key": old_key, "private_key_path": old_private_key_path, "passphrase": old_passphrase},
+        "new": {"key": new_key, "private_key_path": new_private_key_path, "passphrase": new_passphrase},
+    }
+    _batch(partial(rekey_task, workers=workers), paths, jobs, "rekeyed", backend_options)
+
+@main.command(name="compile")
+@click.argument('path', type=click.Path(exists=True))
+@click.option('-o', '--output', type=click.Path(), help='Snapshot path (default: PATH with .cfc appended)')
+def compile_snapshot_cmd(path, output):
+    """Compile a configuration file into a binary snapshot."""
+    try:
+        config = Confidante.load(path, snapshot=False)
+        written = compile_snapshot(config._data, path, output or snapshot_path_for(path))
+        click.echo(f"Snapshot written to {written}.")
     except ConfidanteError as e:
         click.echo(str(e), err=True)
         sys.exit(1)
+
+def _batch(task, patterns, jobs, verb, backend_options=None, done=None):
+    paths = expand_paths(patterns)
+    if not paths:
+        click.echo("No configuration files matched.", err=True)
+        sys.exit(1)
+    start = time.perf_counter()
+    failed = values = 0
+    for path, message, count, error in run_batch(task, paths, jobs=jobs, backend_options=backend_options):
+        values += count
+        last = message
+        if error is not None:
+            failed += 1
+            for line in error.splitlines() if len(paths) > 1 else [error]:
+                click.echo(f"{path}: {line}" if len(paths) > 1 else line, err=True)
+        elif len(paths) > 1:
+            click.echo(f"{path}: {message}")
+    elapsed = time.perf_counter() - start
+    if len(paths) == 1:
+        if failed:
+            sys.exit(1)
+        click.echo(done or f"{last}.")
+        return
+    summary = f"{len(paths) - failed} of {len(paths)} files {verb} in {elapsed:.2f}s"
+    if values:
+        summary += f" ({values} values, {values / elapsed:.0f} values/s, {len(paths) / elapsed:.1f} files/s)"
+    click.echo(summary + ".")
+    if failed:
+        sys.exit(1)
+
+def _read_secrets(lines):
+    # KEY=value per line; blank lines, comments and "export " are ignored and
+    # matching surrounding quotes are stripped from the value.
+    secrets = []
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("export "):
+            line = line[len("export "):].lstrip()
+        name, sep, value = line.partition("=")
+        name, value = name.strip(), value.strip()
+        if not sep or not name:
+            raise ConfidanteError(f"Line {number}: expected KEY=value.")
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+            value = value[1:-1]
+        secrets.append((name.split("__") if "__" in name else name.split("."), value))
+    return secrets
@@ -1,99 +1,521 @@
 from __future__ import annotations
-from typing import Any, Optional, Union
+from typing import TYPE_CHECKING, Any, Callable, Optional, Sequence, TypeVar, Union
 import os
 import getpass
+import threading
+from functools import partial
 from pathlib import Path
 
 from .loaders.base import ConfigLoader
-from .loaders.json_loader import JsonLoader
-from .loaders.toml_loader import TomlLoader
-from .loaders.yaml_loader import YamlLoader
-from .crypto.base import CryptoBackend
-from .crypto.symmetric import SymmetricCrypto
-from .crypto.asymmetric import AsymmetricCrypto
-from .environment import merge_env
-from .utils import ConfigAccessor
+from .loaders.registry import loader_for
+from .loaders.snapshot_loader import SnapshotLoader, find_snapshot
+from .crypto.base import CryptoBackend, METADATA_KEY
+from .environment import merge_env, resolve_overrides
+from .index import KeyIndex
+from .layers import EnvLayer, Layer, LayeredCrypto, MergeCache, default_merge_cache
+from .utils import _MISSING, ConfigAccessor, collect_encrypted, replace_encrypted
 from .exceptions import ConfidanteError
 from .tidy import tidy_data
+from .cache import ConfigCache, copy_tree, default_cache
+from .watch import ChangeCallback, ConfigWatcher, diff_trees
+from .lazy import LazyMapping
+from .atomic import backup_file
+from .edits import Stamp, file_stamp, patch_file
+from .rekey import rekey_file
+from .schema import Schema, compile_schema
+from .binding import bind
+from . import instrument
+from .providers.base import REF_PREFIX, SecretProvider
+from .providers.resolver import SecretCache, default_secret_cache, resolve_references
+
+if TYPE_CHECKING:
+    from .crypto.symmetric import KdfParams
+
+# Parsers (yaml, tomllib, orjson) and cryptography are imported on first use:
+# the loader registry imports a format's module when a file of that format is
+# loaded, and unlock() imports the backend it needs.
+
+T = TypeVar("T")
 
 class Confidante:
+    """
+    Reads never lock: the tree behind ``config`` is never modified once
+    published. Writers (unlock, reload, encrypt_value, apply_env, tidy)
+    serialize on a lock, build a new tree that shares every untouched
+    container with the old one, and publish it in a single assignment.
+    """
     def __init__(self, data: dict[str, Any], path: str, loader: ConfigLoader, crypto_backend: Optional[CryptoBackend]=None):
         self._data = data
         self._path = path
         self._loader = loader
         self._crypto_backend = crypto_backend
         self._unlocked = False
+        self._decrypted: Optional[dict[str, str]] = None
+        self._lazy = False
+        # True while _data may hold nodes shared through a ConfigCache or
+        # decoded lazily from a snapshot or memory-mapped JSON
+        self._shared = False
+        self._lock = threading.RLock()
+        self._merge_env_vars = False
+        self._watcher: Optional[ConfigWatcher] = None
+        self._index: Optional[KeyIndex] = None
+        self._layers: Optional[tuple[list[Layer], MergeCache]] = None
+        self._schema: Optional[Schema] = None
+        # Bound views by class, with the raw tree each was bound from.
+        self._bindings: dict[type, tuple[Any, Any]] = {}
+        # Resolved REF:: values, once resolve_references() has been called
+        self._references: Optional[dict[str, Any]] = None
+        self._reference_options: dict[str, Any] = {}
+        # The tree last read from or written to the file, with the file's
+        # stamp then; saves diff against it (see patch_file).
+        self._source: Optional[tuple[Stamp, Any]] = None
         self.config = ConfigAccessor(self._data)
 
     @classmethod
-    def load(cls, path: str, merge_env_vars: bool=False) -> Confidante:
-        path_obj = Path(path)
-        if not path_obj.exists():
+    def load(cls, path: str, merge_env_vars: bool=False,
+            cache: Union[bool, ConfigCache]=False, snapshot: bool=True,
+            lazy: bool=False, schema: Union[Schema, dict[str, Any], None]=None) -> Confidante:
+        """
+        Load ``path``. With ``schema`` the (env-merged) tree is validated, and
+        again on every reload; errors raise ``SchemaValidationError``.
+        """
+        if not Path(path).exists():
             raise ConfidanteError(f"Config file not found: {path}")
-        # Determine loader
-        if path_obj.suffix == ".json":
-            loader = JsonLoader()
-        elif path_obj.suffix == ".toml":
-            loader = TomlLoader()
-        elif path_obj.suffix in [".yml", ".yaml"]:
-            loader = YamlLoader()
-        else:
-            raise ConfidanteError("Unsupported file format.")
+        started = instrument.start()
+        loader = loader_for(path, lazy=lazy)
 
-        data = loader.load(path)
+        # A fresh compiled snapshot next to the source skips the text parser.
+        read_loader, read_path = loader, path
+        if snapshot:
+            snapshot_path = find_snapshot(path)
+            if snapshot_path is not None:
+                read_loader, read_path = SnapshotLoader(), snapshot_path
 
+        config_cache = default_cache if cache is True else (cache if isinstance(cache, ConfigCache) else None)
+        stamp = file_stamp(path)
+        phase = instrument.start()
+        misses = config_cache.misses if config_cache is not None else 0
+        try:
+            data = config_cache.get(read_path, read_loader) if config_cache is not None else read_loader.load(read_path)
+        except ConfidanteError:
+            if read_loader is loader:
+                raise
+            # A corrupt snapshot is treated like a stale one.
+            read_loader, read_path = loader, path
+            data = config_cache.get(read_path, read_loader) if config_cache is not None else read_loader.load(read_path)
+        if phase is not None:
+            parsed = config_cache is None or config_cache.misses != misses
+            instrument.stop("load.parse", phase, path=read_path, backend=getattr(read_loader, "backend", None), cached=not parsed)
+            if parsed:
+                instrument.count("load.bytes", os.path.getsize(read_path), path=read_path)
+        # merge_env shares untouched subtrees, so the result stays read-only.
+        shared = config_cache is not None or isinstance(data, LazyMapping)
+        source = data
         if merge_env_vars:
+            phase = instrument.start()
             data = merge_env(data)
+            instrument.stop("load.merge_env", phase)
+        compiled = compile_schema(schema) if schema is not None else None
+        if compiled is not None:
+            phase = instrument.start()
+            compiled.validate(data)
+            instrument.stop("load.validate", phase)
+
+        instance = cls(data=data, path=path, loader=loader, crypto_backend=None)
+        instance._shared = shared
+        instance._source = (stamp, source) if stamp is not None else None
+        instance._merge_env_vars = merge_env_vars
+        instance._schema = compiled
+        instrument.stop("load", started, path=path)
+        return instance
 
-        return cls(data=data, path=path, loader=loader, crypto_backend=None)
+    @classmethod
+    def load_layers(cls, layers: Sequence[Layer], merge_cache: Optional[MergeCache] = None,
+            schema: Union[Schema, dict[str, Any], None] = None) -> Confidante:
+        """
+        Deep-merge ``layers`` (file paths, mappings or ``EnvLayer``s) in order,
+        later layers winning. Files are parsed through the process-wide
+        ``ConfigCache`` and merged stacks are memoized per layer fingerprint.
+        Secrets are decrypted with the metadata of their own file. The merged
+        tree is read-only: ``save()`` and ``tidy()`` raise, since they would
+        flatten the stack (and env values) into one file.
+        """
+        if not layers:
+            raise ConfidanteError("No configuration layers given.")
+        files = [os.fspath(layer) for layer in layers if not isinstance(layer, (dict, EnvLayer))]
+        for path in files:
+            if not Path(path).exists():
+                raise ConfidanteError(f"Config file not found: {path}")
+        merge_cache = merge_cache or default_merge_cache
+        data = merge_cache.resolve(layers, loader_for)
+        compiled = compile_schema(schema) if schema is not None else None
+        if compiled is not None:
+            compiled.validate(data)
+        path = files[-1] if files else ""
+        instance = cls(data=data, path=path, loader=loader_for(path if files else "layers.json"))
+        instance._shared = True
+        instance._layers = (list(layers), merge_cache)
+        instance._schema = compiled
+        return instance
+
+    @classmethod
+    def watch(cls, path: str, on_change: Optional[ChangeCallback] = None,
+            merge_env_vars: bool = False, **options: Any) -> Confidante:
+        """
+        Load ``path`` and keep it up to date as the file changes. ``options``
+        are passed to ``ConfigWatcher`` (debounce, poll_interval, ...).
+        """
+        instance = cls.load(path, merge_env_vars=merge_env_vars)
+        instance._watcher = ConfigWatcher(instance, on_change=on_change, **options).start()
+        return instance
+
+    def stop_watching(self) -> None:
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+    @classmethod
+    async def aload(cls, path: str, *args: Any, executor: Any = None, **kwargs: Any) -> Confidante:
+        """``load`` run on ``executor`` (the loop's default one) so parsing never blocks the event loop."""
+        import asyncio
+        return await asyncio.get_running_loop().run_in_executor(executor, partial(cls.load, path, *args, **kwargs))
+
+    async def aunlock(self, *args: Any, executor: Any = None, **kwargs: Any) -> None:
+        """``unlock`` run on ``executor``, e.g. for an eager unlock of many secrets."""
+        import asyncio
+        await asyncio.get_running_loop().run_in_executor(executor, partial(self.unlock, *args, **kwargs))
+
+    async def areload(self, executor: Any = None) -> list[str]:
+        import asyncio
+        return await asyncio.get_running_loop().run_in_executor(executor, self.reload)
+
+    def reload(self) -> list[str]:
+        """Re-read the file and swap in the new tree; return the changed dotted paths."""
+        with self._lock:
+            started = instrument.start()
+            changed = self._reload()
+            instrument.stop("reload", started, path=self._path, changed=len(changed))
+            return changed
+
+    def _reload(self) -> list[str]:
+        if self._layers is not None:
+            layers, merge_cache = self._layers
+            data = merge_cache.resolve(layers, loader_for)
+            if data is self._data:
+                return []
+        else:
+            stamp = file_stamp(self._path)
+            data = self._loader.load(self._path)
+            self._source = (stamp, data) if stamp is not None else None
+        shared = self._layers is not None or isinstance(data, LazyMapping)
+        if self._merge_env_vars:
+            phase = instrument.start()
+            data = merge_env(data)
+            instrument.stop("reload.merge_env", phase)
+        if self._schema is not None:
+            # An invalid file never replaces the current tree.
+            self._schema.validate(data)
+        if self._crypto_backend is not None:
+            self._crypto_backend.load_metadata(data.get(METADATA_KEY, {}))
+            if self._layers is not None:
+                self._crypto_backend.load_layers(merge_cache.file_trees(layers, loader_for))
+            if self._unlocked and not self._lazy:
+                data = self._decrypt_data(data, self._crypto_backend)
+        if self._references is not None:
+            self._references = self._resolve_all(data)
+        changed = diff_trees(self._data, data)
+        if changed:
+            self._shared = shared
+            self._replace_data(data)
+            self._rebind()
+        return changed
 
     def unlock(self, key: Optional[str] = None, passphrase: Optional[str] = None,
-            private_key_path: Optional[str] = None, prompt: bool = False) -> None:
+            private_key_path: Optional[str] = None, prompt: bool = False,
+            eager: bool = False, cache: bool = True, workers: int = 1,
+            kdf: Optional[KdfParams] = None, backend: Optional[CryptoBackend] = None) -> None:
+        with self._lock:
+            started = instrument.start()
+            self._unlock(key, passphrase, private_key_path, prompt, eager, cache, workers, kdf, backend)
+            instrument.stop("unlock", started, path=self._path, eager=eager)
+
+    def _unlock(self, key: Optional[str], passphrase: Optional[str], private_key_path: Optional[str],
+            prompt: bool, eager: bool, cache: bool, workers: int, kdf: Optional[KdfParams],
+            backend: Optional[CryptoBackend]) -> None:
         if self._unlocked:
             return
 
-        # Determine crypto backend if key or private_key_path is provided
-        if private_key_path is not None:
+        # Determine crypto backend if key or private_key_path is provided.
+        # A ready backend can be shared across files; its per-file state is
+        # reset from this file's metadata below.
+        phase = instrument.start()
+        if backend is not None:
+            pass
+        elif private_key_path is not None:
             # Asymmetric mode
+            from .crypto.asymmetric import AsymmetricCrypto
             backend = AsymmetricCrypto(private_key_path=private_key_path, passphrase=passphrase)
         else:
             # Symmetric mode
             if key is None:
                 key = os.environ.get("CONFIDANTE_KEY")
-            elif key is None and prompt:
+            if key is None and prompt:
                 key = getpass.getpass("Enter decryption key: ")
-            elif key is None:
+            if key is None:
                 raise ConfidanteError("No key provided for symmetric decryption.")
-            backend = SymmetricCrypto(key)
+            from .crypto.symmetric import SymmetricCrypto
+            backend = SymmetricCrypto(key, kdf=kdf)
+        instrument.stop("unlock.backend", phase, backend=type(backend).__name__)
 
         # Even if there are no encrypted values, we still set the backend.
+        # Key derivation and envelope key unwrapping happen here.
+        phase = instrument.start()
+        backend.load_metadata(self._data.get(METADATA_KEY, {}))
+        if self._layers is not None:
+            # Each file layer's secrets need that file's own metadata.
+            layers, merge_cache = self._layers
+            backend = LayeredCrypto(backend, merge_cache.file_trees(layers, loader_for))
+        instrument.stop("unlock.metadata", phase)
         self._crypto_backend = backend
 
-        # If there are encrypted values, decrypt them now.
-        if self._has_encrypted_values(self._data):
-            self._decrypt_data(self._data, backend)
+        # Views bound before unlocking hold the encrypted values.
+        self._bindings = {}
+        if eager:
+            # Decrypt every encrypted value now, into a new tree.
+            self._replace_data(self._decrypt_data(self._data, backend, workers=workers))
+        else:
+            # Lazy mode: the tree keeps its ENC:: values and the accessor
+            # decrypts each one the first time it is read.
+            self._decrypted = {} if cache else None
+            self._lazy = True
+            self._refresh_accessor()
 
         self._unlocked = True
 
-    def save(self) -> None:
-        self._loader.dump(self._data, self._path)
+    def resolve_references(self, providers: Optional[dict[str, SecretProvider]] = None,
+            cache: Union[bool, SecretCache] = True, workers: int = 4) -> None:
+        """
+        Resolve every ``REF::scheme://location#field`` value through its
+        secret provider in one batch (see ``resolve_references``), and again
+        on every reload. The file keeps its references: resolved values are
+        only returned by reads, so ``save()`` never writes them out.
+        ``providers`` overrides the registered provider per scheme.
+        """
+        with self._lock:
+            started = instrument.start()
+            secret_cache = default_secret_cache if cache is True else (cache if isinstance(cache, SecretCache) else None)
+            self._reference_options = {"providers": providers, "cache": secret_cache, "workers": workers}
+            self._references = self._resolve_all(self._data)
+            self._bindings = {}
+            self._refresh_accessor()
+            instrument.stop("references", started, values=len(self._references))
+
+    def _resolve_all(self, data: Any) -> dict[str, Any]:
+        leaves: list[tuple[Any, Any, str]] = []
+        collect_encrypted(data, leaves, prefix=REF_PREFIX)
+        return resolve_references((REF_PREFIX + ref for _, _, ref in leaves), **self._reference_options)
 
-    def tidy(self) -> None:
-        cleaned = tidy_data(self._data)
-        self._data = cleaned
-        self.save()
+    @property
+    def parser_backend(self) -> Optional[str]:
+        """Name of the parser the loader uses for this file, e.g. ``"orjson"`` or ``"libyaml"``."""
+        return getattr(self._loader, "backend", None)
+
+    def bind(self, cls: type[T]) -> T:
+        """
+        Immutable view of the configuration as the frozen dataclass ``cls``
+        (see ``binding.bind``), safe to share across threads. The view is
+        cached and rebuilt on reload, reusing every section that did not
+        change, so handlers can keep calling ``bind`` or hold on to a view.
+        """
+        entry = self._bindings.get(cls)
+        if entry is not None and entry[0] is self._data:
+            return entry[1]
+        instance = bind(cls, self._data, self._reader(), entry)
+        self._bindings[cls] = (self._data, instance)
+        return instance
+
+    def get(self, path: str, default: Any = None) -> Any:
+        return self.config.get(path, default)
+
+    @property
+    def index(self) -> KeyIndex:
+        """
+        Flattened dotted-path index of the raw tree, built on first use and
+        kept up to date by ``_set_nested_value`` (and so by ``encrypt_value``
+        and ``apply_env``). Like the tree, a returned index is never changed
+        afterwards; writes publish an updated copy.
+        """
+        index = self._index
+        if index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = KeyIndex(self._data)
+                index = self._index
+        return index
+
+    def apply_env(self, prefix: str = "CONFIDANTE") -> None:
+        """Apply ``PREFIX__SECTION__KEY`` environment overrides to this configuration."""
+        with self._lock:
+            self._set_nested_values(resolve_overrides(self._data, prefix))
+
+    def compile_path(self, path: str, default: Any = _MISSING) -> Callable[[], Any]:
+        """
+        Compiled dotted-path getter that follows reloads: it is recompiled
+        against the current accessor whenever the tree has been swapped.
+        """
+        compiled: list[Any] = [None, None]
+
+        def getter() -> Any:
+            accessor = self.config
+            if compiled[0] is not accessor:
+                compiled[0], compiled[1] = accessor, accessor.compile_path(path, default)
+            return compiled[1]()
+        return getter
+
+    def _reader(self) -> Optional[Callable[[str], Any]]:
+        # What the accessor and bound views call for ENC:: and REF:: values.
+        if self._references is not None:
+            return self._read_secret
+        return self._decrypt_value if self._lazy else None
+
+    def _read_secret(self, value: str) -> Any:
+        if value.startswith(REF_PREFIX):
+            references = self._references
+            if value not in references:
+                # Written after the batch, e.g. by apply_env or _set_nested_value.
+                references[value] = resolve_references([value], **self._reference_options)[value]
+            return references[value]
+        return self._decrypt_value(value) if self._lazy else value
+
+    def _decrypt_value(self, value: str) -> str:
+        cache = self._decrypted
+        if cache is not None and value in cache:
+            return cache[value]
+        plaintext = self._crypto_backend.decrypt(value[len("ENC::"):])
+        if cache is not None:
+            cache[value] = plaintext
+        if instrument.hooks:
+            instrument.count("decrypt.values", lazy=True)
+        return plaintext
+
+    def save(self, backup: bool = False, incremental: bool = True) -> None:
+        """
+        Write the configuration back atomically. Only the values that changed
+        are rewritten in the file, keeping its comments, key order and layout
+        (see ``patch_file``); otherwise, or with ``incremental=False``, the
+        whole tree is dumped. With ``backup=True`` the previous file is kept
+        as ``<path>.bak``. Layered configurations cannot be saved.
+        """
+        if self._layers is not None:
+            raise ConfidanteError("Layered configurations cannot be saved; edit and save each file.")
+        with self._lock:
+            started = instrument.start()
+            if backup:
+                backup_file(self._path)
+            if self._shared:
+                # Decode everything first: a lazy tree may be backed by a memory
+                # map of the very file being rewritten.
+                self._own()
+            patched = incremental and patch_file(self._path, self._loader, self._data, self._source)
+            if not patched:
+                self._loader.dump(self._data, self._path)
+            stamp = file_stamp(self._path)
+            self._source = (stamp, self._data) if stamp is not None else None
+            if started is not None:
+                instrument.stop("save", started, path=self._path, patched=patched)
+                instrument.count("save.bytes", os.path.getsize(self._path), path=self._path)
+
+    def rekey(self, old_backend: CryptoBackend, new_backend: CryptoBackend, workers: int = 1) -> int:
+        """
+        Re-encrypt the file's secrets under ``new_backend`` in place (see
+        ``rekey_file``) and reload it. Returns the number of values
+        re-encrypted, 0 if the file already uses ``new_backend``.
+        """
+        if self._layers is not None:
+            raise ConfidanteError("Layered configurations cannot be rekeyed; rekey each file.")
+        with self._lock:
+            count = rekey_file(self._path, old_backend, new_backend, workers=workers)
+            if self._crypto_backend is not None:
+                self._crypto_backend = new_backend
+            if count:
+                self._reload()
+            return count
+
+    def tidy(self, incremental: bool = True) -> None:
+        """
+        Sort keys recursively and save. Members are moved in place, comments
+        included, where the format allows it (JSON, block-style YAML); with
+        ``incremental=False`` or otherwise the file is dumped in full.
+        """
+        if self._layers is not None:
+            raise ConfidanteError("Layered configurations cannot be tidied; tidy each file.")
+        with self._lock:
+            started = instrument.start()
+            self._shared = False
+            self._replace_data(tidy_data(self._data))
+            self.save(incremental=incremental)
+            instrument.stop("tidy", started, path=self._path)
 
     def encrypt_value(self, key_path: list[str], value: str) -> None:
-        if not self._crypto_backend:
-            raise ConfidanteError("Configuration not unlocked or no crypto backend available.")
-        encrypted = self._crypto_backend.encrypt(value)
-        self._set_nested_value(key_path, encrypted)
+        with self._lock:
+            if not self._crypto_backend:
+                raise ConfidanteError("Configuration not unlocked or no crypto backend available.")
+            encrypted = self._crypto_backend.encrypt(value)
+            # The value and its metadata are published together.
+            updates = [(key_path, encrypted)]
+            updates += [([METADATA_KEY, k], v) for k, v in self._crypto_backend.dump_metadata().items()]
+            self._set_nested_values(updates)
+
+    def _rebind(self) -> None:
+        for cls in list(self._bindings):
+            self.bind(cls)
+
+    def _own(self) -> None:
+        # Detach from cached or memory-mapped nodes, e.g. before saving. The
+        # source tree is copied along, so the two still share what they did.
+        if self._shared:
+            self._shared = False
+            memo: dict[int, Any] = {}
+            if self._source is not None:
+                self._source = (self._source[0], copy_tree(self._source[1], memo))
+            self._replace_data(copy_tree(self._data, memo), self._index)
+
+    def _replace_data(self, data: dict[str, Any], index: Optional[KeyIndex] = None) -> None:
+        # The new tree is complete before it is published and never modified
+        # afterwards; readers go through self.config, replaced in one assignment.
+        self._data = data
+        self._index = index
+        self._refresh_accessor()
+
+    def _refresh_accessor(self) -> None:
+        self.config = ConfigAccessor(self._data, decrypt=self._reader())
 
     def _set_nested_value(self, keys: list[str], value: Any) -> None:
-        d = self._data
-        for k in keys[:-1]:
-            d = d.setdefault(k, {})
-        d[keys[-1]] = value
+        self._set_nested_values([(keys, value)])
+
+    def _set_nested_values(self, updates: Sequence[tuple[list[str], Any]]) -> None:
+        # Path copying: the containers from the root down to each changed key
+        # are copied (once per call), everything else is shared with the
+        # published tree, and the new root is published in one assignment.
+        if not updates:
+            return
+        with self._lock:
+            root = dict(self._data)
+            copied = {id(root)}
+            index = self._index.copy() if self._index is not None else None
+            for keys, value in updates:
+                d = root
+                for k in keys[:-1]:
+                    child = d.get(k)
+                    if id(child) not in copied:
+                        child = dict(child) if isinstance(child, (dict, LazyMapping)) else {}
+                        copied.add(id(child))
+                        d[k] = child
+                    d = child
+                d[keys[-1]] = value
+                if index is not None:
+                    index.set(keys, value)
+            self._replace_data(root, index)
 
     @staticmethod
     def _has_encrypted_values(data: Any) -> bool:
@@ -110,14 +532,18 @@ class Confidante:
                 return True
         return False
 
-    def _decrypt_data(self, data: Any, backend: CryptoBackend) -> Any:
-        if isinstance(data, dict):
-            for k, v in data.items():
-                data[k] = self._decrypt_data(v, backend)
-        elif isinstance(data, list):
-            for i, v in enumerate(data):
-                data[i] = self._decrypt_data(v, backend)
-        elif isinstance(data, str) and data.startswith("ENC::"):
-            ciphertext = data[len("ENC::"):]
-            return backend.decrypt(ciphertext)
-        return data
+    def _decrypt_data(self, data: Any, backend: CryptoBackend, workers: int = 1) -> Any:
+        # Collect every ENC:: leaf first so the backend can decrypt them as one
+        # batch, then return a copy of data holding the plaintexts; containers
+        # without secrets are shared and data itself is left untouched.
+        leaves: list[tuple[Any, Any, str]] = []
+        collect_encrypted(data, leaves)
+        if not leaves:
+            return data
+        started = instrument.start()
+        ciphertexts = list(dict.fromkeys(c for _, _, c in leaves))
+        plaintexts = dict(zip(ciphertexts, backend.decrypt_many(ciphertexts, workers=workers)))
+        if started is not None:
+            instrument.stop("decrypt", started, workers=workers)
+            instrument.count("decrypt.values", len(ciphertexts))
+        return replace_encrypted(data, plaintexts)
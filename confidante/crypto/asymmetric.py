@@ -1,13 +1,31 @@
 from __future__ import annotations
+from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import padding, rsa
 from cryptography.hazmat.primitives import hashes
 import base64
-from typing import Optional
+import threading
+from typing import Any, Optional
 from .base import CryptoBackend
 
+# Envelope tokens carry this marker after ENC:: so they can never be confused
+# with legacy RSA tokens, which are plain urlsafe base64.
+ENVELOPE_PREFIX = "env:"
+ENVELOPE_ALGORITHM = "RSA-OAEP-SHA256+Fernet"
+
+_OAEP = padding.OAEP(
+    mgf=padding.MGF1(algorithm=hashes.SHA256()),
+    algorithm=hashes.SHA256(),
+    label=None
+)
+
 class AsymmetricCrypto(CryptoBackend):
-    def __init__(self, private_key_path: str, passphrase: Optional[str] = None):
+    """
+    RSA backend. With ``envelope=True`` (the default) values are encrypted with
+    a per-file Fernet data key, and only that key is RSA-wrapped and stored in
+    the file metadata. Legacy per-value RSA tokens are still decrypted.
+    """
+    def __init__(self, private_key_path: str, passphrase: Optional[str] = None, envelope: bool = True):
         with open(private_key_path, "rb") as key_file:
             self._private_key = serialization.load_pem_private_key(
                 key_file.read(),
@@ -16,26 +34,49 @@ class AsymmetricCrypto(CryptoBackend):
         if not isinstance(self._private_key, rsa.RSAPrivateKey):
             raise ValueError("Private key must be RSA.")
         self._public_key = self._private_key.public_key()
+        self._envelope = envelope
+        self._wrapped_key: Optional[str] = None
+        self._data_key: Optional[Fernet] = None
+        self._lock = threading.Lock()
 
     def encrypt(self, value: str) -> str:
-        ciphertext = self._public_key.encrypt(
-            value.encode('utf-8'),
-            padding.OAEP(
-                mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                algorithm=hashes.SHA256(),
-                label=None
-            )
-        )
+        if self._envelope:
+            token = self._get_data_key(create=True).encrypt(value.encode('utf-8'))
+            return "ENC::" + ENVELOPE_PREFIX + token.decode('utf-8')
+        ciphertext = self._public_key.encrypt(value.encode('utf-8'), _OAEP)
         return "ENC::" + base64.urlsafe_b64encode(ciphertext).decode('utf-8')
 
     def decrypt(self, ciphertext: str) -> str:
+        if ciphertext.startswith(ENVELOPE_PREFIX):
+            token = ciphertext[len(ENVELOPE_PREFIX):].encode('utf-8')
+            return self._get_data_key().decrypt(token).decode('utf-8')
         data = base64.urlsafe_b64decode(ciphertext)
-        decrypted = self._private_key.decrypt(
-            data,
-            padding.OAEP(
-                mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                algorithm=hashes.SHA256(),
-                label=None
-            )
-        )
+        decrypted = self._private_key.decrypt(data, _OAEP)
         return decrypted.decode('utf-8')
+
+    def load_metadata(self, metadata: dict[str, Any]) -> None:
+        envelope = metadata.get("envelope")
+        with self._lock:
+            self._wrapped_key = envelope["key"] if envelope else None
+            self._data_key = None
+
+    def dump_metadata(self) -> dict[str, Any]:
+        if self._wrapped_key is None:
+            return {}
+        return {"envelope": {"alg": ENVELOPE_ALGORITHM, "key": self._wrapped_key}}
+
+    def _get_data_key(self, create: bool = False) -> Fernet:
+        # Unwrapping costs one RSA decrypt, paid once per file and shared by
+        # every thread decrypting values from it.
+        with self._lock:
+            if self._data_key is None:
+                if self._wrapped_key is not None:
+                    key = self._private_key.decrypt(base64.urlsafe_b64decode(self._wrapped_key), _OAEP)
+                elif create:
+                    key = Fernet.generate_key()
+                    self._wrapped_key = base64.urlsafe_b64encode(
+                        self._public_key.encrypt(key, _OAEP)).decode('utf-8')
+                else:
+                    raise ValueError("Envelope token found but the file has no wrapped data key.")
+                self._data_key = Fernet(key)
+            return self._data_key
@@ -1,8 +1,32 @@
 from __future__ import annotations
-from typing import Protocol
+from typing import Any, Protocol, Sequence
+
+# Top-level key holding per-file backend state (wrapped data keys, KDF salts).
+METADATA_KEY = "_confidante"
 
 class CryptoBackend(Protocol):
     def encrypt(self, value: str) -> str:
         pass
     def decrypt(self, ciphertext: str) -> str:
         pass
+
+    def decrypt_many(self, ciphertexts: Sequence[str], workers: int = 1) -> list[str]:
+        # cryptography releases the GIL while it works, so a thread pool
+        # spreads expensive decrypts (RSA in particular) across cores.
+        if workers <= 1 or len(ciphertexts) < 2:
+            return [self.decrypt(c) for c in ciphertexts]
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(self.decrypt, ciphertexts))
+
+    def encrypt_many(self, values: Sequence[str], workers: int = 1) -> list[str]:
+        if workers <= 1 or len(values) < 2:
+            return [self.encrypt(v) for v in values]
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(self.encrypt, values))
+
+    def load_metadata(self, metadata: dict[str, Any]) -> None:
+        pass
+    def dump_metadata(self) -> dict[str, Any]:
+        return {}
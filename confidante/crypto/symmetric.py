@@ -1,23 +1,126 @@
 from __future__ import annotations
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, MultiFernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
 import base64
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, Optional
 from .base import CryptoBackend
+from .. import instrument
+
+@dataclass(frozen=True)
+class KdfParams:
+    """Cost parameters used to turn a passphrase into a Fernet key."""
+    name: str = "scrypt"
+    n: int = 2 ** 15
+    r: int = 8
+    p: int = 1
+    iterations: int = 600_000  # pbkdf2 only
+
+    def to_metadata(self) -> dict[str, Any]:
+        if self.name == "scrypt":
+            return {"name": "scrypt", "n": self.n, "r": self.r, "p": self.p}
+        return {"name": self.name, "iterations": self.iterations}
+
+    @classmethod
+    def from_metadata(cls, metadata: dict[str, Any]) -> KdfParams:
+        fields = {k: metadata[k] for k in ("name", "n", "r", "p", "iterations") if k in metadata}
+        return replace(cls(), **fields)
+
+# Derived keys are cached process-wide so that loading many files protected
+# by the same passphrase pays the (deliberately slow) KDF cost only once.
+KEY_CACHE_SIZE = 128
+_key_cache: OrderedDict[tuple, bytes] = OrderedDict()
+_key_cache_lock = threading.Lock()
+
+def derive_key(passphrase: str, salt: bytes, params: KdfParams) -> bytes:
+    cache_key = (hashlib.sha256(passphrase.encode('utf-8')).digest(), salt, params)
+    with _key_cache_lock:
+        key = _key_cache.get(cache_key)
+        if key is not None:
+            _key_cache.move_to_end(cache_key)
+            instrument.count("kdf_cache.hit")
+            return key
+    instrument.count("kdf_cache.miss")
+    started = instrument.start()
+    if params.name == "scrypt":
+        kdf = Scrypt(salt=salt, length=32, n=params.n, r=params.r, p=params.p)
+    elif params.name == "pbkdf2":
+        kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=params.iterations)
+    else:
+        raise ValueError(f"Unsupported KDF: {params.name}")
+    key = base64.urlsafe_b64encode(kdf.derive(passphrase.encode('utf-8')))
+    instrument.stop("kdf", started, kdf=params.name)
+    with _key_cache_lock:
+        _key_cache[cache_key] = key
+        while len(_key_cache) > KEY_CACHE_SIZE:
+            _key_cache.popitem(last=False)
+    return key
+
+def clear_key_cache() -> None:
+    with _key_cache_lock:
+        _key_cache.clear()
 
 class SymmetricCrypto(CryptoBackend):
-    def __init__(self, key: str):
-        # key should be 32 url-safe base64 bytes. If not, derive a Fernet key somehow.
-        # For simplicity, assume user provides a fernet key. Otherwise, we might need a KDF.
-        if len(key) != 44:  # length of base64-encoded 32 bytes
-            # Derive a key from user input if needed
-            derived_key = base64.urlsafe_b64encode(key.encode('utf-8').ljust(32, b'0'))
-            self._fernet = Fernet(derived_key)
-        else:
-            self._fernet = Fernet(key.encode('utf-8'))
+    def __init__(self, key: str, kdf: Optional[KdfParams] = None):
+        # A 44 character key is taken as a ready-made Fernet key; anything
+        # else is a passphrase run through the KDF with a per-file salt.
+        self._fernet: Optional[MultiFernet] = None
+        self._passphrase: Optional[str] = None
+        if len(key) == 44:  # length of base64-encoded 32 bytes
+            try:
+                self._fernet = MultiFernet([Fernet(key.encode('utf-8'))])
+            except ValueError:
+                pass
+        if self._fernet is None:
+            self._passphrase = key
+            self._kdf = kdf or KdfParams()
+            self._salt = os.urandom(16)
+        self._lock = threading.Lock()
 
     def encrypt(self, value: str) -> str:
-        token = self._fernet.encrypt(value.encode('utf-8'))
+        token = self._get_fernet().encrypt(value.encode('utf-8'))
         return "ENC::" + token.decode('utf-8')
 
     def decrypt(self, ciphertext: str) -> str:
         token = ciphertext.encode('utf-8')
-        return self._fernet.decrypt(token).decode('utf-8')
+        return self._get_fernet().decrypt(token).decode('utf-8')
+
+    def load_metadata(self, metadata: dict[str, Any]) -> None:
+        kdf = metadata.get("kdf")
+        if self._passphrase is None:
+            return
+        with self._lock:
+            if kdf:
+                self._salt = base64.urlsafe_b64decode(kdf["salt"])
+                self._kdf = KdfParams.from_metadata(kdf)
+                self._fernet = None
+            else:
+                # A backend reused for a file without KDF metadata must not
+                # carry the previous file's salt over.
+                self._salt = os.urandom(16)
+                self._fernet = None
+
+    def dump_metadata(self) -> dict[str, Any]:
+        if self._passphrase is None:
+            return {}
+        kdf = self._kdf.to_metadata()
+        kdf["salt"] = base64.urlsafe_b64encode(self._salt).decode('utf-8')
+        return {"kdf": kdf}
+
+    def _get_fernet(self) -> MultiFernet:
+        with self._lock:
+            if self._fernet is None:
+                keys = [Fernet(derive_key(self._passphrase, self._salt, self._kdf))]
+                # Files written before the KDF existed used the passphrase
+                # zero-padded to 32 bytes; keep decrypting those values.
+                raw = self._passphrase.encode('utf-8')
+                if len(raw) <= 32:
+                    keys.append(Fernet(base64.urlsafe_b64encode(raw.ljust(32, b'0'))))
+                self._fernet = MultiFernet(keys)
+            return self._fernet
@@ -0,0 +1,194 @@
+from __future__ import annotations
+import os
+from typing import Any, NamedTuple, Optional
+
+from .atomic import atomic_write
+from .lazy import LazyMapping
+
+# (mtime_ns, size, inode), as for ConfigCache entries
+Stamp = tuple[int, int, int]
+
+class Span(NamedTuple):
+    """
+    Where a value sits in its source text: ``text[start:end]``. Mappings map
+    each key to a child ``Span`` and sequences hold one per item; a key
+    missing from ``children`` cannot be edited in place. ``children``, and
+    each child in it, may also be a zero-argument callable returning it, so
+    that only the parts of a file around the changed values get scanned.
+    ``entry`` covers the whole member of a mapping (key, value and, where the
+    format allows, the comments above it) when members can be moved around as
+    text.
+    """
+    start: int
+    end: int
+    children: Any = None
+    entry: Optional[tuple[int, int]] = None
+
+# A loader supports incremental saves by providing
+#   source_span(text, data) -> Span | None   the root's span; data was parsed from text
+#   format_scalar(value) -> str | None       one scalar, valid wherever a scalar span lies
+#   parse_scalar(token) -> Any               the inverse, raising on a bad token
+Edit = tuple[int, int, str]
+
+class _PatchMismatch(Exception):
+    pass
+
+def patch_file(path: str, loader: Any, data: Any, source: Optional[tuple[Stamp, Any]] = None) -> bool:
+    """
+    Rewrite only the parts of ``path`` that differ from ``data``: changed
+    scalars are replaced where they stand and reordered keys (as after
+    ``tidy``) are moved with their comments, so everything else in the file
+    is kept byte for byte. ``source`` is the tree last read from or written
+    to ``path`` with the file's stamp at the time; while the stamp still
+    matches, it spares parsing the file again, and subtrees ``data`` shares
+    with it are skipped without being compared.
+
+    Returns False, leaving the file alone, when the change cannot be
+    expressed as edits (keys added or removed, a loader without
+    ``source_span``, values the scanner has no span for) or does not check
+    out: every replaced scalar must parse back on its own, before and after,
+    and a file with moved members must parse back to ``data``. The caller
+    then dumps the whole tree.
+    """
+    if getattr(loader, "source_span", None) is None:
+        return False
+    try:
+        stamp = file_stamp(path)
+        if stamp is None:
+            return False
+        old = source[1] if source is not None and source[0] == stamp else loader.load(path)
+        text = read_text(path)
+        if text is None or file_stamp(path) != stamp:
+            return False
+        diff = _Diff(text, loader)
+        if not diff.diff(loader.source_span(text, old), old, data):
+            return False
+    except Exception:
+        # Unparseable on disk or changing underneath: a full dump replaces it.
+        return False
+    if not diff.edits:
+        return True
+
+    def verify(tmp: str) -> None:
+        if diff.moved and loader.load(tmp) != data:
+            raise _PatchMismatch()
+    try:
+        with atomic_write(path, "wb", verify=verify) as f:
+            f.write(splice(text, diff.edits).encode("utf-8"))
+    except _PatchMismatch:
+        return False
+    return True
+
+class _Diff:
+    """Collects the edits turning ``old`` (parsed from ``text``) into ``new``."""
+    def __init__(self, text: str, loader: Any):
+        self.text = text
+        self.loader = loader
+        self.edits: list[Edit] = []
+        self.moved = False
+
+    def diff(self, span: Any, old: Any, new: Any) -> bool:
+        # False if the change takes more than edits.
+        if _same(old, new):
+            return True
+        span = _resolve(span)
+        if span is None:
+            return False
+        if isinstance(new, (dict, LazyMapping)):
+            children = _resolve(span.children)
+            if not isinstance(old, (dict, LazyMapping)) or not isinstance(children, dict) or old.keys() != new.keys():
+                return False
+            if list(old) != list(new):
+                return self.reorder(children, old, new)
+            return all(self.diff(children.get(k), old[k], new[k]) for k in new)
+        if isinstance(new, list):
+            children = _resolve(span.children)
+            if not isinstance(old, list) or not isinstance(children, list) or len(old) != len(new):
+                return False
+            return all(self.diff(s, o, n) for s, o, n in zip(children, old, new))
+        if isinstance(old, (dict, LazyMapping, list)) or span.children is not None:
+            return False
+        return self.replace(span, old, new)
+
+    def replace(self, span: Span, old: Any, new: Any) -> bool:
+        # The token found must be the old value and the new one must read
+        # back as the new value, so a wrong span never reaches the file.
+        parse = self.loader.parse_scalar
+        try:
+            if not _same(parse(self.text[span.start:span.end]), old):
+                return False
+            rendered = self.loader.format_scalar(new)
+            if rendered is None or not _same(parse(rendered), new):
+                return False
+        except Exception:
+            return False
+        self.edits.append((span.start, span.end, rendered))
+        return True
+
+    def reorder(self, children: dict[Any, Any], old: Any, new: Any) -> bool:
+        # Members keep the separators between them; only their order changes.
+        spans = {k: _resolve(children.get(k)) for k in old}
+        if any(s is None or s.entry is None for s in spans.values()):
+            return False
+        entries = [spans[k].entry for k in old]
+        if entries != sorted(entries):
+            return False
+        pieces = []
+        for k in new:
+            child = spans[k]
+            inner = _Diff(self.text, self.loader)
+            if not inner.diff(child, old[k], new[k]):
+                return False
+            start, end = child.entry
+            pieces.append(splice(self.text[start:end], [(s - start, e - start, r) for s, e, r in inner.edits]))
+        gaps = [self.text[a[1]:b[0]] for a, b in zip(entries, entries[1:])] + [""]
+        self.edits.append((entries[0][0], entries[-1][1], "".join(p + g for p, g in zip(pieces, gaps))))
+        self.moved = True
+        return True
+
+def _resolve(value: Any) -> Any:
+    return value() if callable(value) else value
+
+def _same(a: Any, b: Any) -> bool:
+    # Type-aware (1 == True and 1 == 1.0, but they are written differently)
+    # and, for mappings, order-aware; shared subtrees compare by identity.
+    if a is b:
+        return True
+    if isinstance(a, (dict, LazyMapping, list)) or isinstance(b, (dict, LazyMapping, list)):
+        return a == b and _same_order(a, b)
+    return type(a) is type(b) and a == b
+
+def _same_order(a: Any, b: Any) -> bool:
+    if a is b:
+        return True
+    if isinstance(a, (dict, LazyMapping)):
+        return list(a) == list(b) and all(_same_order(v, b[k]) for k, v in a.items()
+                                          if isinstance(v, (dict, LazyMapping, list)))
+    if isinstance(a, list):
+        return all(_same_order(x, y) for x, y in zip(a, b) if isinstance(x, (dict, LazyMapping, list)))
+    return True
+
+def file_stamp(path: str) -> Optional[Stamp]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+def splice(text: str, edits: list[Edit]) -> str:
+    parts = []
+    pos = 0
+    for start, end, replacement in sorted(edits):
+        parts.append(text[pos:start])
+        parts.append(replacement)
+        pos = end
+    parts.append(text[pos:])
+    return "".join(parts)
+
+def read_text(path: str) -> Optional[str]:
+    # Newlines are kept as they are, so offsets match the file.
+    try:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
@@ -1,19 +1,112 @@
+import json
 import os
-from typing import Any
+import threading
+from typing import Any, Optional
+
+from .exceptions import ConfidanteError
+from .lazy import LazyMapping
+from .utils import deep_merge
+
+# Environment variables named PREFIX__A__B are indexed per prefix, with one
+# pass over os.environ the first time a prefix is asked for. The index is
+# dropped only when the environment differs from the snapshot it was built
+# from; comparing the snapshot is a C-level dict comparison, far cheaper than
+# re-scanning and splitting names.
+_index: dict[str, list[tuple[list[str], str]]] = {}
+_snapshot: Optional[dict] = None
+_lock = threading.Lock()
+
+_TRUE = {"1", "true", "yes", "on"}
+_FALSE = {"0", "false", "no", "off"}
+
+def _environ_state() -> dict:
+    # os.environ keeps its raw (bytes on POSIX) mapping in the private _data
+    # attribute, which CPython has had for a long time; comparing that skips
+    # decoding every name and value. Elsewhere a decoded copy is compared.
+    data = getattr(os.environ, "_data", None)
+    return data if isinstance(data, dict) else os.environ.copy()
+
+def _scan(prefix: str) -> list[tuple[list[str], str]]:
+    # The prefix may itself contain "__", so names are matched on it whole.
+    start = prefix + "__"
+    return [(k[len(start):].split("__"), v) for k, v in os.environ.items()
+            if k.startswith(start) and len(k) > len(start)]
+
+def invalidate_env_index() -> None:
+    global _snapshot
+    with _lock:
+        _snapshot = None
+
+def env_overrides(prefix: str="CONFIDANTE") -> list[tuple[list[str], str]]:
+    global _index, _snapshot
+    state = _environ_state()
+    with _lock:
+        if _snapshot is None or _snapshot != state:
+            _index = {}
+            _snapshot = dict(state)
+        overrides = _index.get(prefix)
+        if overrides is None:
+            overrides = _index[prefix] = _scan(prefix)
+        return overrides
+
+def coerce(value: str, existing: Any, name: str = "") -> Any:
+    """Convert an environment string to the type of the config value it replaces."""
+    if isinstance(existing, bool):
+        lowered = value.strip().lower()
+        if lowered in _TRUE:
+            return True
+        if lowered in _FALSE:
+            return False
+    elif isinstance(existing, (int, float, list, dict)):
+        try:
+            if isinstance(existing, int):
+                return int(value)
+            if isinstance(existing, float):
+                return float(value)
+            parsed = json.loads(value)
+            if isinstance(parsed, type(existing)):
+                return parsed
+        except ValueError:
+            pass
+    else:
+        return value
+    raise ConfidanteError(f"Environment variable {name or value!r} is not a valid {type(existing).__name__}.")
+
+def resolve_overrides(config: Any, prefix: str="CONFIDANTE") -> list[tuple[list[str], Any]]:
+    """
+    Environment overrides as (key path, value) pairs matched against
+    ``config``: each name segment uses an existing key that differs only in
+    case, and values are coerced to the type of the leaf they replace.
+    """
+    resolved = []
+    for path, value in env_overrides(prefix):
+        keys = []
+        node = config
+        for segment in path:
+            if isinstance(node, (dict, LazyMapping)):
+                if segment not in node:
+                    lowered = segment.lower()
+                    segment = next((k for k in node if isinstance(k, str) and k.lower() == lowered), segment)
+                node = node.get(segment)
+            else:
+                node = None
+            keys.append(segment)
+        name = prefix + "__" + "__".join(path)
+        resolved.append((keys, value if node is None else coerce(value, node, name)))
+    return resolved
 
 def merge_env(config: dict[str, Any], prefix: str="CONFIDANTE") -> dict[str, Any]:
     # Map ENV variables in form: CONFIDANTE__SECTION__KEY=value
-    # to config["section"]["key"] = value
-    env = os.environ
-    result = config.copy()
+    # to config["section"]["key"] = value. The input tree is not modified.
+    return deep_merge(config, env_tree(prefix, config))
 
-    for k, v in env.items():
-        if k.startswith(prefix + "__"):
-            path = k[len(prefix + "__"):].split("__")
-            _set_path(result, path, v)
-    return result
+def env_tree(prefix: str="CONFIDANTE", config: Any=None) -> dict[str, Any]:
+    tree: dict[str, Any] = {}
+    for path, v in resolve_overrides(config, prefix):
+        _set_path(tree, path, v)
+    return tree
 
-def _set_path(d: dict[str, Any], path: list[str], value: str):
+def _set_path(d: dict[str, Any], path: list[str], value: Any):
     curr = d
     for p in path[:-1]:
         if p not in curr or not isinstance(curr[p], dict):
@@ -1,2 +1,8 @@
 class ConfidanteError(Exception):
     pass
+
+class SchemaValidationError(ConfidanteError):
+    """Raised with every (dotted path, message) a schema reported."""
+    def __init__(self, errors: list[tuple[str, str]]):
+        self.errors = errors
+        super().__init__("\n".join(f"{path or '<root>'}: {message}" for path, message in errors))
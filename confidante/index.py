@@ -0,0 +1,129 @@
+from __future__ import annotations
+import re
+from bisect import bisect_left, insort
+from functools import lru_cache
+from typing import Any, Iterable, Optional
+
+from .lazy import LazyMapping
+
+class KeyIndex:
+    """
+    Flattened view of a configuration tree: dotted path -> leaf value.
+
+    Lists are flattened with numeric segments (``servers.0.host``); empty
+    mappings and lists are kept as leaves. Paths are also kept sorted for
+    prefix and glob queries, and the paths of ``ENC::`` values are tracked in
+    ``encrypted``. ``set`` and ``remove`` update the index in place, so an
+    index that has been handed out is changed through a ``copy``.
+    """
+    def __init__(self, data: Optional[Any] = None):
+        self._leaves: dict[str, Any] = {}
+        self._paths: list[str] = []
+        self.encrypted: set[str] = set()
+        if data is not None:
+            for path, value in _flatten(data, ""):
+                self._leaves[path] = value
+                if _is_encrypted(value):
+                    self.encrypted.add(path)
+            self._paths = sorted(self._leaves)
+
+    def copy(self) -> KeyIndex:
+        clone = KeyIndex()
+        clone._leaves = dict(self._leaves)
+        clone._paths = list(self._paths)
+        clone.encrypted = set(self.encrypted)
+        return clone
+
+    def __len__(self) -> int:
+        return len(self._leaves)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._leaves
+
+    def __getitem__(self, path: str) -> Any:
+        return self._leaves[path]
+
+    def get(self, path: str, default: Any = None) -> Any:
+        return self._leaves.get(path, default)
+
+    def items(self) -> Iterable[tuple[str, Any]]:
+        return ((p, self._leaves[p]) for p in self._paths)
+
+    def prefix(self, prefix: str) -> list[str]:
+        """Paths equal to ``prefix`` or nested under it, in sorted order."""
+        if not prefix:
+            return list(self._paths)
+        start, end = self._range(prefix + ".")
+        exact = [prefix] if prefix in self._leaves else []
+        return exact + self._paths[start:end]
+
+    def glob(self, pattern: str) -> list[str]:
+        """
+        Paths matching ``pattern``: ``*`` matches within one segment, ``**``
+        across segments and ``?`` a single character.
+        """
+        regex = _compile_glob(pattern)
+        literal = re.split(r"[*?]", pattern, maxsplit=1)[0]
+        start, end = self._range(literal) if literal else (0, len(self._paths))
+        return [p for p in self._paths[start:end] if regex.fullmatch(p)]
+
+    def set(self, keys: list[str], value: Any) -> None:
+        path = ".".join(str(k) for k in keys)
+        self.remove(path)
+        for leaf, leaf_value in _flatten(value, path):
+            self._leaves[leaf] = leaf_value
+            insort(self._paths, leaf)
+            if _is_encrypted(leaf_value):
+                self.encrypted.add(leaf)
+        # Setting a path below a former leaf replaces that leaf.
+        parts = path.split(".")
+        for i in range(1, len(parts)):
+            parent = ".".join(parts[:i])
+            if parent in self._leaves:
+                self._discard(parent)
+
+    def remove(self, path: str) -> None:
+        start, end = self._range(path + ".")
+        for leaf in self._paths[start:end]:
+            del self._leaves[leaf]
+            self.encrypted.discard(leaf)
+        del self._paths[start:end]
+        if path in self._leaves:
+            self._discard(path)
+
+    def _discard(self, path: str) -> None:
+        del self._leaves[path]
+        self.encrypted.discard(path)
+        del self._paths[bisect_left(self._paths, path)]
+
+    def _range(self, prefix: str) -> tuple[int, int]:
+        start = bisect_left(self._paths, prefix)
+        # Every string with this prefix sorts before prefix + U+10FFFF.
+        return start, bisect_left(self._paths, prefix + "\U0010ffff", start)
+
+def _flatten(value: Any, path: str):
+    if isinstance(value, (dict, LazyMapping)) and value:
+        for k, v in value.items():
+            yield from _flatten(v, f"{path}.{k}" if path else str(k))
+    elif isinstance(value, list) and value:
+        for i, v in enumerate(value):
+            yield from _flatten(v, f"{path}.{i}" if path else str(i))
+    elif path:
+        yield path, value
+
+def _is_encrypted(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith("ENC::")
+
+@lru_cache(maxsize=256)
+def _compile_glob(pattern: str) -> "re.Pattern[str]":
+    parts = []
+    for token in re.split(r"(\*\*|\*|\?)", pattern):
+        if token == "**":
+            parts.append(".*")
+        elif token == "*":
+            parts.append("[^.]*")
+        elif token == "?":
+            parts.append("[^.]")
+        else:
+            parts.append(re.escape(token))
+    return re.compile("".join(parts))
@@ -0,0 +1,100 @@
+from __future__ import annotations
+import threading
+import time
+from typing import Any, Callable, NamedTuple, Optional
+
+class Measurement(NamedTuple):
+    kind: str  # "timer" (value in seconds) or "counter"
+    name: str  # dotted phase name, e.g. "load.parse" or "decrypt.values"
+    value: float
+    attrs: dict[str, Any]
+
+Hook = Callable[[Measurement], None]
+
+# Registered hooks. Call sites check this list before measuring anything, so
+# with no hooks instrumentation costs a truth test per phase.
+hooks: list[Hook] = []
+
+def add_hook(hook: Hook) -> Callable[[], None]:
+    """Call ``hook`` with every ``Measurement``; returns a function that removes it."""
+    hooks.append(hook)
+    return lambda: remove_hook(hook)
+
+def remove_hook(hook: Hook) -> None:
+    if hook in hooks:
+        hooks.remove(hook)
+
+def start() -> Optional[float]:
+    """Start a phase timer, or return None when no hook is registered."""
+    return time.perf_counter() if hooks else None
+
+def stop(name: str, started: Optional[float], /, **attrs: Any) -> None:
+    if started is not None:
+        emit(Measurement("timer", name, time.perf_counter() - started, attrs))
+
+def count(name: str, value: float = 1, /, **attrs: Any) -> None:
+    if hooks:
+        emit(Measurement("counter", name, value, attrs))
+
+def emit(measurement: Measurement) -> None:
+    for hook in list(hooks):
+        hook(measurement)
+
+class Profile:
+    """
+    Hook that totals timers and counters while it is active::
+
+        with Profile() as profile:
+            config = Confidante.load(path)
+        print(profile.report())
+    """
+    def __init__(self):
+        self.timers: dict[str, list[float]] = {}  # name -> [calls, seconds]
+        self.counters: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, measurement: Measurement) -> None:
+        with self._lock:
+            if measurement.kind == "timer":
+                entry = self.timers.setdefault(measurement.name, [0, 0.0])
+                entry[0] += 1
+                entry[1] += measurement.value
+            else:
+                self.counters[measurement.name] = self.counters.get(measurement.name, 0) + measurement.value
+
+    def __enter__(self) -> Profile:
+        add_hook(self)
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        remove_hook(self)
+
+    def hit_rates(self) -> dict[str, float]:
+        """Hit rate of every cache that reported ``<cache>.hit``/``<cache>.miss`` counts."""
+        rates = {}
+        for name in self.counters:
+            if name.endswith(".hit") or name.endswith(".miss"):
+                cache = name.rsplit(".", 1)[0]
+                hits, misses = self.counters.get(f"{cache}.hit", 0), self.counters.get(f"{cache}.miss", 0)
+                rates[cache] = hits / (hits + misses)
+        return rates
+
+    def report(self) -> str:
+        # Phases are sorted by name, so sub-phases follow (and are indented
+        # under) the phase that contains them.
+        lines = [f"{'phase':<32}{'calls':>7}{'total ms':>12}"]
+        for name in sorted(self.timers):
+            calls, seconds = self.timers[name]
+            label = "  " * name.count(".") + name.rsplit(".", 1)[-1]
+            lines.append(f"{label:<32}{calls:>7}{seconds * 1000:>12.2f}")
+        counters = {k: v for k, v in self.counters.items() if not k.endswith((".hit", ".miss"))}
+        if counters:
+            lines.append("")
+            lines.append(f"{'counter':<32}{'value':>19}")
+            lines.extend(f"{name:<32}{value:>19,.0f}" for name, value in sorted(counters.items()))
+        rates = self.hit_rates()
+        if rates:
+            lines.append("")
+            lines.append(f"{'cache':<32}{'hit rate':>19}")
+            lines.extend(f"{name:<32}{rate:>19.0%}" for name, rate in sorted(rates.items()))
+        return "\n".join(lines)
@@ -0,0 +1,132 @@
+from __future__ import annotations
+import copy
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Sequence, Union
+
+from .cache import ConfigCache, default_cache
+from .crypto.base import METADATA_KEY, CryptoBackend
+from .environment import env_overrides, env_tree
+from .loaders.base import ConfigLoader
+from .utils import collect_encrypted, deep_merge
+
+class EnvLayer:
+    """Layer made of ``PREFIX__SECTION__KEY`` environment variables."""
+    def __init__(self, prefix: str = "CONFIDANTE"):
+        self.prefix = prefix
+
+    def __repr__(self) -> str:
+        return f"EnvLayer({self.prefix!r})"
+
+# A layer is a file path, an inline mapping (treated as immutable) or env vars.
+Layer = Union[str, os.PathLike, dict, EnvLayer]
+LoaderFactory = Callable[[str], ConfigLoader]
+
+class MergeCache:
+    """
+    Memoizes merged layer stacks by layer fingerprint.
+
+    The result for layers[:k] is kept for every k, so when only layer k
+    changes, layers before it are not merged again. Each merge copies only the
+    mappings the overlay touches (see ``deep_merge``); everything else is
+    shared, including the parsed files held by the ``ConfigCache``.
+    """
+    def __init__(self, maxsize: int = 64, config_cache: ConfigCache = default_cache):
+        self.maxsize = maxsize
+        self.config_cache = config_cache
+        self.merges = 0
+        # fingerprints -> (merged tree, layer trees). Holding the layer trees
+        # keeps the ids used in fingerprints from being reused.
+        self._merged: OrderedDict[tuple[Hashable, ...], tuple[dict[str, Any], tuple]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, layers: Sequence[Layer], loader_for: LoaderFactory) -> dict[str, Any]:
+        sources = [self._read(layer, loader_for) for layer in layers]
+        fingerprints = tuple(fp for fp, _ in sources)
+        with self._lock:
+            # Longest already merged prefix of this stack.
+            k = len(fingerprints)
+            while k and fingerprints[:k] not in self._merged:
+                k -= 1
+            merged = self._merged[fingerprints[:k]][0] if k else {}
+        for i in range(k, len(sources)):
+            layer = layers[i]
+            # Env layers are matched and coerced against the tree below them.
+            overlay = env_tree(layer.prefix, merged) if isinstance(layer, EnvLayer) else sources[i][1]
+            merged = deep_merge(merged, overlay)
+            self.merges += 1
+            with self._lock:
+                self._merged[fingerprints[:i + 1]] = (merged, tuple(data for _, data in sources[:i + 1]))
+        with self._lock:
+            if fingerprints in self._merged:
+                self._merged.move_to_end(fingerprints)
+            while len(self._merged) > self.maxsize:
+                self._merged.popitem(last=False)
+        return merged
+
+    def file_trees(self, layers: Sequence[Layer], loader_for: LoaderFactory) -> list[Any]:
+        """The parsed tree of each file layer, in order, as merged by ``resolve``."""
+        trees = []
+        for layer in layers:
+            if not isinstance(layer, (dict, EnvLayer)):
+                path = os.fspath(layer)
+                trees.append(self.config_cache.get(path, loader_for(path)))
+        return trees
+
+    def clear(self) -> None:
+        with self._lock:
+            self._merged.clear()
+
+    def _read(self, layer: Layer, loader_for: LoaderFactory) -> tuple[Hashable, Any]:
+        if isinstance(layer, EnvLayer):
+            overrides = tuple(sorted((tuple(path), value) for path, value in env_overrides(layer.prefix)))
+            return ("env", layer.prefix, overrides), overrides
+        if isinstance(layer, dict):
+            return ("dict", id(layer)), layer
+        path = os.fspath(layer)
+        data = self.config_cache.get(path, loader_for(path))
+        # The cache hands back the same tree object until the file changes.
+        return ("file", os.path.realpath(path), id(data)), data
+
+default_merge_cache = MergeCache()
+
+class LayeredCrypto(CryptoBackend):
+    """
+    Decrypts a layered configuration's secrets with the metadata of the file
+    each came from. Every encrypted file keeps its own KDF salt or wrapped
+    envelope key under ``_confidante`` and the merge keeps only the last one,
+    so each file with metadata gets a copy of ``backend`` loaded with its
+    own. Ciphertexts are matched to their file by value; values from inline
+    or env layers, and new encryptions, use ``backend``.
+    """
+    def __init__(self, backend: CryptoBackend, trees: Sequence[Any]):
+        self.backend = backend
+        self._by_token: dict[str, CryptoBackend] = {}
+        self.load_layers(trees)
+
+    def load_layers(self, trees: Sequence[Any]) -> None:
+        by_token: dict[str, CryptoBackend] = {}
+        for tree in trees:
+            metadata = tree.get(METADATA_KEY)
+            if not metadata:
+                continue
+            layer = copy.copy(self.backend)
+            layer.load_metadata(metadata)
+            leaves: list[tuple[Any, Any, str]] = []
+            collect_encrypted(tree, leaves)
+            for _, _, ciphertext in leaves:
+                by_token[ciphertext] = layer
+        self._by_token = by_token
+
+    def encrypt(self, value: str) -> str:
+        return self.backend.encrypt(value)
+
+    def decrypt(self, ciphertext: str) -> str:
+        return self._by_token.get(ciphertext, self.backend).decrypt(ciphertext)
+
+    def load_metadata(self, metadata: dict[str, Any]) -> None:
+        self.backend.load_metadata(metadata)
+
+    def dump_metadata(self) -> dict[str, Any]:
+        return self.backend.dump_metadata()
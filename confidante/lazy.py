@@ -0,0 +1,62 @@
+from __future__ import annotations
+from collections.abc import Mapping
+from typing import Any, Iterator
+
+class LazyMapping:
+    """
+    Read-only mapping whose values are decoded the first time they are read.
+
+    Subclasses keep one raw entry per key in ``_raw`` and turn it into a value
+    in ``_decode``. Nested objects decode to further ``LazyMapping``s; lists are
+    always decoded in full, so they never contain lazy mappings.
+
+    The class is registered as a ``Mapping`` rather than inheriting from it,
+    which keeps ``isinstance(value, LazyMapping)`` checks on hot read paths
+    out of ``ABCMeta.__instancecheck__``.
+    """
+    __slots__ = ("_raw", "_values")
+
+    keys = Mapping.keys
+    items = Mapping.items
+    values = Mapping.values
+    get = Mapping.get
+    __eq__ = Mapping.__eq__
+    __hash__ = None
+
+    def __init__(self, raw: dict[str, Any]):
+        self._raw = raw
+        self._values: dict[str, Any] = {}
+
+    def _decode(self, raw: Any) -> Any:
+        raise NotImplementedError
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        value = self._values[key] = self._decode(self._raw[key])
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._raw
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._raw)
+
+    def __len__(self) -> int:
+        return len(self._raw)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {k: materialize(self[k]) for k in self._raw}
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self._raw)!r})"
+
+def materialize(data: Any) -> Any:
+    """Return ``data`` with every lazy mapping decoded into a plain dict."""
+    if isinstance(data, LazyMapping):
+        return data.to_dict()
+    return data
+
+Mapping.register(LazyMapping)
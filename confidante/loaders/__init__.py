@@ -1 +1,3 @@
+from .registry import loader_for, register_loader, registered_suffixes
 
+__all__ = ["loader_for", "register_loader", "registered_suffixes"]
@@ -1,12 +1,213 @@
 import json
-from typing import Any
+import mmap
+import re
+from typing import Any, Iterator, Optional, Union
 from .base import ConfigLoader
+from ..atomic import atomic_write
+from ..edits import Span
+from ..exceptions import ConfidanteError
+from ..lazy import LazyMapping
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Available backends, fastest first.
+BACKENDS = ("orjson", "json") if orjson is not None else ("json",)
+
+def _orjson_loads(raw: Any) -> Any:
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        # NaN, Infinity and integers beyond 64 bits are still valid for the
+        # stdlib parser, which also reports genuine syntax errors.
+        return json.loads(raw)
+
+_LOADS = {"orjson": _orjson_loads, "json": json.loads}
+
+def _orjson_chunks(data: Any) -> Iterator[bytes]:
+    # A document is encoded one top-level member at a time, so only one
+    # member is held in memory at once. Each is encoded as a one-member
+    # object, which indents it exactly as it sits in the whole document.
+    option = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    if not isinstance(data, dict) or not data:
+        yield orjson.dumps(data, option=option)
+        return
+    separator = b"{\n"
+    for key, value in data.items():
+        yield separator
+        yield orjson.dumps({key: value}, option=option)[2:-2]
+        separator = b",\n"
+    yield b"\n}"
+
+# Tokens for the lazy scanner: strings, containers nested at most
+# _INLINE_DEPTH levels (matched whole, so their contents never reach the
+# Python loop), single brackets of deeper containers, and separators.
+_INLINE_DEPTH = 4
+
+def _token_pattern() -> "re.Pattern[bytes]":
+    try:
+        # Possessive quantifiers (Python 3.11+) let runs be consumed without
+        # backtracking; older versions match one character at a time.
+        re.compile(rb'a++')
+        run, star = rb'[^{}\[\]"]++', rb'*+'
+        string = rb'"(?:[^"\\]++|\\.)*+"'
+    except re.error:
+        run, star = rb'[^{}\[\]"]', rb'*'
+        string = rb'"(?:[^"\\]|\\.)*"'
+    container = None
+    for _ in range(_INLINE_DEPTH):
+        item = run + rb'|' + string + (rb'|' + container if container else rb'')
+        container = rb'(?:\{(?:' + item + rb')' + star + rb'\}|\[(?:' + item + rb')' + star + rb'\])'
+    return re.compile(rb'(' + string + rb')|(' + container + rb')|([{\[])|([}\]])|(,)|(:)')
+
+_TOKEN = _token_pattern()
+_WHITESPACE = re.compile(rb'[ \t\r\n]*')
+# Token kinds, by capture group
+_STRING, _CONTAINER, _OPEN, _CLOSE, _COMMA, _COLON = range(1, 7)
+_BRACE = ord('{')
+
+def _scan_object(buf: Any, start: int) -> dict[str, tuple[int, int]]:
+    # Map each member of the object opening at buf[start] to its value span.
+    spans: dict[str, tuple[int, int]] = {}
+    depth = 1
+    expect_key = True
+    key = None
+    value_start = 0
+    for m in _TOKEN.finditer(buf, start + 1):
+        kind = m.lastindex
+        if depth > 1:
+            if kind == _OPEN:
+                depth += 1
+            elif kind == _CLOSE:
+                depth -= 1
+        elif kind == _STRING:
+            if expect_key:
+                raw = m.group()
+                key = json.loads(raw) if b'\\' in raw else raw[1:-1].decode("utf-8")
+                expect_key = False
+        elif kind == _COLON:
+            value_start = m.end()
+        elif kind == _COMMA or kind == _CLOSE:
+            if key is not None:
+                spans[key] = (value_start, m.start())
+                key = None
+            if kind == _CLOSE:
+                return spans
+            expect_key = True
+        elif kind == _OPEN:
+            depth += 1
+    raise json.JSONDecodeError("Unterminated object", "", start)
+
+# The same tokens over decoded text, for source spans (see edits.py).
+_TEXT_TOKEN = re.compile(_TOKEN.pattern.decode("ascii"))
+_TEXT_WHITESPACE = re.compile(r'[ \t\r\n]*')
+
+def _source_span(text: str, start: int, end: int) -> Span:
+    # Span of the value in text[start:end], surrounding whitespace excluded.
+    # A container's members are only scanned when they are asked for.
+    start = _TEXT_WHITESPACE.match(text, start).end()
+    while end > start and text[end - 1] in " \t\r\n":
+        end -= 1
+    if start < end and text[start] in "{[":
+        return Span(start, end, lambda: _members(text, start, text[start] == "{"))
+    return Span(start, end)
+
+def _members(text: str, start: int, is_object: bool) -> Any:
+    # Same walk as _scan_object over one level; members also record their
+    # key's position so that they can be reordered.
+    children: Any = {} if is_object else []
+    depth = 1
+    key = None
+    key_start = item_start = start + 1
+    for m in _TEXT_TOKEN.finditer(text, start + 1):
+        kind = m.lastindex
+        if depth > 1:
+            if kind == _OPEN:
+                depth += 1
+            elif kind == _CLOSE:
+                depth -= 1
+        elif kind == _STRING and is_object and key is None:
+            key = json.loads(m.group())
+            key_start = m.start()
+        elif kind == _COLON:
+            item_start = m.end()
+        elif kind == _COMMA or kind == _CLOSE:
+            if is_object and key is not None:
+                child = _source_span(text, item_start, m.start())
+                children[key] = child._replace(entry=(key_start, child.end))
+                key = None
+            elif not is_object and (kind == _COMMA or text[item_start:m.start()].strip()):
+                children.append(_source_span(text, item_start, m.start()))
+            if kind == _CLOSE:
+                return children
+            item_start = m.end()
+        elif kind == _OPEN:
+            depth += 1
+    raise json.JSONDecodeError("Unterminated container", text, start)
+
+class LazyJsonObject(LazyMapping):
+    """JSON object backed by a memory map; members are decoded on first access."""
+    __slots__ = ("_buffer", "_loads")
+
+    def __init__(self, buffer: Any, start: int, loads: Any = json.loads):
+        super().__init__(_scan_object(buffer, start))
+        self._buffer = buffer
+        self._loads = loads
+
+    def _decode(self, span: tuple[int, int]) -> Any:
+        start = _WHITESPACE.match(self._buffer, span[0]).end()
+        if self._buffer[start] == _BRACE:
+            return LazyJsonObject(self._buffer, start, self._loads)
+        return self._loads(self._buffer[start:span[1]])
 
 class JsonLoader:
-    def load(self, path: str) -> dict[str, Any]:
+    def __init__(self, lazy: bool = False, backend: Optional[str] = None):
+        self.lazy = lazy
+        self.backend = backend or BACKENDS[0]
+        if self.backend not in BACKENDS:
+            raise ConfidanteError(f"JSON backend not available: {self.backend}")
+        self._loads = _LOADS[self.backend]
+
+    def load(self, path: str) -> Union[dict[str, Any], LazyJsonObject]:
+        if self.lazy:
+            return self._load_lazy(path)
+        if self.backend == "orjson":
+            with open(path, "rb") as f:
+                raw = f.read()
+            return self._loads(raw[3:] if raw[:3] == b'\xef\xbb\xbf' else raw)
         with open(path, "r", encoding="utf-8") as f:
             return json.load(f)
 
+    def _load_lazy(self, path: str) -> Union[dict[str, Any], LazyJsonObject]:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        start = _WHITESPACE.match(buffer, 3 if buffer[:3] == b'\xef\xbb\xbf' else 0).end()
+        if start < len(buffer) and buffer[start] == _BRACE:
+            return LazyJsonObject(buffer, start, self._loads)
+        # Only objects are indexed; anything else is decoded normally.
+        return self._loads(buffer[start:])
+
+    def source_span(self, text: str, data: Any = None) -> Span:
+        return _source_span(text, 1 if text[:1] == "\ufeff" else 0, len(text))
+
+    def format_scalar(self, value: Any) -> Optional[str]:
+        return json.dumps(value, ensure_ascii=False)
+
+    def parse_scalar(self, token: str) -> Any:
+        return self._loads(token)
+
     def dump(self, data: dict[str, Any], path: str) -> None:
-        with open(path, "w", encoding="utf-8") as f:
+        if self.backend == "orjson":
+            try:
+                with atomic_write(path, "wb") as f:
+                    for chunk in _orjson_chunks(data):
+                        f.write(chunk)
+                return
+            except orjson.JSONEncodeError:
+                # Big integers and the like: let json.dump handle or reject them.
+                pass
+        # json.dump encodes incrementally into the buffered temporary file.
+        with atomic_write(path) as f:
             json.dump(data, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Callable, Iterable, Union
+from .base import ConfigLoader
+from ..exceptions import ConfidanteError
+
+# A factory is called as factory(lazy=...) and returns a loader instance.
+LoaderFactory = Callable[..., ConfigLoader]
+
+_registry: dict[str, LoaderFactory] = {}
+
+def register_loader(suffixes: Union[str, Iterable[str]], factory: LoaderFactory) -> None:
+    """
+    Load files ending in ``suffixes`` with ``factory(lazy=...)``. A later
+    registration for the same suffix replaces the earlier one, so built-in
+    formats and backends can be overridden.
+    """
+    if isinstance(suffixes, str):
+        suffixes = (suffixes,)
+    for suffix in suffixes:
+        _registry[suffix] = factory
+
+def loader_for(path: str, lazy: bool = False) -> ConfigLoader:
+    factory = _registry.get(Path(path).suffix)
+    if factory is None:
+        raise ConfidanteError("Unsupported file format.")
+    return factory(lazy=lazy)
+
+def registered_suffixes() -> list[str]:
+    return sorted(_registry)
+
+# Built-in formats import their parser only when first used.
+def _json(lazy: bool = False) -> ConfigLoader:
+    from .json_loader import JsonLoader
+    return JsonLoader(lazy=lazy)
+
+def _toml(lazy: bool = False) -> ConfigLoader:
+    from .toml_loader import TomlLoader
+    return TomlLoader()
+
+def _yaml(lazy: bool = False) -> ConfigLoader:
+    from .yaml_loader import YamlLoader
+    return YamlLoader()
+
+def _snapshot(lazy: bool = False) -> ConfigLoader:
+    from .snapshot_loader import SnapshotLoader
+    return SnapshotLoader()
+
+register_loader(".json", _json)
+register_loader(".toml", _toml)
+register_loader((".yml", ".yaml"), _yaml)
+register_loader(".cfc", _snapshot)
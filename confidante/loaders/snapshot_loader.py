@@ -0,0 +1,146 @@
+from __future__ import annotations
+import datetime
+import hashlib
+import marshal
+import mmap
+import os
+import struct
+from typing import Any, Optional
+
+from ..atomic import atomic_write
+from ..exceptions import ConfidanteError
+from ..lazy import LazyMapping
+
+# A snapshot is a header followed by marshal blobs, one per mapping in the
+# tree. A mapping's blob holds its scalars and lists inline and refers to
+# nested mappings by (offset, length), so reading a snapshot only decodes
+# the mappings that are actually accessed. marshal cannot store dates, so
+# those are tagged as (type name, isoformat) tuples; config trees never
+# contain tuples otherwise.
+MAGIC = b"CFSNAP01"
+SUFFIX = ".cfc"
+_HEADER = struct.Struct("<8s32sQqQQ")  # magic, source sha256, size, mtime_ns, root offset, root length
+
+_TEMPORAL = {"datetime": datetime.datetime, "date": datetime.date, "time": datetime.time}
+
+def _encode_inline(value: Any) -> tuple[Any, bool]:
+    # Returns the marshal-able value and whether it contains tags.
+    if isinstance(value, dict):
+        items = {k: _encode_inline(v) for k, v in value.items()}
+        tagged = any(t for _, t in items.values())
+        encoded = {k: v for k, (v, _) in items.items()}
+        return (("dict", encoded), True) if tagged else (encoded, False)
+    elif isinstance(value, list):
+        items = [_encode_inline(i) for i in value]
+        tagged = any(t for _, t in items)
+        encoded = [v for v, _ in items]
+        return (("list", encoded), True) if tagged else (encoded, False)
+    elif isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        # datetime is checked before date by its type name
+        return (type(value).__name__, value.isoformat()), True
+    elif value is None or isinstance(value, (str, int, float, bytes)):
+        return value, False
+    raise ConfidanteError(f"Cannot snapshot value of type {type(value).__name__}")
+
+def _decode_inline(value: Any) -> Any:
+    if type(value) is not tuple:
+        return value
+    tag, payload = value
+    if tag == "list":
+        return [_decode_inline(i) for i in payload]
+    elif tag == "dict":
+        return {k: _decode_inline(v) for k, v in payload.items()}
+    return _TEMPORAL[tag].fromisoformat(payload)
+
+def _write_node(data: dict[str, Any], out: bytearray) -> tuple[int, int]:
+    table = {}
+    for k, v in data.items():
+        if isinstance(v, dict):
+            table[k] = _write_node(v, out)
+        else:
+            table[k] = _encode_inline(v)[0]
+    blob = marshal.dumps(table)
+    offset = len(out)
+    out += blob
+    return offset, len(blob)
+
+class SnapshotMapping(LazyMapping):
+    __slots__ = ("_buffer",)
+
+    def __init__(self, raw: dict[str, Any], buffer: Any):
+        super().__init__(raw)
+        self._buffer = buffer
+
+    def _decode(self, raw: Any) -> Any:
+        if type(raw) is tuple and type(raw[0]) is int:
+            offset, length = raw
+            return SnapshotMapping(marshal.loads(self._buffer[offset:offset + length]), self._buffer)
+        return _decode_inline(raw)
+
+def _read_header(path: str) -> tuple:
+    with open(path, "rb") as f:
+        header = f.read(_HEADER.size)
+    if len(header) != _HEADER.size or not header.startswith(MAGIC):
+        raise ConfidanteError(f"Not a confidante snapshot: {path}")
+    return _HEADER.unpack(header)
+
+def _hash_file(path: str) -> bytes:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+def compile_snapshot(data: dict[str, Any], source_path: str, snapshot_path: Optional[str] = None) -> str:
+    """Write a snapshot of ``data`` (parsed from ``source_path``) and return its path."""
+    if snapshot_path is None:
+        snapshot_path = snapshot_path_for(source_path)
+    stat = os.stat(source_path)
+    digest = _hash_file(source_path)
+    out = bytearray(_HEADER.size)
+    root_offset, root_length = _write_node(data, out)
+    out[:_HEADER.size] = _HEADER.pack(MAGIC, digest, stat.st_size, stat.st_mtime_ns, root_offset, root_length)
+    # Loads pick snapshots up on their own, so one is never seen half-written.
+    with atomic_write(snapshot_path, "wb") as f:
+        f.write(out)
+    return snapshot_path
+
+def snapshot_path_for(source_path: str) -> str:
+    # The source's own suffix is kept, so c.json and c.yaml never share one.
+    return source_path + SUFFIX
+
+def is_fresh(snapshot_path: str, source_path: str) -> bool:
+    try:
+        _, digest, size, mtime_ns, _, _ = _read_header(snapshot_path)
+        stat = os.stat(source_path)
+    except (OSError, ConfidanteError):
+        return False
+    if (stat.st_size, stat.st_mtime_ns) == (size, mtime_ns):
+        return True
+    # The source was touched; it is still fresh if the content is unchanged.
+    return stat.st_size == size and _hash_file(source_path) == digest
+
+def find_snapshot(source_path: str) -> Optional[str]:
+    snapshot_path = snapshot_path_for(source_path)
+    if snapshot_path != source_path and os.path.exists(snapshot_path) and is_fresh(snapshot_path, source_path):
+        return snapshot_path
+    return None
+
+class SnapshotLoader:
+    backend = "marshal"
+
+    def load(self, path: str) -> SnapshotMapping:
+        _, _, _, _, root_offset, root_length = _read_header(path)
+        with open(path, "rb") as f:
+            # The mapping keeps the map alive; pages are only read when the
+            # mappings stored on them are accessed.
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if root_offset + root_length > len(buffer):
+                raise ValueError("truncated")
+            return SnapshotMapping(marshal.loads(buffer[root_offset:root_offset + root_length]), buffer)
+        except (ValueError, EOFError, TypeError) as e:
+            raise ConfidanteError(f"Corrupt snapshot {path}: {e}") from e
+
+    def dump(self, data: dict[str, Any], path: str) -> None:
+        raise ConfidanteError("Snapshots are read-only; edit and recompile the source file.")
@@ -1,7 +1,11 @@
+import json
+import re
 import sys
-import tomli_w
-from typing import Any
+from functools import partial
+from typing import Any, Optional
 from .base import ConfigLoader
+from ..atomic import atomic_write
+from ..edits import Span
 
 if sys.version_info >= (3,11):
     import tomllib
@@ -15,10 +19,119 @@ except ImportError:
     raise ImportError("tomli_w not installed. Please install tomli_w for TOML writing.")
 
 class TomlLoader:
+    # Parsing uses tomllib (tomli before Python 3.11), writing tomli_w.
+    backend = tomllib.__name__
+
     def load(self, path: str) -> dict[str, Any]:
         with open(path, "rb") as f:
             return tomllib.load(f)
 
+    def source_span(self, text: str, data: Any = None) -> Optional[Span]:
+        """
+        Spans of the single-line scalars. Arrays, inline tables, multi-line
+        strings and arrays of tables get none, so changes to them fall back
+        to a full dump.
+        """
+        return _scan(text)
+
+    def format_scalar(self, value: Any) -> Optional[str]:
+        try:
+            rendered = tomli_w.dumps({"v": value})
+        except TypeError:
+            return None
+        if not rendered.startswith("v = ") or rendered.count("\n") != 1:
+            return None
+        return rendered[len("v = "):-1]
+
+    def parse_scalar(self, token: str) -> Any:
+        return tomllib.loads(f"v = {token}")["v"]
+
     def dump(self, data: dict[str, Any], path: str) -> None:
-        with open(path, "wb") as f:
-            f.write(tomli_w.dump(data, f))
+        # tomli_w.dump writes table by table; it returns None.
+        with atomic_write(path, "wb") as f:
+            tomli_w.dump(data, f)
+
+_KEY = r'(?:[A-Za-z0-9_-]+|"(?:[^"\\\n]|\\.)*"|' + r"'[^'\n]*')"
+_DOTTED = _KEY + r'(?:[ \t]*\.[ \t]*' + _KEY + r')*'
+_KEY_PART = re.compile(_KEY)
+_END = r'[ \t]*(?:#[^\n]*)?\r?(?:\n|\Z)'
+# A one-line string, or a bare number, boolean or date, up to a comment.
+_SCALAR = (r'"(?:[^"\\\n]|\\.)*"(?!")' + r"|'[^'\n]*'(?!')"
+           + r'''|[^\s#\[{"'][^#\n]*?(?=''' + _END + r')')
+
+def _value_pattern() -> str:
+    # Multi-line strings, and arrays and inline tables nested up to eight
+    # levels, with the strings and comments in them.
+    strings = (r'"""(?:[^"\\]|\\[\s\S]|"(?!""))*"""(?:"{1,2}(?!"))?'
+               + r"""|'''[\s\S]*?'''(?:'{1,2}(?!'))?"""
+               + r'|"(?:[^"\\\n]|\\.)*"' + r"|'[^'\n]*'")
+    item = r'''[^\[\]{}"'#]|#[^\n]*|''' + strings
+    container = None
+    for _ in range(8):
+        inner = item + (r'|' + container if container else r'')
+        container = r'[\[{](?:' + inner + r')*[\]}]'
+    return strings + r'|' + container
+
+_ASSIGN = r'[ \t]*(?P<key>' + _DOTTED + r')[ \t]*=[ \t]*(?:(?P<scalar>' + _SCALAR + r')|(?:' + _value_pattern() + r'))' + _END
+_BODY = r'(?:' + _ASSIGN + r'|' + _END + r')*'
+# A [table] or [[array of tables]] header with the statements below it. The
+# bodies consume multi-line values whole, so a header-like line inside one
+# is never taken for a header.
+_SECTION = re.compile(r'[ \t]*(?:\[\[[ \t]*(?P<array>' + _DOTTED + r')[ \t]*\]\]|\[[ \t]*(?P<table>'
+                      + _DOTTED + r')[ \t]*\])' + _END + r'(?P<body>' + _BODY + r')')
+_ROOT_BODY = re.compile(_BODY)
+_STATEMENT = re.compile(r'^' + _ASSIGN, re.M)
+
+def _scan(text: str) -> Optional[Span]:
+    # Sections are only split up front; the keys of a table are looked for
+    # when it is asked for. None if some line is not a statement.
+    bodies: dict[tuple[str, ...], list[tuple[int, int]]] = {(): [(0, _ROOT_BODY.match(text).end())]}
+    subtables: dict[tuple[str, ...], dict[str, bool]] = {}
+    pos = bodies[()][0][1]
+    while pos < len(text):
+        m = _SECTION.match(text, pos)
+        if m is None:
+            return None
+        path = tuple(_split(m.group("table") or m.group("array")))
+        for i in range(len(path)):
+            # True for an array of tables, which gets no span.
+            subtables.setdefault(path[:i], {})[path[i]] = i == len(path) - 1 and m.group("array") is not None
+        if m.group("table") is not None:
+            bodies.setdefault(path, []).append(m.span("body"))
+        pos = m.end()
+
+    def table(path: tuple[str, ...]) -> Span:
+        return Span(0, 0, partial(children, path))
+
+    def children(path: tuple[str, ...]) -> dict[str, Any]:
+        found: dict[str, Any] = {}
+        for key, array in subtables.get(path, {}).items():
+            found[key] = None if array else table(path + (key,))
+        # Keys set here, or through dotted keys in a table above.
+        for depth in range(len(path) + 1):
+            for start, end in bodies.get(path[:depth], ()):
+                for m in _STATEMENT.finditer(text, start, end):
+                    keys = path[:depth] + tuple(_split(m.group("key")))
+                    if len(keys) <= len(path) or keys[:len(path)] != path:
+                        continue
+                    key = keys[len(path)]
+                    if len(keys) > len(path) + 1:
+                        found.setdefault(key, table(path + (key,)))
+                    elif m.group("scalar") is not None:
+                        found.setdefault(key, Span(m.start("scalar"), m.end("scalar")))
+                    else:
+                        found.setdefault(key, None)
+        return found
+    return table(())
+
+def _split(dotted: str) -> list[str]:
+    if '"' not in dotted and "'" not in dotted:
+        return [part.strip() for part in dotted.split(".")]
+    keys = []
+    for part in _KEY_PART.findall(dotted):
+        if part[0] == '"':
+            part = json.loads(part)
+        elif part[0] == "'":
+            part = part[1:-1]
+        keys.append(part)
+    return keys
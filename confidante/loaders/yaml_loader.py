@@ -1,12 +1,195 @@
+import re
 import yaml
-from typing import Any
+from functools import partial
+from typing import Any, Optional
 from .base import ConfigLoader
+from ..atomic import atomic_write
+from ..edits import Span
+from ..exceptions import ConfidanteError
+
+# Available backends, fastest first: the libyaml C bindings when PyYAML was
+# built against libyaml, the pure-Python implementation otherwise.
+_BACKENDS: dict[str, tuple[Any, Any]] = {}
+if getattr(yaml, "__with_libyaml__", False):
+    _BACKENDS["libyaml"] = (yaml.CSafeLoader, yaml.CSafeDumper)
+_BACKENDS["pyyaml"] = (yaml.SafeLoader, yaml.SafeDumper)
+BACKENDS = tuple(_BACKENDS)
+# Line width for single scalars; libyaml needs a C int.
+_NO_WRAP = 2 ** 31 - 1
 
 class YamlLoader:
+    def __init__(self, backend: Optional[str] = None):
+        self.backend = backend or BACKENDS[0]
+        if self.backend not in _BACKENDS:
+            raise ConfidanteError(f"YAML backend not available: {self.backend}")
+        self._loader, self._dumper = _BACKENDS[self.backend]
+
     def load(self, path: str) -> dict[str, Any]:
         with open(path, "r", encoding="utf-8") as f:
-            return yaml.safe_load(f)
+            return yaml.load(f, Loader=self._loader)
+
+    def source_span(self, text: str, data: Any = None) -> Optional[Span]:
+        """
+        A block mapping at the root is split into its members, one per line
+        starting at column 0, and each member is composed on its own the
+        first time something in it changes. Anything else is composed whole.
+        """
+        members = _root_members(text, self._loader)
+        # A quoted scalar or flow collection may go on at column 0, so the
+        # split is only trusted when it finds exactly the keys of data.
+        if members is None or not isinstance(data, dict) or [k for k, _ in members] != list(data):
+            node = self._compose(text)
+            return _node_span(text, node, set(), 0) if node is not None else None
+        composed: dict[int, Optional[Span]] = {}
+
+        def value(i: int) -> Optional[Span]:
+            if i not in composed:
+                composed[i] = self._member(text, members, i)
+            return composed[i]
+
+        def member(i: int) -> Optional[Span]:
+            child = value(i)
+            if child is None:
+                return None
+            # Comments between the previous value and this key move with it.
+            prev = value(i - 1) if i else None
+            prev_end = text.find("\n", prev.end) + 1 if prev is not None else 0
+            return child._replace(entry=_entry(text, members[i][1], child.end, prev_end or None))
+
+        children = {key: partial(member, i) for i, (key, _) in enumerate(members)}
+        return Span(members[0][1], len(text), children)
+
+    def _member(self, text: str, members: list[tuple[str, int]], i: int) -> Optional[Span]:
+        start = members[i][1]
+        end = members[i + 1][1] if i + 1 < len(members) else len(text)
+        try:
+            node = self._compose(text[start:end])
+        except yaml.YAMLError:
+            return None
+        if not isinstance(node, yaml.MappingNode) or node.flow_style or len(node.value) != 1:
+            return None
+        key, value = node.value[0]
+        if not isinstance(key, yaml.ScalarNode) or key.tag != _STR_TAG or key.value != members[i][0]:
+            return None
+        return _node_span(text, value, set(), start)
+
+    def _compose(self, text: str) -> Any:
+        loader = self._loader(text)
+        try:
+            return loader.get_single_node()
+        finally:
+            loader.dispose()
+
+    def format_scalar(self, value: Any) -> Optional[str]:
+        # One line that reads back the same in block and in flow context.
+        # Multi-line strings are double-quoted, with escaped newlines, since a
+        # block scalar would depend on the indentation around it.
+        for style in (None, '"'):
+            rendered = yaml.dump(value, Dumper=self._dumper, width=_NO_WRAP, default_style=style)
+            if rendered.endswith("\n...\n"):
+                rendered = rendered[:-len("\n...\n")]
+            rendered = rendered.rstrip("\n")
+            if "\n" in rendered:
+                continue
+            try:
+                item, = self.parse_scalar(f"[{rendered}]")
+            except (yaml.YAMLError, ValueError, TypeError):
+                continue
+            if type(item) is type(value) and item == value:
+                return rendered
+        return None
+
+    def parse_scalar(self, token: str) -> Any:
+        # The newline ends a block scalar the way the next line did.
+        return yaml.load(token + "\n", Loader=self._loader)
 
     def dump(self, data: dict[str, Any], path: str) -> None:
-        with open(path, "w", encoding="utf-8") as f:
-            yaml.safe_dump(data, f, sort_keys=True)
+        with atomic_write(path) as f:
+            yaml.dump(data, f, Dumper=self._dumper, sort_keys=True)
+
+_STR_TAG = "tag:yaml.org,2002:str"
+# A key at column 0: double-quoted, single-quoted or plain, then ": ".
+_ROOT_KEY = re.compile(r'''^(?:("(?:[^"\\\n]|\\.)*")|('(?:[^'\n]|'')*')|([^\s#%?:,\[\]{}&*!|>'"@`-][^\n]*?))[ \t]*:(?:[ \t]|\r?$)''', re.M)
+# Lines before the first member that do not make it a different document.
+_PREAMBLE = re.compile(r'(?:[ \t]*(?:#[^\n]*)?\r?\n|%[^\n]*\n|---[ \t]*(?:#[^\n]*)?\r?\n)*')
+# Anything at column 0 but a comment or a compact sequence item.
+_COLUMN_0 = re.compile(r'^(?:[^\s#-]|-\S)', re.M)
+_ANCHOR = re.compile(r'(?:![^\s]*[ \t]+)?&')
+
+def _root_members(text: str, loader: Any) -> Optional[list[tuple[str, int]]]:
+    # (key, line start) of each member of a block mapping at the root, or
+    # None when the document is not one.
+    members = []
+    for m in _ROOT_KEY.finditer(text):
+        double, single, plain = m.groups()
+        if double is not None:
+            key = yaml.load(double, Loader=loader)
+        elif single is not None:
+            key = single[1:-1].replace("''", "'")
+        else:
+            key = plain
+        members.append((key, m.start()))
+    if not members or _PREAMBLE.match(text).end() != members[0][1]:
+        return None
+    # Every other line at column 0 (another document, a complex key) may
+    # start a member the pattern missed.
+    if sum(1 for _ in _COLUMN_0.finditer(text, members[0][1])) != len(members):
+        return None
+    return members
+
+def _node_span(text: str, node: Any, seen: set[int], offset: int) -> Optional[Span]:
+    # Marks are relative to the composed text, which starts at text[offset].
+    if id(node) in seen:
+        # An alias: edits at the anchor would change every use of it.
+        return None
+    seen.add(id(node))
+    start, end = node.start_mark.index + offset, node.end_mark.index + offset
+    # Block scalars end after their trailing newlines.
+    while end > start and text[end - 1] in " \t\r\n":
+        end -= 1
+    scalar = isinstance(node, yaml.ScalarNode)
+    if _ANCHOR.match(text, start):
+        # Likewise for an anchor; the node can still be moved as a whole.
+        return None if scalar else Span(start, end)
+    if scalar:
+        # An empty value has no token to replace.
+        return Span(start, end) if start < end else None
+    if isinstance(node, yaml.SequenceNode):
+        items = [_node_span(text, item, seen, offset) for item in node.value]
+        return Span(start, _end(node, items, end), items)
+    if not all(k.tag == _STR_TAG and isinstance(k, yaml.ScalarNode) for k, _ in node.value):
+        # Merge keys and non-string keys do not map one to one onto the data.
+        return Span(start, end)
+    children = {}
+    spans = []
+    prev_end = None
+    for key, value in node.value:
+        child = _node_span(text, value, seen, offset)
+        spans.append(child)
+        entry = None
+        if child is not None:
+            # Members of flow mappings are not moved.
+            entry = None if node.flow_style else _entry(text, key.start_mark.index + offset, child.end, prev_end)
+            children[key.value] = child._replace(entry=entry)
+        prev_end = entry[1] if entry is not None else None
+    return Span(start, _end(node, spans, end), children)
+
+def _end(node: Any, children: list, end: int) -> int:
+    # A block collection's end mark lies past any comment lines that follow
+    # it; those belong to the next member, so it ends with its last child.
+    if node.flow_style or not children or children[-1] is None:
+        return end
+    return children[-1].end
+
+def _entry(text: str, key_start: int, value_end: int, prev_end: Optional[int]) -> Optional[tuple[int, int]]:
+    # Whole lines, from the end of the previous member (so comments above a
+    # key move with it) through the newline that ends the value.
+    line_start = text.rfind("\n", 0, key_start) + 1
+    line_end = text.find("\n", value_end)
+    if line_end < 0:
+        return None
+    if prev_end is None:
+        if text[line_start:key_start].strip():
+            return None
+        prev_end = line_start
+    return (prev_end, line_end + 1) if prev_end <= line_start else None
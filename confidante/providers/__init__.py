@@ -0,0 +1,8 @@
+from .base import REF_PREFIX, SecretProvider
+from .registry import provider_for, register_provider, register_provider_factory, registered_schemes
+from .resolver import SecretCache, default_secret_cache, resolve_references
+
+__all__ = [
+    "REF_PREFIX", "SecretProvider", "SecretCache", "default_secret_cache", "provider_for",
+    "register_provider", "register_provider_factory", "registered_schemes", "resolve_references",
+]
@@ -0,0 +1,34 @@
+from __future__ import annotations
+from typing import Any, Optional, Protocol, Sequence
+from urllib.parse import urlsplit
+
+from ..exceptions import ConfidanteError
+
+# Values such as "REF::vault://secret/data/db#password" are resolved through
+# the provider registered for their scheme instead of being stored in the file.
+REF_PREFIX = "REF::"
+
+class SecretProvider(Protocol):
+    """
+    Fetches secrets by location: the part of a reference between ``scheme://``
+    and ``#field``. A location yields either a string or a mapping of fields,
+    so every field of one secret costs a single fetch.
+    """
+    def fetch(self, location: str) -> Any:
+        pass
+
+    def fetch_many(self, locations: Sequence[str], workers: int = 1) -> list[Any]:
+        if workers <= 1 or len(locations) < 2:
+            return [self.fetch(location) for location in locations]
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(self.fetch, locations))
+
+def parse_reference(ref: str) -> tuple[str, str, Optional[str]]:
+    """Split ``REF::scheme://location#field`` into (scheme, location, field)."""
+    value = ref[len(REF_PREFIX):] if ref.startswith(REF_PREFIX) else ref
+    if "://" not in value:
+        raise ConfidanteError(f"Invalid secret reference: {ref}")
+    parts = urlsplit(value)
+    location = parts.netloc + parts.path + (f"?{parts.query}" if parts.query else "")
+    return parts.scheme, location, parts.fragment or None
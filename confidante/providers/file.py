@@ -0,0 +1,17 @@
+from __future__ import annotations
+from typing import Any
+
+from .base import SecretProvider
+from ..exceptions import ConfidanteError
+
+class FileProvider(SecretProvider):
+    """
+    ``file:///run/secrets/db_password``: the file's contents without the
+    trailing newline, as written by Docker and Kubernetes secret mounts.
+    """
+    def fetch(self, location: str) -> Any:
+        try:
+            with open(location, encoding="utf-8") as f:
+                return f.read().rstrip("\r\n")
+        except FileNotFoundError:
+            raise ConfidanteError(f"Secret file not found: {location}") from None
@@ -0,0 +1,44 @@
+from __future__ import annotations
+from typing import Callable
+
+from .base import SecretProvider
+from ..exceptions import ConfidanteError
+
+# A factory is called without arguments the first time its scheme is used.
+ProviderFactory = Callable[[], SecretProvider]
+
+_factories: dict[str, ProviderFactory] = {}
+_providers: dict[str, SecretProvider] = {}
+
+def register_provider(scheme: str, provider: SecretProvider) -> None:
+    """Resolve ``REF::<scheme>://...`` values with ``provider``, replacing any earlier one."""
+    _providers[scheme] = provider
+
+def register_provider_factory(scheme: str, factory: ProviderFactory) -> None:
+    _factories[scheme] = factory
+    _providers.pop(scheme, None)
+
+def provider_for(scheme: str) -> SecretProvider:
+    provider = _providers.get(scheme)
+    if provider is None:
+        factory = _factories.get(scheme)
+        if factory is None:
+            raise ConfidanteError(f"No secret provider registered for {scheme}://")
+        provider = _providers.setdefault(scheme, factory())
+    return provider
+
+def registered_schemes() -> list[str]:
+    return sorted(set(_factories) | set(_providers))
+
+# Built-in providers are created (and their modules imported) on first use,
+# so the Vault client reads VAULT_ADDR and VAULT_TOKEN only when needed.
+def _file() -> SecretProvider:
+    from .file import FileProvider
+    return FileProvider()
+
+def _vault() -> SecretProvider:
+    from .vault import VaultProvider
+    return VaultProvider()
+
+register_provider_factory("file", _file)
+register_provider_factory("vault", _vault)
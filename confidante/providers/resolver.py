@@ -0,0 +1,100 @@
+from __future__ import annotations
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterable, Mapping, Optional
+
+from .base import SecretProvider, parse_reference
+from .registry import provider_for
+from .. import instrument
+from ..exceptions import ConfidanteError
+
+class SecretCache:
+    """
+    LRU cache of fetched secrets keyed on (scheme, location). Entries expire
+    ``ttl`` seconds after they were fetched, so rotated secrets are picked up
+    without refetching every secret on every load.
+    """
+    def __init__(self, maxsize: int = 256, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, str], tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[str, str]) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                instrument.count("secret_cache.hit")
+                return entry[1]
+            self.misses += 1
+        instrument.count("secret_cache.miss")
+        return None
+
+    def put(self, key: tuple[str, str], secret: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, secret)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, scheme: str, location: str) -> None:
+        with self._lock:
+            self._entries.pop((scheme, location), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+# Used by Confidante.resolve_references(cache=True)
+default_secret_cache = SecretCache()
+
+def resolve_references(refs: Iterable[str], providers: Optional[Mapping[str, SecretProvider]] = None,
+        cache: Optional[SecretCache] = default_secret_cache, workers: int = 4) -> dict[str, Any]:
+    """
+    Resolve ``REF::`` values, returning ``{ref: value}``. References are
+    grouped by secret so that each (scheme, location) is fetched at most once,
+    and every provider receives all of its uncached locations in one
+    ``fetch_many`` call.
+    """
+    parsed = {ref: parse_reference(ref) for ref in dict.fromkeys(refs)}
+    secrets: dict[tuple[str, str], Any] = {}
+    pending: dict[str, list[str]] = {}
+    for scheme, location, _ in parsed.values():
+        key = (scheme, location)
+        if key in secrets:
+            continue
+        secret = cache.get(key) if cache is not None else None
+        secrets[key] = secret
+        if secret is None:
+            pending.setdefault(scheme, []).append(location)
+    for scheme, locations in pending.items():
+        provider = providers.get(scheme) if providers else None
+        provider = provider or provider_for(scheme)
+        started = instrument.start()
+        for location, secret in zip(locations, provider.fetch_many(locations, workers=workers)):
+            secrets[(scheme, location)] = secret
+            if cache is not None:
+                cache.put((scheme, location), secret)
+        instrument.stop("references.fetch", started, scheme=scheme, secrets=len(locations))
+    return {ref: _field(secrets[(scheme, location)], field, ref)
+            for ref, (scheme, location, field) in parsed.items()}
+
+def _field(secret: Any, field: Optional[str], ref: str) -> Any:
+    if field is None:
+        if isinstance(secret, Mapping):
+            raise ConfidanteError(f"{ref} names a secret with several fields; add #field")
+        return secret
+    if not isinstance(secret, Mapping):
+        raise ConfidanteError(f"{ref}: the secret has no fields")
+    if field not in secret:
+        raise ConfidanteError(f"{ref}: no field {field!r} in the secret")
+    return secret[field]
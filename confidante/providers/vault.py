@@ -0,0 +1,113 @@
+from __future__ import annotations
+import http.client
+import json
+import os
+import threading
+from typing import Any, Callable, Optional, Sequence
+from urllib.parse import quote, urlsplit
+
+from .base import SecretProvider
+from ..exceptions import ConfidanteError
+
+class ConnectionPool:
+    """
+    Keep-alive ``http.client`` connections to one host, at most ``size`` in
+    use at a time. A request on a reused connection that the server has
+    meanwhile closed is retried once on a fresh connection.
+    """
+    def __init__(self, connect: Callable[[], http.client.HTTPConnection], size: int = 4):
+        self.size = size
+        self.opened = 0
+        self._connect = connect
+        self._idle: list[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def request(self, method: str, url: str, headers: dict[str, str]) -> tuple[int, bytes]:
+        with self._slots:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is not None:
+                try:
+                    return self._send(conn, method, url, headers)
+                except (OSError, http.client.HTTPException):
+                    pass
+            return self._send(self._open(), method, url, headers)
+
+    def _open(self) -> http.client.HTTPConnection:
+        with self._lock:
+            self.opened += 1
+        return self._connect()
+
+    def _send(self, conn: http.client.HTTPConnection, method: str, url: str,
+            headers: dict[str, str]) -> tuple[int, bytes]:
+        try:
+            conn.request(method, url, headers=headers)
+            response = conn.getresponse()
+            body = response.read()
+        except BaseException:
+            conn.close()
+            raise
+        if response.will_close:
+            conn.close()
+        else:
+            with self._lock:
+                self._idle.append(conn)
+        return response.status, body
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+class VaultProvider(SecretProvider):
+    """
+    ``vault://secret/data/db#password``: reads ``/v1/<location>`` from
+    HashiCorp Vault (``VAULT_ADDR``, ``VAULT_TOKEN`` and ``VAULT_NAMESPACE``
+    by default). KV version 2 responses are unwrapped to the secret's fields.
+    """
+    def __init__(self, address: Optional[str] = None, token: Optional[str] = None,
+            namespace: Optional[str] = None, pool_size: int = 4, timeout: float = 10.0):
+        self.address = (address or os.environ.get("VAULT_ADDR") or "http://127.0.0.1:8200").rstrip("/")
+        url = urlsplit(self.address)
+        if url.scheme not in ("http", "https") or not url.hostname:
+            raise ConfidanteError(f"Invalid Vault address: {self.address}")
+        self._base = url.path
+        self._headers = {"Accept": "application/json"}
+        token = token or os.environ.get("VAULT_TOKEN")
+        if token:
+            self._headers["X-Vault-Token"] = token
+        namespace = namespace or os.environ.get("VAULT_NAMESPACE")
+        if namespace:
+            self._headers["X-Vault-Namespace"] = namespace
+        connection = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        self.pool = ConnectionPool(lambda: connection(url.hostname, url.port, timeout=timeout), size=pool_size)
+
+    def fetch(self, location: str) -> Any:
+        try:
+            status, body = self.pool.request("GET", f"{self._base}/v1/{quote(location.strip('/'), safe='/?=&')}", self._headers)
+        except (OSError, http.client.HTTPException) as e:
+            raise ConfidanteError(f"Could not reach Vault at {self.address}: {e}") from None
+        if status == 404:
+            raise ConfidanteError(f"Secret not found: vault://{location}")
+        if status != 200:
+            raise ConfidanteError(f"Vault returned {status} for vault://{location}: {_errors(body)}")
+        data = json.loads(body).get("data") or {}
+        # KV version 2 nests the fields under data.data, next to their metadata.
+        if isinstance(data.get("data"), dict) and "metadata" in data:
+            return data["data"]
+        return data
+
+    def fetch_many(self, locations: Sequence[str], workers: int = 1) -> list[Any]:
+        # More threads than pooled connections would only queue on the pool.
+        return super().fetch_many(locations, workers=min(workers, self.pool.size))
+
+    def close(self) -> None:
+        self.pool.close()
+
+def _errors(body: bytes) -> str:
+    try:
+        return "; ".join(json.loads(body).get("errors") or []) or body.decode("utf-8", "replace")
+    except (ValueError, AttributeError):
+        return body.decode("utf-8", "replace")
@@ -0,0 +1,98 @@
+from __future__ import annotations
+import re
+from typing import Any, Optional
+
+from .atomic import atomic_write
+from .crypto.base import CryptoBackend, METADATA_KEY
+from .edits import read_text
+from .loaders.registry import loader_for
+from .utils import collect_encrypted
+
+# Ciphertexts are urlsafe base64 (plus the "env:" envelope marker), so a token
+# never needs quoting or escaping in JSON, YAML or TOML.
+_TOKEN = re.compile(r'ENC::[A-Za-z0-9_\-=:]+')
+
+class _PatchMismatch(Exception):
+    pass
+
+def rekey_file(path: str, old_backend: CryptoBackend, new_backend: CryptoBackend, workers: int = 1) -> int:
+    """
+    Re-encrypt every ``ENC::`` value of ``path`` from ``old_backend`` to
+    ``new_backend`` and write the file back atomically, returning the number
+    of values re-encrypted. Tokens are replaced in the source text, so
+    plaintext values, comments and layout stay as they were; if the patched
+    text does not parse back to the expected tree the file is dumped in full.
+    A file already readable with ``new_backend`` is left alone (returns 0),
+    which makes an interrupted rotation safe to run again.
+    """
+    loader = loader_for(path)
+    data = loader.load(path)
+    leaves: list[tuple[Any, Any, str]] = []
+    collect_encrypted(data, leaves)
+    if not leaves:
+        return 0
+    metadata = data.get(METADATA_KEY) or {}
+    ciphertexts = list(dict.fromkeys(c for _, _, c in leaves))
+    if _readable(new_backend, metadata, ciphertexts[0]):
+        return 0
+
+    old_backend.load_metadata(metadata)
+    plaintexts = old_backend.decrypt_many(ciphertexts, workers=workers)
+    # Fresh per-file state (data key, salt) for the new backend.
+    new_backend.load_metadata({})
+    tokens = new_backend.encrypt_many(plaintexts, workers=workers)
+    replacements = {"ENC::" + c: t for c, t in zip(ciphertexts, tokens)}
+    for container, k, c in leaves:
+        container[k] = replacements["ENC::" + c]
+
+    new_metadata = {k: v for k, v in metadata.items() if k not in old_backend.dump_metadata()}
+    new_metadata.update(new_backend.dump_metadata())
+    changes = _string_changes(metadata, new_metadata) if METADATA_KEY in data or not new_metadata else None
+    if new_metadata or METADATA_KEY in data:
+        data[METADATA_KEY] = new_metadata
+
+    text = read_text(path) if changes is not None else None
+    if text is not None:
+        text = _TOKEN.sub(lambda m: replacements.get(m.group(), m.group()), text)
+        for old, new in changes:
+            text = text.replace(old, new)
+
+        def verify(tmp: str) -> None:
+            if loader.load(tmp) != data:
+                raise _PatchMismatch()
+        try:
+            with atomic_write(path, "wb", verify=verify) as f:
+                f.write(text.encode("utf-8"))
+            return len(ciphertexts)
+        except _PatchMismatch:
+            pass
+    loader.dump(data, path)
+    return len(ciphertexts)
+
+def _readable(backend: CryptoBackend, metadata: dict[str, Any], ciphertext: str) -> bool:
+    backend.load_metadata(metadata)
+    try:
+        backend.decrypt(ciphertext)
+    except Exception:
+        # Wrong key: InvalidToken, an RSA ValueError or a malformed token.
+        return False
+    return True
+
+def _string_changes(old: Any, new: Any) -> Optional[list[tuple[str, str]]]:
+    # (old, new) pairs of differing strings when both trees have the same
+    # shape and differ only in string values; None otherwise.
+    if isinstance(old, dict) and isinstance(new, dict):
+        if old.keys() != new.keys():
+            return None
+        pairs = [_string_changes(old[k], new[k]) for k in old]
+    elif isinstance(old, list) and isinstance(new, list):
+        if len(old) != len(new):
+            return None
+        pairs = [_string_changes(a, b) for a, b in zip(old, new)]
+    elif isinstance(old, str) and isinstance(new, str):
+        return [(old, new)] if old != new else []
+    else:
+        return [] if old == new else None
+    if any(p is None for p in pairs):
+        return None
+    return [pair for p in pairs for pair in p]
@@ -1,4 +1,298 @@
-# Placeholder for future schema validation (e.g. pydantic or jsonschema)
-def validate_schema(data: dict) -> bool:
-    # Placeholder: always return True
-    return True
+from __future__ import annotations
+import re
+from typing import Any, Callable, Union
+
+from .crypto.base import METADATA_KEY
+from .exceptions import ConfidanteError, SchemaValidationError
+from .lazy import LazyMapping
+from .utils import SECRET_PREFIXES
+
+# A compiled check appends (dotted path, message) pairs for every problem it
+# finds in value; path is the dotted path of value itself ("" for the root).
+Check = Callable[[Any, str, list], None]
+
+_TYPES: dict[str, tuple[type, ...]] = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "null": (type(None),),
+    "object": (dict,),
+    "array": (list, tuple),
+}
+
+class Schema:
+    """
+    A JSON-Schema-style schema compiled once into validator closures.
+
+    Supported keywords: type, enum, const, properties, required,
+    additionalProperties, patternProperties, min/maxProperties, items,
+    min/maxItems, min/maxLength, pattern, minimum, maximum,
+    exclusiveMinimum, exclusiveMaximum, allOf, anyOf, oneOf, not and local
+    ``$ref``s (``#/definitions/...``). ``secret: true`` requires an
+    ``ENC::`` value or a ``REF::`` reference, accepted without being
+    decrypted or resolved.
+    """
+    __slots__ = ("source", "_check")
+
+    def __init__(self, schema: Union[dict[str, Any], bool]):
+        self.source = schema
+        self._check = _Compiler(schema).compile(schema)
+
+    def errors(self, data: Any) -> list[tuple[str, str]]:
+        errors: list[tuple[str, str]] = []
+        self._check(data, "", errors)
+        return errors
+
+    def validate(self, data: Any) -> None:
+        errors = self.errors(data)
+        if errors:
+            raise SchemaValidationError(errors)
+
+def compile_schema(schema: Union[Schema, dict[str, Any]]) -> Schema:
+    return schema if isinstance(schema, Schema) else Schema(schema)
+
+def validate_schema(data: Any, schema: Union[Schema, dict[str, Any], None] = None) -> bool:
+    """True if ``data`` matches ``schema`` (always, without one); see ``schema_errors``."""
+    return schema is None or not schema_errors(data, schema)
+
+def schema_errors(data: Any, schema: Union[Schema, dict[str, Any]]) -> list[tuple[str, str]]:
+    """All (dotted path, message) errors of ``data`` against ``schema``."""
+    return compile_schema(schema).errors(data)
+
+def _accept(value: Any, path: str, errors: list) -> None:
+    pass
+
+def _child(path: str, key: Any) -> str:
+    return f"{path}.{key}" if path else str(key)
+
+def _all(checks: list[Check]) -> Check:
+    if not checks:
+        return _accept
+    if len(checks) == 1:
+        return checks[0]
+
+    def check(value: Any, path: str, errors: list) -> None:
+        for c in checks:
+            c(value, path, errors)
+    return check
+
+class _Compiler:
+    def __init__(self, root: Any):
+        self.root = root
+        self.refs: dict[str, Check] = {}
+
+    def compile(self, schema: Any) -> Check:
+        if schema is True:
+            return _accept
+        if schema is False:
+            return lambda value, path, errors: errors.append((path, "no value is allowed here"))
+        if not isinstance(schema, dict):
+            raise ConfidanteError(f"Invalid schema: {schema!r}")
+        if schema.get("secret"):
+            return _secret
+
+        checks: list[Check] = []
+        if "$ref" in schema:
+            checks.append(self._ref(schema["$ref"]))
+        if "enum" in schema:
+            checks.append(_enum(list(schema["enum"])))
+        if "const" in schema:
+            checks.append(_enum([schema["const"]]))
+        for keyword in ("allOf", "anyOf", "oneOf"):
+            if keyword in schema:
+                checks.append(_combine(keyword, [self.compile(s) for s in schema[keyword]]))
+        if "not" in schema:
+            checks.append(_not(self.compile(schema["not"])))
+
+        typed = _all(self._object(schema) + self._array(schema) + _string(schema) + _number(schema))
+        if "type" not in schema:
+            checks.append(typed)
+            return _all(checks)
+        checks.append(_type(schema["type"], typed))
+        return _all(checks)
+
+    def _ref(self, ref: str) -> Check:
+        if ref in self.refs:
+            return self.refs[ref]
+        if not ref.startswith("#"):
+            raise ConfidanteError(f"Only local $refs are supported: {ref}")
+        target = self.root
+        try:
+            for part in ref[1:].split("/")[1:]:
+                target = target[part.replace("~1", "/").replace("~0", "~")]
+        except (KeyError, TypeError):
+            raise ConfidanteError(f"Unresolvable $ref: {ref}") from None
+        # Registered before compiling the target so recursive refs resolve.
+        cell: list[Check] = []
+
+        def check(value: Any, path: str, errors: list) -> None:
+            cell[0](value, path, errors)
+        self.refs[ref] = check
+        cell.append(self.compile(target))
+        return check
+
+    def _object(self, schema: dict[str, Any]) -> list[Check]:
+        keywords = ("properties", "required", "additionalProperties", "patternProperties",
+                    "minProperties", "maxProperties")
+        if not any(k in schema for k in keywords):
+            return []
+        properties = {k: self.compile(s) for k, s in schema.get("properties", {}).items()}
+        required = list(schema.get("required", ()))
+        patterns = [(re.compile(p), self.compile(s)) for p, s in schema.get("patternProperties", {}).items()]
+        additional = schema.get("additionalProperties", True)
+        additional_check = None if additional is True or additional is False else self.compile(additional)
+        min_props, max_props = schema.get("minProperties"), schema.get("maxProperties")
+        # Without constraints on undeclared keys only declared ones are visited.
+        every_key = bool(patterns) or additional is not True
+
+        def check(value: Any, path: str, errors: list) -> None:
+            if not isinstance(value, (dict, LazyMapping)):
+                return
+            for key in required:
+                if key not in value:
+                    errors.append((_child(path, key), "required property is missing"))
+            # The encryption metadata at the root is not part of the config.
+            metadata = not path and METADATA_KEY in value and METADATA_KEY not in properties
+            count = len(value) - metadata
+            if min_props is not None and count < min_props:
+                errors.append((path, f"expected at least {min_props} properties"))
+            if max_props is not None and count > max_props:
+                errors.append((path, f"expected at most {max_props} properties"))
+            if not every_key:
+                for key, prop_check in properties.items():
+                    if key in value:
+                        prop_check(value[key], _child(path, key), errors)
+                return
+            for key, item in value.items():
+                if metadata and key == METADATA_KEY:
+                    continue
+                prop_check = properties.get(key)
+                matched = prop_check is not None
+                if matched:
+                    prop_check(item, _child(path, key), errors)
+                for pattern, pattern_check in patterns:
+                    if pattern.search(key):
+                        matched = True
+                        pattern_check(item, _child(path, key), errors)
+                if matched:
+                    continue
+                if additional is False:
+                    errors.append((_child(path, key), "additional property is not allowed"))
+                elif additional_check is not None:
+                    additional_check(item, _child(path, key), errors)
+        return [check]
+
+    def _array(self, schema: dict[str, Any]) -> list[Check]:
+        if not any(k in schema for k in ("items", "minItems", "maxItems")):
+            return []
+        items = self.compile(schema["items"]) if "items" in schema else None
+        min_items, max_items = schema.get("minItems"), schema.get("maxItems")
+
+        def check(value: Any, path: str, errors: list) -> None:
+            if not isinstance(value, (list, tuple)):
+                return
+            if min_items is not None and len(value) < min_items:
+                errors.append((path, f"expected at least {min_items} items"))
+            if max_items is not None and len(value) > max_items:
+                errors.append((path, f"expected at most {max_items} items"))
+            if items is not None:
+                for i, item in enumerate(value):
+                    items(item, _child(path, i), errors)
+        return [check]
+
+def _secret(value: Any, path: str, errors: list) -> None:
+    if not (isinstance(value, str) and value.startswith(SECRET_PREFIXES)):
+        errors.append((path, "secret must be encrypted (ENC::) or a reference (REF::)"))
+
+def _type(names: Union[str, list[str]], then: Check) -> Check:
+    names = [names] if isinstance(names, str) else list(names)
+    unknown = [n for n in names if n not in _TYPES]
+    if unknown:
+        raise ConfidanteError(f"Unknown schema type: {unknown[0]}")
+    types = tuple(t for n in names for t in _TYPES[n])
+    # bool is an int subclass but only matches "boolean".
+    no_bool = "boolean" not in names
+    is_object = "object" in names
+    expected = " or ".join(names)
+
+    def check(value: Any, path: str, errors: list) -> None:
+        matches = isinstance(value, types) or is_object and isinstance(value, LazyMapping)
+        if matches and not (no_bool and type(value) is bool):
+            then(value, path, errors)
+        else:
+            errors.append((path, f"expected {expected}, got {_type_name(value)}"))
+    return check
+
+def _type_name(value: Any) -> str:
+    for name, types in _TYPES.items():
+        if isinstance(value, types) and (name == "boolean" or not isinstance(value, bool)):
+            return name
+    return "object" if isinstance(value, LazyMapping) else type(value).__name__
+
+def _enum(options: list[Any]) -> Check:
+    def check(value: Any, path: str, errors: list) -> None:
+        # As in JSON Schema, 1 equals 1.0 but not true.
+        if not any(value == o and (type(value) is bool) == (type(o) is bool) for o in options):
+            errors.append((path, f"expected one of {options!r}"))
+    return check
+
+def _string(schema: dict[str, Any]) -> list[Check]:
+    min_len, max_len = schema.get("minLength"), schema.get("maxLength")
+    pattern = re.compile(schema["pattern"]) if "pattern" in schema else None
+    if min_len is None and max_len is None and pattern is None:
+        return []
+
+    def check(value: Any, path: str, errors: list) -> None:
+        if not isinstance(value, str):
+            return
+        if min_len is not None and len(value) < min_len:
+            errors.append((path, f"expected at least {min_len} characters"))
+        if max_len is not None and len(value) > max_len:
+            errors.append((path, f"expected at most {max_len} characters"))
+        if pattern is not None and not pattern.search(value):
+            errors.append((path, f"does not match {pattern.pattern!r}"))
+    return [check]
+
+def _number(schema: dict[str, Any]) -> list[Check]:
+    bounds = [(schema[k], op, message) for k, op, message in (
+        ("minimum", lambda v, b: v >= b, "expected >= {}"),
+        ("maximum", lambda v, b: v <= b, "expected <= {}"),
+        ("exclusiveMinimum", lambda v, b: v > b, "expected > {}"),
+        ("exclusiveMaximum", lambda v, b: v < b, "expected < {}"),
+    ) if k in schema]
+    if not bounds:
+        return []
+
+    def check(value: Any, path: str, errors: list) -> None:
+        if type(value) not in (int, float):
+            return
+        for bound, op, message in bounds:
+            if not op(value, bound):
+                errors.append((path, message.format(bound)))
+    return [check]
+
+def _combine(keyword: str, checks: list[Check]) -> Check:
+    def check(value: Any, path: str, errors: list) -> None:
+        if keyword == "allOf":
+            for c in checks:
+                c(value, path, errors)
+            return
+        passed = 0
+        for c in checks:
+            sub: list = []
+            c(value, path, sub)
+            passed += not sub
+        if keyword == "anyOf" and not passed:
+            errors.append((path, "does not match any of the allowed schemas"))
+        elif keyword == "oneOf" and passed != 1:
+            errors.append((path, f"expected exactly one matching schema, {passed} matched"))
+    return check
+
+def _not(inner: Check) -> Check:
+    def check(value: Any, path: str, errors: list) -> None:
+        sub: list = []
+        inner(value, path, sub)
+        if not sub:
+            errors.append((path, "must not match the excluded schema"))
+    return check
@@ -0,0 +1,112 @@
+import enum
+import json
+import threading
+from dataclasses import dataclass, field
+from typing import Literal, Optional
+import pytest
+from confidante.core import Confidante
+from confidante.crypto.symmetric import SymmetricCrypto
+from confidante.exceptions import ConfidanteError
+
+class Mode(enum.Enum):
+    DEV = "dev"
+    PROD = "prod"
+
+@dataclass(frozen=True)
+class Pool:
+    size: int
+    timeout: float = 30.0
+
+@dataclass(frozen=True)
+class Database:
+    host: str
+    port: int
+    password: str
+    pool: Pool
+    replicas: tuple[str, ...] = ()
+
+@dataclass(frozen=True)
+class Settings:
+    db: Database
+    mode: Mode
+    debug: bool
+    log_level: Literal["info", "debug"] = "info"
+    tags: dict[str, str] = field(default_factory=dict)
+    api_url: Optional[str] = field(default=None, metadata={"key": "api-url"})
+
+CONFIG = {
+    "db": {"host": "localhost", "port": "5432", "password": "plain", "pool": {"size": 5}, "replicas": ["a", "b"]},
+    "mode": "prod",
+    "debug": "yes",
+    "tags": {"team": "core"},
+    "api-url": "https://example.com",
+}
+
+def _write(path, data):
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+def test_bind_coerces_types(tmp_path):
+    path = tmp_path / "config.json"
+    _write(path, CONFIG)
+    settings = Confidante.load(str(path)).bind(Settings)
+    assert settings.db.port == 5432
+    assert settings.db.pool == Pool(size=5, timeout=30.0)
+    assert settings.db.replicas == ("a", "b")
+    assert settings.mode is Mode.PROD and settings.debug is True
+    assert settings.api_url == "https://example.com"
+    with pytest.raises(TypeError):
+        settings.tags["team"] = "x"
+    with pytest.raises(AttributeError):
+        settings.debug = False
+
+def test_bind_errors_name_the_path(tmp_path):
+    path = tmp_path / "config.json"
+    _write(path, {**CONFIG, "db": {**CONFIG["db"], "pool": {"size": "many"}}})
+    with pytest.raises(ConfidanteError, match=r"db\.pool\.size: expected int"):
+        Confidante.load(str(path)).bind(Settings)
+    _write(path, {"mode": "dev", "debug": False})
+    with pytest.raises(ConfidanteError, match="db: required key is missing"):
+        Confidante.load(str(path)).bind(Settings)
+
+    @dataclass
+    class Mutable:
+        debug: bool
+    with pytest.raises(ConfidanteError, match="frozen"):
+        Confidante.load(str(path)).bind(Mutable)
+
+def test_bind_decrypts_lazily_unlocked_values(tmp_path, symmetric_key):
+    path = tmp_path / "config.json"
+    secret = SymmetricCrypto(symmetric_key).encrypt("s3cret")
+    _write(path, {**CONFIG, "db": {**CONFIG["db"], "password": secret}})
+    conf = Confidante.load(str(path))
+    assert conf.bind(Settings).db.password == secret
+    conf.unlock(key=symmetric_key)
+    assert conf.bind(Settings).db.password == "s3cret"
+
+def test_rebind_on_reload_reuses_unchanged_sections(tmp_path):
+    path = tmp_path / "config.json"
+    _write(path, CONFIG)
+    conf = Confidante.load(str(path))
+    before = conf.bind(Settings)
+    assert conf.bind(Settings) is before
+    _write(path, {**CONFIG, "db": {**CONFIG["db"], "port": 6432}})
+    assert conf.reload() == ["db.port"]
+    after = conf.bind(Settings)
+    assert after is not before and after.db.port == 6432
+    assert after.db.pool is before.db.pool
+    assert after.tags is before.tags
+    _write(path, {**CONFIG, "db": {**CONFIG["db"], "port": 6432}, "extra": 1})
+    conf.reload()
+    assert conf.bind(Settings) is after
+
+def test_bound_view_shared_across_threads(tmp_path):
+    path = tmp_path / "config.json"
+    _write(path, CONFIG)
+    conf = Confidante.load(str(path))
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append(conf.bind(Settings).db.port)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert seen == [5432] * 8
@@ -0,0 +1,55 @@
+from confidante.cache import ConfigCache
+from confidante.core import Confidante
+from confidante.lazy import LazyMapping
+from confidante.loaders.json_loader import JsonLoader
+
+def test_cache_reuses_unchanged_file(tmp_path):
+    p = tmp_path / "config.json"
+    p.write_text('{"a": {"b": 1}}', encoding="utf-8")
+    cache = ConfigCache()
+    first = Confidante.load(str(p), cache=cache)
+    second = Confidante.load(str(p), cache=cache)
+    assert first._data is second._data
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_cache_invalidated_by_stat_change(tmp_path):
+    p = tmp_path / "config.json"
+    p.write_text('{"a": 1}', encoding="utf-8")
+    cache = ConfigCache()
+    assert Confidante.load(str(p), cache=cache).config.a == 1
+    p.write_text('{"a": 22}', encoding="utf-8")
+    assert Confidante.load(str(p), cache=cache).config.a == 22
+    assert cache.misses == 2
+
+def test_cache_lru_bound(tmp_path):
+    cache = ConfigCache(maxsize=2)
+    for name in "abc":
+        p = tmp_path / f"{name}.json"
+        p.write_text("{}", encoding="utf-8")
+        cache.get(str(p), JsonLoader())
+    assert len(cache) == 2
+    cache.get(str(tmp_path / "a.json"), JsonLoader())
+    assert cache.misses == 4
+
+def test_cached_tree_copied_on_write(tmp_path):
+    p = tmp_path / "config.json"
+    p.write_text('{"db": {"host": "a"}}', encoding="utf-8")
+    cache = ConfigCache()
+    writer = Confidante.load(str(p), cache=cache)
+    reader = Confidante.load(str(p), cache=cache)
+    writer._set_nested_value(["db", "host"], "b")
+    assert writer.config.db.host == "b"
+    assert reader.config.db.host == "a"
+    assert Confidante.load(str(p), cache=cache).config.db.host == "a"
+
+def test_cache_keyed_on_loader(tmp_path):
+    p = tmp_path / "config.json"
+    p.write_text('{"db": {"host": "a"}}', encoding="utf-8")
+    cache = ConfigCache()
+    lazy = Confidante.load(str(p), cache=cache, lazy=True)
+    eager = Confidante.load(str(p), cache=cache)
+    assert isinstance(lazy._data, LazyMapping)
+    assert type(eager._data) is dict
+    assert cache.get(str(p), JsonLoader(backend="json")) is not cache.get(str(p), JsonLoader(lazy=True))
+    cache.invalidate(str(p))
+    assert len(cache) == 0
@@ -1,6 +1,9 @@
 import pytest
 from click.testing import CliRunner
+from cryptography.fernet import Fernet
 from confidante.cli import main
+from confidante.core import Confidante
+from confidante.loaders import loader_for
 
 
 def test_cli_load(tmp_path):
@@ -10,3 +13,49 @@ def test_cli_load(tmp_path):
     result = runner.invoke(main, ["load", str(p)])
     assert result.exit_code == 0
     assert '"a": 1' in result.output
+
+def test_cli_load_profile(tmp_path):
+    p = tmp_path / "config.json"
+    p.write_text('{"a":1}', encoding="utf-8")
+    result = CliRunner().invoke(main, ["load", "--profile", str(p)])
+    assert result.exit_code == 0
+    assert '"a": 1' in result.output
+    assert "parse" in result.output and "load.bytes" in result.output
+
+def test_cli_encrypt_many(tmp_path, symmetric_key):
+    p = tmp_path / "config.json"
+    p.write_text('{"db": {"host": "localhost"}}', encoding="utf-8")
+    secrets = tmp_path / "secrets.env"
+    secrets.write_text('# deploy secrets\ndb.password="s3cret"\nexport API__TOKEN=abc=123\n', encoding="utf-8")
+    runner = CliRunner()
+    result = runner.invoke(main, ["encrypt-many", str(p), "--from", str(secrets), "--key", symmetric_key])
+    assert result.exit_code == 0, result.output
+    assert "2 secrets" in result.output
+    conf = Confidante.load(str(p))
+    assert conf.config.db.password.startswith("ENC::")
+    conf.unlock(key=symmetric_key)
+    assert conf.config.db.password == "s3cret"
+    assert conf.config.API.TOKEN == "abc=123"
+    assert conf.config.db.host == "localhost"
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_cli_batch_tidy_validate(tmp_path, symmetric_key, jobs):
+    for i, name in enumerate(["a/one.json", "a/b/two.yaml", "three.toml"]):
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        loader_for(str(path)).dump({"b": {"z": 1, "a": ""}, "a": i}, str(path))
+        conf = Confidante.load(str(path))
+        conf.unlock(key=symmetric_key)
+        conf.encrypt_value(["secret"], f"value-{i}")
+        conf.save()
+    (tmp_path / "notes.txt").write_text("not a config", encoding="utf-8")
+    runner = CliRunner()
+    result = runner.invoke(main, ["tidy", str(tmp_path), "--jobs", jobs])
+    assert result.exit_code == 0, result.output
+    assert "3 of 3 files tidied" in result.output
+    result = runner.invoke(main, ["validate", str(tmp_path / "**" / "*.*"), "--key", symmetric_key, "--jobs", jobs])
+    assert result.exit_code == 0, result.output
+    assert "3 of 3 files valid" in result.output
+    result = runner.invoke(main, ["validate", str(tmp_path), "--key", Fernet.generate_key().decode(), "--jobs", jobs])
+    assert result.exit_code == 1
+    assert "0 of 3 files valid" in result.output
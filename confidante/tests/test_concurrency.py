@@ -0,0 +1,66 @@
+import asyncio
+import json
+import threading
+from confidante.core import Confidante
+from confidante.crypto.symmetric import SymmetricCrypto
+
+def test_tidy_publishes_new_tree(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text('{"b": 1, "a": {"z": 1, "y": 2}}', encoding="utf-8")
+    conf = Confidante.load(str(path))
+    conf.tidy()
+    assert conf.config._data is conf._data
+    assert list(conf.config.a._data) == ["y", "z"]
+
+def test_eager_unlock_leaves_published_snapshot_intact(tmp_path, symmetric_key):
+    path = tmp_path / "config.json"
+    token = SymmetricCrypto(symmetric_key).encrypt("s3cret")
+    path.write_text(json.dumps({"db": {"password": token, "host": "h"}, "other": {"x": 1}}), encoding="utf-8")
+    conf = Confidante.load(str(path))
+    before = conf.config
+    conf.unlock(key=symmetric_key, eager=True)
+    assert before.db.password == token
+    assert conf.config.db.password == "s3cret"
+    # Sections without secrets are shared between the two trees.
+    assert conf._data["other"] is before._data["other"]
+
+def test_readers_see_whole_updates(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text('{"a": {"x": 0}, "b": {"y": 0}, "c": {"z": 0}}', encoding="utf-8")
+    conf = Confidante.load(str(path))
+    shared_c = conf._data["c"]
+    stop = threading.Event()
+    torn = []
+
+    def reader():
+        while not stop.is_set():
+            snapshot = conf.config
+            if snapshot.a.x != snapshot.b.y:
+                torn.append((snapshot.a.x, snapshot.b.y))
+
+    readers = [threading.Thread(target=reader) for _ in range(4)]
+    for t in readers:
+        t.start()
+    for i in range(1, 2000):
+        conf._set_nested_values([(["a", "x"], i), (["b", "y"], i)])
+    stop.set()
+    for t in readers:
+        t.join()
+    assert torn == []
+    assert conf.config.a.x == 1999
+    assert conf._data["c"] is shared_c
+
+def test_async_load_and_unlock(tmp_path, symmetric_key):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"token": SymmetricCrypto(symmetric_key).encrypt("t")}), encoding="utf-8")
+
+    async def main():
+        conf = await Confidante.aload(str(path), cache=True)
+        await conf.aunlock(key=symmetric_key, eager=True)
+        path.write_text(json.dumps({"token": "plain"}), encoding="utf-8")
+        changed = await conf.areload()
+        return conf, changed
+
+    conf, changed = asyncio.run(main())
+    assert changed == ["token"]
+    assert conf.config.token == "plain"
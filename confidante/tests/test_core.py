@@ -1,3 +1,6 @@
+import json
+import subprocess
+import sys
 import pytest
 from confidante.core import Confidante
 from confidante.exceptions import ConfidanteError
@@ -12,3 +15,92 @@ def test_basic_access(tmp_path):
     config = Confidante.load(str(p))
     assert config.config.something.some_key == "some_value"
     assert config.config["something"]["some_key"] == "some_value"
+
+def _write_encrypted(tmp_path, key):
+    from confidante.crypto.symmetric import SymmetricCrypto
+    crypto = SymmetricCrypto(key)
+    data = {
+        "db": {"password": crypto.encrypt("dbpass"), "host": "localhost"},
+        "tokens": [crypto.encrypt("t1"), "plain"],
+    }
+    p = tmp_path / "secrets.json"
+    p.write_text(json.dumps(data), encoding="utf-8")
+    return str(p)
+
+def test_lazy_unlock_decrypts_on_access(tmp_path, symmetric_key):
+    config = Confidante.load(_write_encrypted(tmp_path, symmetric_key))
+    config.unlock(key=symmetric_key)
+    assert config._data["db"]["password"].startswith("ENC::")
+    assert config.config.db.password == "dbpass"
+    assert config.config["tokens"] == ["t1", "plain"]
+    assert config._data["db"]["password"].startswith("ENC::")
+
+def test_lazy_unlock_cache(tmp_path, symmetric_key, monkeypatch):
+    config = Confidante.load(_write_encrypted(tmp_path, symmetric_key))
+    config.unlock(key=symmetric_key)
+    calls = []
+    decrypt = config._crypto_backend.decrypt
+    monkeypatch.setattr(config._crypto_backend, "decrypt", lambda c: calls.append(c) or decrypt(c))
+    assert config.config.db.password == "dbpass"
+    assert config.config.db.password == "dbpass"
+    assert len(calls) == 1
+
+def test_eager_unlock(tmp_path, symmetric_key):
+    config = Confidante.load(_write_encrypted(tmp_path, symmetric_key))
+    config.unlock(key=symmetric_key, eager=True)
+    assert config._data["db"]["password"] == "dbpass"
+    assert config._data["tokens"] == ["t1", "plain"]
+
+def test_accessor_caches_children(tmp_path):
+    p = tmp_path / "config.json"
+    p.write_text('{"db": {"pool": {"size": 5}}}', encoding="utf-8")
+    config = Confidante.load(str(p))
+    assert config.config.db is config.config.db
+    assert config.config["db"].pool is config.config.db.pool
+    config._data["db"] = {"pool": {"size": 6}}
+    assert config.config.db.pool.size == 6
+
+def test_accessor_methods_shadow_keys(tmp_path):
+    p = tmp_path / "config.json"
+    p.write_text('{"get": 1, "_data": 2, "db": {"host": "a"}}', encoding="utf-8")
+    accessor = Confidante.load(str(p)).config
+    assert accessor.get("db.host") == "a"
+    assert accessor["get"] == 1 and accessor["_data"] == 2
+    with pytest.raises(AttributeError):
+        accessor.missing
+    assert not hasattr(accessor, "missing")
+
+def test_get_and_compile_path(tmp_path, symmetric_key):
+    config = Confidante.load(_write_encrypted(tmp_path, symmetric_key))
+    config.unlock(key=symmetric_key)
+    assert config.get("db.host") == "localhost"
+    assert config.get("db.password") == "dbpass"
+    assert config.get("tokens.0") == "t1"
+    assert config.get("db.missing", 42) == 42
+    assert config.get("db").host == "localhost"
+    getter = config.compile_path("db.password")
+    assert getter() == "dbpass"
+    with pytest.raises(KeyError):
+        config.compile_path("db.nope")()
+    assert config.compile_path("db.nope", None)() is None
+
+def test_compiled_path_follows_reload(tmp_path):
+    p = tmp_path / "config.json"
+    p.write_text('{"db": {"host": "a"}}', encoding="utf-8")
+    config = Confidante.load(str(p))
+    getter = config.compile_path("db.host")
+    assert getter() == "a"
+    p.write_text('{"db": {"host": "b"}}', encoding="utf-8")
+    config.reload()
+    assert getter() == "b"
+
+def test_imports_are_deferred(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text('{"a": 1}', encoding="utf-8")
+    code = (
+        "import sys, confidante, confidante.cli\n"
+        f"confidante.Confidante.load({str(path)!r}).get('a')\n"
+        "print(' '.join(m for m in ('cryptography', 'yaml', 'tomllib', 'tomli_w') if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.split() == []
@@ -1,8 +1,13 @@
+import base64
 import json
+from pathlib import Path
 from click.testing import CliRunner
 from confidante.cli import main
 from confidante.core import Confidante
-from confidante.crypto.symmetric import SymmetricCrypto
+from cryptography.fernet import Fernet
+from confidante.crypto import symmetric
+from confidante.crypto.symmetric import KdfParams, SymmetricCrypto, clear_key_cache, derive_key
+from confidante.crypto.asymmetric import AsymmetricCrypto
 
 def test_symmetric_crypto():
     key = "mysecretkey"
@@ -32,3 +37,84 @@ def test_cli_encrypt_key(tmp_path, symmetric_key, monkeypatch):
     conf = Confidante.load(str(config_path))
     conf.unlock(key=symmetric_key)
     assert conf.config.secret == "newsecret"
+
+RSA_PRIVATE_KEY = str(Path(__file__).parent / "data" / "keys" / "rsa_private_key.pem")
+
+def test_decrypt_many_threads():
+    crypto = AsymmetricCrypto(RSA_PRIVATE_KEY, envelope=False)
+    values = [f"secret-{i}" for i in range(8)]
+    tokens = [crypto.encrypt(v)[len("ENC::"):] for v in values]
+    assert crypto.decrypt_many(tokens, workers=4) == values
+    assert crypto.decrypt_many(tokens) == values
+
+def test_eager_unlock_workers(tmp_path):
+    crypto = AsymmetricCrypto(RSA_PRIVATE_KEY, envelope=False)
+    data = {"a": {"x": crypto.encrypt("one"), "y": [crypto.encrypt("two"), 3]}, "b": "plain"}
+    config_path = tmp_path / "rsa.json"
+    config_path.write_text(json.dumps(data), encoding="utf-8")
+    conf = Confidante.load(str(config_path))
+    conf.unlock(private_key_path=RSA_PRIVATE_KEY, eager=True, workers=4)
+    assert conf._data == {"a": {"x": "one", "y": ["two", 3]}, "b": "plain"}
+
+def test_envelope_encryption_roundtrip(tmp_path, monkeypatch):
+    config_path = tmp_path / "envelope.json"
+    legacy = AsymmetricCrypto(RSA_PRIVATE_KEY, envelope=False).encrypt("old")
+    config_path.write_text(json.dumps({"legacy": legacy}), encoding="utf-8")
+
+    conf = Confidante.load(str(config_path))
+    conf.unlock(private_key_path=RSA_PRIVATE_KEY)
+    big = "x" * 4096  # far beyond the RSA-OAEP payload limit
+    conf.encrypt_value(["cert"], big)
+    conf.encrypt_value(["token"], "abc")
+    conf.save()
+
+    saved = json.loads(config_path.read_text(encoding="utf-8"))
+    assert saved["cert"].startswith("ENC::env:")
+    assert saved["_confidante"]["envelope"]["key"]
+
+    conf = Confidante.load(str(config_path))
+    conf.unlock(private_key_path=RSA_PRIVATE_KEY)
+    rsa_calls = []
+    private_decrypt = conf._crypto_backend._private_key.decrypt
+    monkeypatch.setattr(conf._crypto_backend, "_private_key", type("K", (), {
+        "decrypt": lambda self, *a: rsa_calls.append(a) or private_decrypt(*a)})())
+    assert conf.config.cert == big
+    assert conf.config.token == "abc"
+    assert conf.config.legacy == "old"
+    # one unwrap for the data key, one for the legacy per-value token
+    assert len(rsa_calls) == 2
+
+FAST_KDF = KdfParams(n=2 ** 10)
+
+def test_passphrase_kdf_salt_in_metadata(tmp_path):
+    config_path = tmp_path / "kdf.json"
+    config_path.write_text("{}", encoding="utf-8")
+    conf = Confidante.load(str(config_path))
+    conf.unlock(key="correct horse", kdf=FAST_KDF)
+    conf.encrypt_value(["db", "password"], "hunter2")
+    conf.save()
+
+    saved = json.loads(config_path.read_text(encoding="utf-8"))
+    assert saved["_confidante"]["kdf"]["name"] == "scrypt"
+    assert saved["_confidante"]["kdf"]["n"] == 2 ** 10
+    assert saved["_confidante"]["kdf"]["salt"]
+
+    conf = Confidante.load(str(config_path))
+    conf.unlock(key="correct horse")
+    assert conf.config.db.password == "hunter2"
+
+def test_passphrase_reads_legacy_padded_tokens():
+    legacy = Fernet(base64.urlsafe_b64encode(b"mysecretkey".ljust(32, b"0")))
+    token = legacy.encrypt(b"old").decode("utf-8")
+    assert SymmetricCrypto("mysecretkey", kdf=FAST_KDF).decrypt(token) == "old"
+
+def test_derived_key_cache(monkeypatch):
+    clear_key_cache()
+    derived = []
+    real_scrypt = symmetric.Scrypt
+    monkeypatch.setattr(symmetric, "Scrypt", lambda **kw: derived.append(kw) or real_scrypt(**kw))
+    salt = b"0123456789abcdef"
+    first = derive_key("pass", salt, FAST_KDF)
+    assert derive_key("pass", salt, FAST_KDF) == first
+    assert derive_key("pass", b"fedcba9876543210", FAST_KDF) != first
+    assert len(derived) == 2
@@ -0,0 +1,88 @@
+import json
+
+from confidante.core import Confidante
+from confidante.edits import patch_file
+from confidante.loaders import loader_for
+
+def test_json_save_patches_changed_values(tmp_path):
+    path = tmp_path / "config.json"
+    text = '{\n    "z": {"port": 80, "host": "old"},\n    "a": [1, 2, 3]\n}\n'
+    path.write_text(text, encoding="utf-8")
+    conf = Confidante.load(str(path))
+    conf._set_nested_values([(["z", "host"], "new \"host\""), (["z", "port"], 8080)])
+    conf.save()
+    assert path.read_text(encoding="utf-8") == text.replace('"old"', '"new \\"host\\""').replace("80,", "8080,")
+
+def test_unchanged_save_leaves_file_alone(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text('{"a":1,   "b":2}', encoding="utf-8")
+    Confidante.load(str(path)).save()
+    assert path.read_text(encoding="utf-8") == '{"a":1,   "b":2}'
+
+def test_yaml_keeps_comments(tmp_path, symmetric_key):
+    path = tmp_path / "config.yaml"
+    text = "# service\ndb:\n  host: localhost  # primary\n  password: hunter2\nport: 80\n"
+    path.write_text(text, encoding="utf-8")
+    conf = Confidante.load(str(path))
+    conf.unlock(key=symmetric_key)
+    conf.encrypt_value(["db", "password"], "hunter2")
+    conf.save()
+    saved = path.read_text(encoding="utf-8")
+    token = conf._data["db"]["password"]
+    assert saved == text.replace("hunter2", token)
+    conf = Confidante.load(str(path))
+    conf.unlock(key=symmetric_key)
+    assert conf.config.db.password == "hunter2"
+
+def test_tidy_moves_members_with_their_comments(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text("b:\n  y: 1\n  x: 2\n# about a\na: 1\n", encoding="utf-8")
+    Confidante.load(str(path)).tidy()
+    assert path.read_text(encoding="utf-8") == "# about a\na: 1\nb:\n  x: 2\n  y: 1\n"
+    path = tmp_path / "config.json"
+    path.write_text('{\n  "b": {"d": 1, "c": [2]},\n  "a": true\n}', encoding="utf-8")
+    Confidante.load(str(path)).tidy()
+    assert path.read_text(encoding="utf-8") == '{\n  "a": true,\n  "b": {"c": [2], "d": 1}\n}'
+
+def test_toml_patches_scalars_and_falls_back(tmp_path):
+    path = tmp_path / "config.toml"
+    text = '# settings\nname = "app"  # shown\n\n[server]\nport = 80\nhosts = [\n  "a",\n]\n'
+    path.write_text(text, encoding="utf-8")
+    conf = Confidante.load(str(path))
+    conf._set_nested_value(["server", "port"], 8080)
+    conf.save()
+    assert path.read_text(encoding="utf-8") == text.replace("80", "8080")
+    # A key the file does not have yet means a full dump.
+    conf._set_nested_value(["server", "tls"], True)
+    conf.save()
+    assert "# settings" not in path.read_text(encoding="utf-8")
+    assert loader_for(str(path)).load(str(path))["server"] == {"port": 8080, "hosts": ["a"], "tls": True}
+
+def test_flow_items_are_quoted_for_flow_context(tmp_path):
+    # A plain scalar with ", " is fine in block context but splits a flow sequence.
+    path = tmp_path / "config.yaml"
+    path.write_text("items: [x, y]  # kept\n", encoding="utf-8")
+    loader = loader_for(str(path))
+    assert patch_file(str(path), loader, {"items": ["x", "a, b"]})
+    assert path.read_text(encoding="utf-8") == 'items: [x, "a, b"]  # kept\n'
+    assert loader.load(str(path)) == {"items": ["x", "a, b"]}
+
+def test_aliased_values_fall_back_to_a_full_dump(tmp_path):
+    # Editing the anchor in place would change the alias too.
+    path = tmp_path / "config.yaml"
+    path.write_text("a: &x 1\nb: *x\n", encoding="utf-8")
+    loader = loader_for(str(path))
+    assert not patch_file(str(path), loader, {"a": 2, "b": 1})
+    assert path.read_text(encoding="utf-8") == "a: &x 1\nb: *x\n"
+    conf = Confidante.load(str(path))
+    conf._set_nested_value(["a"], 2)
+    conf.save()
+    assert loader.load(str(path)) == {"a": 2, "b": 1}
+
+def test_full_dump_on_request(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text('{"a":1}', encoding="utf-8")
+    conf = Confidante.load(str(path))
+    conf.save(incremental=False)
+    assert json.loads(path.read_text(encoding="utf-8")) == {"a": 1}
+    assert path.read_text(encoding="utf-8") != '{"a":1}'
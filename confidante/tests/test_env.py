@@ -1,6 +1,8 @@
 import os
 import pytest
 from confidante.core import Confidante
+from confidante.environment import env_overrides
+from confidante.exceptions import ConfidanteError
 
 def test_env_overrides(tmp_path, monkeypatch):
     # copy env_overrides.json into tmp_path
@@ -12,4 +14,39 @@ def test_env_overrides(tmp_path, monkeypatch):
 
     conf = Confidante.load(str(config_path), merge_env_vars=True)
     print(conf.config._data)
-    assert conf.config.service.debug == "true"  # note: env vars produce strings
+    assert conf.config.service.debug is True  # coerced to the type of the existing value
+
+def test_env_coercion_and_case_matching(tmp_path, monkeypatch):
+    config_path = tmp_path / "config.json"
+    config_path.write_text('{"Server": {"port": 8000, "ratio": 0.5, "hosts": ["a"], "name": "x"}}', encoding="utf-8")
+    monkeypatch.setenv("CONFIDANTE__server__PORT", "8080")
+    monkeypatch.setenv("CONFIDANTE__server__ratio", "2")
+    monkeypatch.setenv("CONFIDANTE__server__hosts", '["b", "c"]')
+    monkeypatch.setenv("CONFIDANTE__server__new_key", "42")
+
+    conf = Confidante.load(str(config_path), merge_env_vars=True)
+    assert conf.config.Server.port == 8080
+    assert conf.config.Server.ratio == 2.0
+    assert conf.config.Server.hosts == ["b", "c"]
+    assert conf.config.Server.new_key == "42"
+    assert "server" not in conf.config._data
+
+def test_env_invalid_value(tmp_path, monkeypatch):
+    config_path = tmp_path / "config.json"
+    config_path.write_text('{"port": 8000}', encoding="utf-8")
+    monkeypatch.setenv("CONFIDANTE__port", "eighty")
+    with pytest.raises(ConfidanteError):
+        Confidante.load(str(config_path), merge_env_vars=True)
+
+def test_env_index_rebuilt_on_change(monkeypatch):
+    monkeypatch.setenv("IDXTEST__a", "1")
+    assert env_overrides("IDXTEST") == [(["a"], "1")]
+    assert env_overrides("IDXTEST") is env_overrides("IDXTEST")
+    monkeypatch.setenv("IDXTEST__a", "2")
+    assert env_overrides("IDXTEST") == [(["a"], "2")]
+
+def test_env_prefix_containing_separator(monkeypatch):
+    monkeypatch.setenv("MY__APP__db__host", "h")
+    monkeypatch.setenv("MY__OTHER__x", "1")
+    assert env_overrides("MY__APP") == [(["db", "host"], "h")]
+    assert (["APP", "db", "host"], "h") in env_overrides("MY")
@@ -0,0 +1,53 @@
+from confidante.core import Confidante
+from confidante.index import KeyIndex
+
+DATA = {
+    "services": {
+        "api": {"timeout": 5, "token": "ENC::abc"},
+        "web": {"timeout": 10, "hosts": ["a", "b"]},
+    },
+    "servicesx": {"timeout": 1},
+    "empty": {},
+}
+
+def test_flatten_and_lookup():
+    index = KeyIndex(DATA)
+    assert index["services.api.timeout"] == 5
+    assert index["services.web.hosts.1"] == "b"
+    assert index["empty"] == {}
+    assert index.encrypted == {"services.api.token"}
+
+def test_prefix_and_glob():
+    index = KeyIndex(DATA)
+    assert index.prefix("services.web") == ["services.web.hosts.0", "services.web.hosts.1", "services.web.timeout"]
+    assert "servicesx.timeout" not in index.prefix("services")
+    assert index.glob("services.*.timeout") == ["services.api.timeout", "services.web.timeout"]
+    assert index.glob("**.timeout") == ["services.api.timeout", "services.web.timeout", "servicesx.timeout"]
+
+def test_incremental_updates():
+    index = KeyIndex(DATA)
+    index.set(["services", "web"], {"timeout": 3, "secret": "ENC::x"})
+    assert index.prefix("services.web") == ["services.web.secret", "services.web.timeout"]
+    assert index.encrypted == {"services.api.token", "services.web.secret"}
+    index.set(["servicesx", "timeout", "connect"], 2)
+    assert "servicesx.timeout" not in index
+    assert index["servicesx.timeout.connect"] == 2
+    index.remove("services")
+    assert index.prefix("services") == []
+    assert index.encrypted == set()
+
+def test_confidante_index_tracks_mutations(tmp_path, symmetric_key, monkeypatch):
+    p = tmp_path / "config.json"
+    p.write_text('{"db": {"host": "a"}}', encoding="utf-8")
+    conf = Confidante.load(str(p))
+    before = conf.index
+    conf.unlock(key=symmetric_key)
+    conf.encrypt_value(["db", "password"], "pw")
+    assert conf.index.encrypted == {"db.password"}
+    monkeypatch.setenv("CONFIDANTE__db__port", "5432")
+    conf.apply_env()
+    index = conf.index
+    assert index["db.port"] == "5432"
+    assert KeyIndex(conf._data).prefix("") == index.prefix("")
+    # Indexes handed out earlier are snapshots, like the trees.
+    assert before.prefix("") == ["db.host"] and not before.encrypted
@@ -0,0 +1,48 @@
+import json
+
+from confidante import instrument
+from confidante.cache import ConfigCache
+from confidante.core import Confidante
+from confidante.crypto.symmetric import SymmetricCrypto
+from confidante.instrument import Profile
+
+def test_disabled_without_hooks():
+    assert instrument.hooks == []
+    assert instrument.start() is None
+
+def test_hooks_receive_phases_and_counts(tmp_path, symmetric_key, monkeypatch):
+    backend = SymmetricCrypto(symmetric_key)
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"a": backend.encrypt("x"), "b": backend.encrypt("y"), "c": 1}), encoding="utf-8")
+    monkeypatch.setenv("CONFIDANTE__C", "2")
+    seen = []
+    remove = instrument.add_hook(seen.append)
+    try:
+        conf = Confidante.load(str(path), merge_env_vars=True)
+        conf.unlock(key=symmetric_key, eager=True)
+        conf.save()
+    finally:
+        remove()
+    timers = [m.name for m in seen if m.kind == "timer"]
+    assert timers == ["load.parse", "load.merge_env", "load", "unlock.backend", "unlock.metadata",
+                      "decrypt", "unlock", "save"]
+    counters = {m.name: m.value for m in seen if m.kind == "counter"}
+    assert counters["decrypt.values"] == 2
+    assert counters["load.bytes"] > 0 and counters["save.bytes"] > 0
+    assert instrument.hooks == []
+
+def test_profile_report(tmp_path, symmetric_key):
+    backend = SymmetricCrypto(symmetric_key)
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"a": backend.encrypt("x")}), encoding="utf-8")
+    cache = ConfigCache()
+    with Profile() as profile:
+        for _ in range(4):
+            conf = Confidante.load(str(path), cache=cache)
+        conf.unlock(key=symmetric_key)
+        assert conf.config.a == "x"
+    assert profile.timers["load"][0] == 4
+    assert profile.counters["decrypt.values"] == 1
+    assert profile.hit_rates() == {"cache": 0.75}
+    report = profile.report()
+    assert "  parse" in report and "75%" in report
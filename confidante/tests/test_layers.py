@@ -0,0 +1,108 @@
+import json
+import pytest
+from confidante.core import Confidante
+from confidante.crypto.asymmetric import AsymmetricCrypto
+from confidante.crypto.base import METADATA_KEY
+from confidante.crypto.symmetric import KdfParams, SymmetricCrypto
+from confidante.exceptions import ConfidanteError
+from confidante.environment import merge_env
+from confidante.layers import EnvLayer, MergeCache
+from confidante.tests.test_crypto import RSA_PRIVATE_KEY
+from confidante.utils import deep_merge
+
+def test_deep_merge_shares_untouched_subtrees():
+    base = {"db": {"host": "a", "pool": {"size": 5}}, "cache": {"ttl": 1}}
+    overlay = {"db": {"host": "b"}}
+    merged = deep_merge(base, overlay)
+    assert merged == {"db": {"host": "b", "pool": {"size": 5}}, "cache": {"ttl": 1}}
+    assert merged["cache"] is base["cache"]
+    assert merged["db"]["pool"] is base["db"]["pool"]
+    assert base["db"]["host"] == "a"
+
+def test_merge_env_does_not_modify_source(monkeypatch):
+    config = {"service": {"debug": "false", "url": "x"}}
+    monkeypatch.setenv("CONFIDANTE__service__debug", "true")
+    merged = merge_env(config)
+    assert merged["service"] == {"debug": "true", "url": "x"}
+    assert config["service"]["debug"] == "false"
+
+def _write(path, data):
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return str(path)
+
+def test_load_layers(tmp_path, monkeypatch):
+    base = _write(tmp_path / "base.json", {"db": {"host": "localhost", "port": 5432}, "debug": False})
+    prod = _write(tmp_path / "prod.json", {"db": {"host": "db.prod"}})
+    monkeypatch.setenv("APP__db__user", "svc")
+    conf = Confidante.load_layers([base, prod, {"debug": True}, EnvLayer("APP")], merge_cache=MergeCache())
+    assert conf.config.db.host == "db.prod"
+    assert conf.config.db.port == 5432
+    assert conf.config.db.user == "svc"
+    assert conf.config.debug is True
+
+def test_layer_memoization(tmp_path):
+    base = _write(tmp_path / "base.json", {"a": {"x": 1}, "b": {"y": 2}})
+    env = _write(tmp_path / "env.json", {"a": {"x": 10}})
+    host = tmp_path / "host.json"
+    _write(host, {"b": {"y": 20}})
+    cache = MergeCache()
+    first = Confidante.load_layers([base, env, str(host)], merge_cache=cache)
+    assert cache.merges == 3
+    again = Confidante.load_layers([base, env, str(host)], merge_cache=cache)
+    assert cache.merges == 3
+    assert again._data is first._data
+
+    _write(host, {"b": {"y": 30}, "c": 1})
+    changed = Confidante.load_layers([base, env, str(host)], merge_cache=cache)
+    assert cache.merges == 4  # only the host overlay is merged again
+    assert changed.config.b.y == 30
+    assert changed._data["a"] is first._data["a"]
+
+def test_layered_config_copied_on_write(tmp_path):
+    base = _write(tmp_path / "base.json", {"a": {"x": 1}})
+    cache = MergeCache()
+    conf = Confidante.load_layers([base, {"a": {"y": 2}}], merge_cache=cache)
+    conf._set_nested_value(["a", "x"], 99)
+    assert Confidante.load_layers([base, {"a": {"y": 2}}], merge_cache=cache).config.a.x == 1
+
+def _write_secrets(path, backend, secrets, extra=None):
+    # One file encrypted with its own metadata, as encrypt_value leaves it.
+    data = dict(extra or {})
+    for key, value in secrets.items():
+        data[key] = backend.encrypt(value)
+    data[METADATA_KEY] = backend.dump_metadata()
+    return _write(path, data)
+
+@pytest.mark.parametrize("eager", [True, False])
+@pytest.mark.parametrize("kind", ["passphrase", "rsa"])
+def test_layers_decrypt_with_their_own_metadata(tmp_path, monkeypatch, kind, eager):
+    def backend():
+        if kind == "rsa":
+            return AsymmetricCrypto(RSA_PRIVATE_KEY)
+        return SymmetricCrypto("correct horse", kdf=KdfParams(n=2 ** 10))
+    base = _write_secrets(tmp_path / "base.json", backend(), {"db_password": "base-secret"}, {"port": 1})
+    over = _write_secrets(tmp_path / "over.json", backend(), {"api_token": "over-secret"})
+    monkeypatch.setenv("APP__user", "svc")
+    conf = Confidante.load_layers([base, over, EnvLayer("APP")], merge_cache=MergeCache())
+    if kind == "rsa":
+        conf.unlock(private_key_path=RSA_PRIVATE_KEY, eager=eager)
+    else:
+        conf.unlock(key="correct horse", eager=eager)
+    assert conf.config.db_password == "base-secret"
+    assert conf.config.api_token == "over-secret"
+    assert conf.config.user == "svc"
+
+    _write_secrets(tmp_path / "base.json", backend(), {"db_password": "rotated"}, {"port": 1})
+    conf.reload()
+    assert conf.config.db_password == "rotated"
+    assert conf.config.api_token == "over-secret"
+
+def test_layered_config_is_not_saved(tmp_path):
+    base = _write(tmp_path / "base.json", {"port": 1})
+    over = _write(tmp_path / "over.json", {"host": "a"})
+    conf = Confidante.load_layers([base, over], merge_cache=MergeCache())
+    with pytest.raises(ConfidanteError):
+        conf.save()
+    with pytest.raises(ConfidanteError):
+        conf.tidy()
+    assert json.loads((tmp_path / "over.json").read_text(encoding="utf-8")) == {"host": "a"}
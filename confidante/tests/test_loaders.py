@@ -1,5 +1,10 @@
+import json
+import os
 import pytest
 from confidante.core import Confidante
+from confidante.exceptions import ConfidanteError
+from confidante.loaders import register_loader
+from confidante.loaders import json_loader, registry, yaml_loader
 from confidante.loaders.json_loader import JsonLoader
 from confidante.loaders.toml_loader import TomlLoader
 from confidante.loaders.yaml_loader import YamlLoader
@@ -29,3 +34,139 @@ app:
     conf = Confidante.load(str(config_path))
     assert conf.config.app.name == "test_app_yaml"
     assert conf.config.app.settings.timeout == 60
+
+TRICKY = {
+    "strings": {"brace": "a}b{c", "bracket": "[x]", "quote": 'say "hi" \\ done', "unicode": "naïve ✓"},
+    "deep": {"a": {"b": {"c": {"d": {"e": {"f": [1, {"g": None}]}}}}}},
+    "empty": {"obj": {}, "arr": []},
+    "numbers": [1, -2.5, 1e10, True, False, None],
+    "esc\"aped": 1,
+}
+
+def test_lazy_json_matches_json(tmp_path):
+    p = tmp_path / "tricky.json"
+    for indent in (None, 2):
+        p.write_text(json.dumps(TRICKY, indent=indent, ensure_ascii=False), encoding="utf-8")
+        data = JsonLoader(lazy=True).load(str(p))
+        assert data.to_dict() == TRICKY
+        assert data["deep"]["a"]["b"]["c"]["d"]["e"]["f"][1] == {"g": None}
+
+def test_lazy_json_decodes_accessed_members_only(tmp_path):
+    p = tmp_path / "big.json"
+    p.write_text(json.dumps({"routes": {f"r{i}": {"t": i} for i in range(100)}, "db": {"pool": {"size": 5}}}), encoding="utf-8")
+    conf = Confidante.load(str(p), lazy=True)
+    assert conf.config.db.pool.size == 5
+    assert list(conf._data._values) == ["db"]
+
+def test_lazy_json_save(tmp_path):
+    p = tmp_path / "config.json"
+    p.write_text('{"a": {"b": 1}, "c": [1, 2]}', encoding="utf-8")
+    conf = Confidante.load(str(p), lazy=True)
+    conf._set_nested_value(["a", "b"], 2)
+    conf.save()
+    assert json.loads(p.read_text(encoding="utf-8")) == {"a": {"b": 2}, "c": [1, 2]}
+
+def test_lazy_json_non_object_root(tmp_path):
+    p = tmp_path / "list.json"
+    p.write_text("[1, 2]", encoding="utf-8")
+    assert JsonLoader(lazy=True).load(str(p)) == [1, 2]
+
+@pytest.mark.parametrize("suffix, loader", [(".json", JsonLoader()), (".yaml", YamlLoader()), (".toml", TomlLoader())])
+def test_dump_roundtrip(tmp_path, suffix, loader):
+    path = str(tmp_path / f"config{suffix}")
+    data = {"app": {"name": "x", "ports": [1, 2]}, "debug": True}
+    loader.dump(data, path)
+    assert loader.load(path) == data
+    assert [p.name for p in tmp_path.iterdir()] == [f"config{suffix}"]
+
+def test_dump_failure_keeps_original(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text('{"a": 1}', encoding="utf-8")
+    path.chmod(0o640)
+    with pytest.raises(TypeError):
+        JsonLoader().dump({"a": object()}, str(path))
+    assert path.read_text(encoding="utf-8") == '{"a": 1}'
+    assert [p.name for p in tmp_path.iterdir()] == ["config.json"]
+    JsonLoader().dump({"a": 2}, str(path))
+    assert path.stat().st_mode & 0o777 == 0o640
+
+def test_dump_writes_through_symlink(tmp_path):
+    target = tmp_path / "real.json"
+    target.write_text('{"a": 1}', encoding="utf-8")
+    link = tmp_path / "config.json"
+    link.symlink_to(target)
+    JsonLoader().dump({"a": 2}, str(link))
+    assert link.is_symlink()
+    assert json.loads(target.read_text(encoding="utf-8")) == {"a": 2}
+
+def test_new_file_mode_follows_umask(tmp_path):
+    old = os.umask(0o027)
+    try:
+        JsonLoader().dump({"a": 1}, str(tmp_path / "config.json"))
+    finally:
+        os.umask(old)
+    assert (tmp_path / "config.json").stat().st_mode & 0o777 == 0o640
+
+def test_save_backup(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text('{"a": 1}', encoding="utf-8")
+    conf = Confidante.load(str(path))
+    conf._set_nested_value(["a"], 2)
+    conf.save(backup=True)
+    assert json.loads((tmp_path / "config.json.bak").read_text()) == {"a": 1}
+    assert json.loads(path.read_text()) == {"a": 2}
+
+@pytest.mark.parametrize("backend", json_loader.BACKENDS)
+def test_json_backends(tmp_path, backend):
+    path = str(tmp_path / "config.json")
+    data = {"name": "caf\u00e9", "big": 2 ** 70, "ratio": 0.5, "items": [1, None, True]}
+    loader = JsonLoader(backend=backend)
+    loader.dump(data, path)
+    assert loader.load(path) == data
+    assert JsonLoader(lazy=True, backend=backend).load(path)["big"] == 2 ** 70
+    assert json.loads((tmp_path / "config.json").read_text(encoding="utf-8")) == data
+
+def test_json_backend_fallbacks(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text('{"limit": NaN}', encoding="utf-8")
+    for backend in json_loader.BACKENDS:
+        assert JsonLoader(backend=backend).load(str(path))["limit"] != 0
+    with pytest.raises(ConfidanteError):
+        JsonLoader(backend="simdjson")
+
+@pytest.mark.parametrize("backend", yaml_loader.BACKENDS)
+def test_yaml_backends(tmp_path, backend):
+    path = str(tmp_path / "config.yaml")
+    data = {"app": {"name": "x", "ports": [1, 2]}, "debug": True}
+    loader = YamlLoader(backend=backend)
+    loader.dump(data, path)
+    assert loader.load(path) == data
+    assert YamlLoader(backend="pyyaml").load(path) == data
+
+def test_preferred_backends(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text('{"a": 1}', encoding="utf-8")
+    assert Confidante.load(str(path)).parser_backend == json_loader.BACKENDS[0]
+    assert YamlLoader().backend == yaml_loader.BACKENDS[0]
+
+def test_register_loader(tmp_path, monkeypatch):
+    monkeypatch.setattr(registry, "_registry", dict(registry._registry))
+    class IniLoader:
+        backend = "configparser"
+        def load(self, path):
+            import configparser
+            parser = configparser.ConfigParser()
+            parser.read(path)
+            return {section: dict(parser[section]) for section in parser.sections()}
+        def dump(self, data, path):
+            raise NotImplementedError
+
+    register_loader(".ini", lambda lazy=False: IniLoader())
+    path = tmp_path / "config.ini"
+    path.write_text("[db]\nhost = localhost\n", encoding="utf-8")
+    conf = Confidante.load(str(path))
+    assert conf.config.db.host == "localhost"
+    assert conf.parser_backend == "configparser"
+    (tmp_path / "config.xml").write_text("", encoding="utf-8")
+    with pytest.raises(ConfidanteError):
+        Confidante.load(str(tmp_path / "config.xml"))
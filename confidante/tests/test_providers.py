@@ -0,0 +1,117 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from confidante.core import Confidante
+from confidante.exceptions import ConfidanteError
+from confidante.providers import SecretCache, resolve_references
+from confidante.providers.file import FileProvider
+from confidante.providers.vault import VaultProvider
+
+SECRETS = {
+    "secret/data/db": {"username": "app", "password": "hunter2"},
+    "secret/data/api": {"token": "abc"},
+}
+
+class FakeVault(BaseHTTPRequestHandler):
+    # KV version 2 stand-in that records requests and connections.
+    protocol_version = "HTTP/1.1"
+    requests: list = []
+    connections: set = set()
+
+    def do_GET(self):
+        FakeVault.requests.append((self.path, self.headers.get("X-Vault-Token")))
+        FakeVault.connections.add(self.client_address)
+        location = self.path[len("/v1/"):]
+        if location in SECRETS:
+            status, payload = 200, {"data": {"data": SECRETS[location], "metadata": {"version": 1}}}
+        else:
+            status, payload = 404, {"errors": []}
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def vault():
+    FakeVault.requests, FakeVault.connections = [], set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeVault)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    provider = VaultProvider(address=f"http://127.0.0.1:{server.server_port}", token="t0ken", pool_size=2)
+    yield provider
+    provider.close()
+    server.shutdown()
+    server.server_close()
+
+def test_fields_of_one_secret_are_fetched_once(vault):
+    refs = ["REF::vault://secret/data/db#username", "REF::vault://secret/data/db#password",
+            "REF::vault://secret/data/api#token"]
+    resolved = resolve_references(refs, providers={"vault": vault}, cache=None)
+    assert resolved == dict(zip(refs, ["app", "hunter2", "abc"]))
+    assert sorted(path for path, _ in FakeVault.requests) == ["/v1/secret/data/api", "/v1/secret/data/db"]
+    assert {token for _, token in FakeVault.requests} == {"t0ken"}
+
+def test_connections_are_reused(vault):
+    for _ in range(5):
+        resolve_references(["REF::vault://secret/data/db#password"], providers={"vault": vault}, cache=None)
+    assert len(FakeVault.requests) == 5
+    assert vault.pool.opened == 1
+    assert len(FakeVault.connections) == 1
+
+def test_cache_expires_and_evicts(vault):
+    cache = SecretCache(maxsize=1, ttl=60)
+    ref = "REF::vault://secret/data/db#password"
+    for _ in range(3):
+        resolve_references([ref], providers={"vault": vault}, cache=cache)
+    assert len(FakeVault.requests) == 1 and cache.hits == 2
+    resolve_references(["REF::vault://secret/data/api#token"], providers={"vault": vault}, cache=cache)
+    resolve_references([ref], providers={"vault": vault}, cache=cache)
+    assert len(FakeVault.requests) == 3
+    expired = SecretCache(ttl=0)
+    resolve_references([ref], providers={"vault": vault}, cache=expired)
+    resolve_references([ref], providers={"vault": vault}, cache=expired)
+    assert len(FakeVault.requests) == 5
+
+def test_missing_secret_and_field(vault):
+    with pytest.raises(ConfidanteError, match="Secret not found"):
+        resolve_references(["REF::vault://secret/data/nope#x"], providers={"vault": vault}, cache=None)
+    with pytest.raises(ConfidanteError, match="no field 'x'"):
+        resolve_references(["REF::vault://secret/data/db#x"], providers={"vault": vault}, cache=None)
+    with pytest.raises(ConfidanteError, match="add #field"):
+        resolve_references(["REF::vault://secret/data/db"], providers={"vault": vault}, cache=None)
+
+def test_file_provider(tmp_path):
+    secret = tmp_path / "db_password"
+    secret.write_text("s3cret\n", encoding="utf-8")
+    ref = f"REF::file://{secret}"
+    assert resolve_references([ref], cache=None) == {ref: "s3cret"}
+    assert FileProvider().fetch(str(secret)) == "s3cret"
+    with pytest.raises(ConfidanteError, match="not found"):
+        resolve_references([f"REF::file://{tmp_path}/missing"], cache=None)
+
+def test_confidante_resolves_without_saving_secrets(tmp_path, vault):
+    path = tmp_path / "config.json"
+    raw = {"db": {"user": "REF::vault://secret/data/db#username", "password": "REF::vault://secret/data/db#password"},
+           "hosts": ["REF::vault://secret/data/api#token"]}
+    path.write_text(json.dumps(raw), encoding="utf-8")
+    conf = Confidante.load(str(path))
+    assert conf.config.db.password == raw["db"]["password"]
+    conf.resolve_references(providers={"vault": vault}, cache=False)
+    assert conf.config.db.password == "hunter2"
+    assert conf.get("hosts") == ["abc"]
+    assert len(FakeVault.requests) == 2
+    conf.save()
+    assert json.loads(path.read_text(encoding="utf-8")) == raw
+
+    raw["db"]["user"] = "REF::vault://secret/data/api#token"
+    path.write_text(json.dumps(raw), encoding="utf-8")
+    assert conf.reload() == ["db.user"]
+    assert conf.config.db.user == "abc"
@@ -0,0 +1,81 @@
+from click.testing import CliRunner
+from cryptography.fernet import Fernet
+from confidante.cli import main
+from confidante.core import Confidante
+from confidante.crypto.asymmetric import AsymmetricCrypto
+from confidante.crypto.symmetric import SymmetricCrypto
+from confidante.rekey import rekey_file
+from confidante.tests.test_crypto import FAST_KDF, RSA_PRIVATE_KEY
+
+TEMPLATE = """# managed by deploy
+db:
+  host: localhost   # primary
+  password: {password}
+api_token: '{token}'
+"""
+
+def _write_yaml(path, backend):
+    password, token = backend.encrypt("s3cret"), backend.encrypt("t0ken")
+    text = TEMPLATE.format(password=password, token=token)
+    metadata = backend.dump_metadata()
+    if metadata:
+        salt = metadata["kdf"]["salt"]
+        text += f"_confidante:\n  kdf: {{name: scrypt, n: {FAST_KDF.n}, r: 8, p: 1, salt: '{salt}'}}\n"
+    path.write_text(text, encoding="utf-8")
+    return text
+
+def test_rekey_preserves_formatting(tmp_path):
+    path = tmp_path / "config.yaml"
+    old_key, new_key = Fernet.generate_key().decode(), Fernet.generate_key().decode()
+    before = _write_yaml(path, SymmetricCrypto(old_key))
+    assert rekey_file(str(path), SymmetricCrypto(old_key), SymmetricCrypto(new_key), workers=2) == 2
+    after = path.read_text(encoding="utf-8")
+    assert after.splitlines()[:3] == before.splitlines()[:3]
+    assert len(after.splitlines()) == len(before.splitlines())
+    conf = Confidante.load(str(path))
+    conf.unlock(key=new_key)
+    assert conf.config.db.password == "s3cret"
+    assert conf.config.api_token == "t0ken"
+    # Already under the new key: nothing to do, so reruns are safe.
+    assert rekey_file(str(path), SymmetricCrypto(old_key), SymmetricCrypto(new_key)) == 0
+    assert path.read_text(encoding="utf-8") == after
+
+def test_rekey_passphrase_metadata_in_place(tmp_path):
+    path = tmp_path / "config.yaml"
+    old = SymmetricCrypto("old passphrase", kdf=FAST_KDF)
+    before = _write_yaml(path, old)
+    rekey_file(str(path), SymmetricCrypto("old passphrase"), SymmetricCrypto("new passphrase", kdf=FAST_KDF))
+    after = path.read_text(encoding="utf-8")
+    assert "# primary" in after and after.count("\n") == before.count("\n")
+    assert old.dump_metadata()["kdf"]["salt"] not in after
+    conf = Confidante.load(str(path))
+    conf.unlock(key="new passphrase")
+    assert conf.config.db.password == "s3cret"
+
+def test_confidante_rekey_to_envelope(tmp_path):
+    path = tmp_path / "config.json"
+    key = Fernet.generate_key().decode()
+    path.write_text('{"plain": "x", "secret": "%s"}' % SymmetricCrypto(key).encrypt("v"), encoding="utf-8")
+    conf = Confidante.load(str(path))
+    conf.unlock(key=key, eager=True)
+    assert conf.rekey(SymmetricCrypto(key), AsymmetricCrypto(RSA_PRIVATE_KEY)) == 1
+    assert conf.config.secret == "v"
+    assert "_confidante.envelope.key" in conf.index
+    fresh = Confidante.load(str(path))
+    assert fresh.config.plain == "x"
+    fresh.unlock(private_key_path=RSA_PRIVATE_KEY)
+    assert fresh.config.secret == "v"
+
+def test_cli_rekey_batch(tmp_path):
+    old_key, new_key = Fernet.generate_key().decode(), Fernet.generate_key().decode()
+    for i in range(3):
+        _write_yaml(tmp_path / f"service{i}.yaml", SymmetricCrypto(old_key))
+    runner = CliRunner()
+    args = ["rekey", str(tmp_path), "--jobs", "2", "--old-key", old_key, "--new-key", new_key]
+    result = runner.invoke(main, args)
+    assert result.exit_code == 0, result.output
+    assert "3 of 3 files rekeyed" in result.output
+    assert "6 values" in result.output
+    result = runner.invoke(main, args)
+    assert result.exit_code == 0
+    assert result.output.count("up to date") == 3
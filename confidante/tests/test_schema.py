@@ -0,0 +1,111 @@
+import json
+import pytest
+from click.testing import CliRunner
+from confidante.cli import main
+from confidante.core import Confidante
+from confidante.exceptions import ConfidanteError, SchemaValidationError
+from confidante.schema import Schema, schema_errors, validate_schema
+
+SCHEMA = {
+    "type": "object",
+    "required": ["db", "services"],
+    "properties": {
+        "db": {
+            "type": "object",
+            "required": ["host", "password"],
+            "additionalProperties": False,
+            "properties": {
+                "host": {"type": "string", "minLength": 1},
+                "port": {"type": "integer", "minimum": 1, "maximum": 65535},
+                "password": {"secret": True},
+            },
+        },
+        "services": {"type": "array", "items": {"$ref": "#/definitions/service"}},
+        "mode": {"enum": ["dev", "prod"]},
+    },
+    "definitions": {
+        "service": {"type": "object", "required": ["name"], "properties": {"name": {"type": "string", "pattern": "^[a-z]+$"}}},
+    },
+}
+
+VALID = {
+    "db": {"host": "localhost", "port": 5432, "password": "ENC::gAAAA"},
+    "services": [{"name": "api"}, {"name": "worker"}],
+    "mode": "prod",
+}
+
+def test_valid_config():
+    assert schema_errors(VALID, SCHEMA) == []
+    assert validate_schema(VALID, SCHEMA) is True
+    assert validate_schema({"mode": "x"}, SCHEMA) is False
+
+def test_reports_every_error_with_dotted_paths():
+    data = {
+        "db": {"host": "", "port": True, "password": "plaintext", "user": "x"},
+        "services": [{"name": "api"}, {"name": "Bad1"}, {}],
+        "mode": "staging",
+    }
+    assert sorted(Schema(SCHEMA).errors(data)) == [
+        ("db.host", "expected at least 1 characters"),
+        ("db.password", "secret must be encrypted (ENC::) or a reference (REF::)"),
+        ("db.port", "expected integer, got boolean"),
+        ("db.user", "additional property is not allowed"),
+        ("mode", "expected one of ['dev', 'prod']"),
+        ("services.1.name", "does not match '^[a-z]+$'"),
+        ("services.2.name", "required property is missing"),
+    ]
+
+def test_combinators_and_numbers():
+    schema = Schema({"anyOf": [{"type": "integer", "exclusiveMinimum": 0}, {"type": "string"}]})
+    assert schema.errors(5) == [] and schema.errors("x") == []
+    assert schema.errors(0) == [("", "does not match any of the allowed schemas")]
+    assert Schema({"enum": [1]}).errors(1.0) == []
+    assert Schema({"enum": [1]}).errors(True) != []
+    with pytest.raises(ConfidanteError):
+        Schema({"type": "text"})
+    with pytest.raises(ConfidanteError):
+        Schema({"$ref": "#/definitions/missing"})
+
+def test_load_and_reload_with_schema(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(VALID), encoding="utf-8")
+    conf = Confidante.load(str(path), schema=SCHEMA, lazy=True)
+    assert conf.config.db.port == 5432
+    path.write_text(json.dumps({**VALID, "db": {**VALID["db"], "port": "5432"}}), encoding="utf-8")
+    with pytest.raises(SchemaValidationError) as info:
+        conf.reload()
+    assert info.value.errors == [("db.port", "expected integer, got string")]
+    assert conf.config.db.port == 5432
+    with pytest.raises(SchemaValidationError):
+        Confidante.load(str(path), schema=SCHEMA)
+
+def test_closed_schema_accepts_encrypted_file(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"token": "x"}), encoding="utf-8")
+    conf = Confidante.load(str(path))
+    conf.unlock(key="a passphrase")
+    conf.encrypt_value(["token"], "secret")
+    conf.save()
+    schema = {"type": "object", "additionalProperties": False, "maxProperties": 1,
+              "properties": {"token": {"secret": True}}}
+    assert "_confidante" in json.loads(path.read_text(encoding="utf-8"))
+    assert Schema(schema).errors(Confidante.load(str(path))._data) == []
+    Confidante.load(str(path), schema=schema)
+    assert Schema(schema).errors({"token": "ENC::x", "other": 1}) != []
+
+def test_cli_validate_schema(tmp_path):
+    schema = tmp_path / "schema.json"
+    schema.write_text(json.dumps(SCHEMA), encoding="utf-8")
+    configs = tmp_path / "configs"
+    configs.mkdir()
+    (configs / "good.json").write_text(json.dumps(VALID), encoding="utf-8")
+    (configs / "bad.json").write_text(json.dumps({**VALID, "mode": "qa", "services": 1}), encoding="utf-8")
+    runner = CliRunner()
+    result = runner.invoke(main, ["validate", str(configs / "good.json"), "--schema", str(schema)])
+    assert result.exit_code == 0
+    assert "Configuration is valid." in result.output
+    result = runner.invoke(main, ["validate", str(configs), "--schema", str(schema), "--jobs", "2"])
+    assert result.exit_code == 1
+    assert "bad.json: mode: expected one of ['dev', 'prod']" in result.output
+    assert "bad.json: services: expected array, got integer" in result.output
+    assert "1 of 2 files valid" in result.output
@@ -0,0 +1,89 @@
+import datetime
+import os
+import pytest
+from click.testing import CliRunner
+from confidante.cli import main
+from confidante.core import Confidante
+from confidante.lazy import LazyMapping
+from confidante.loaders.snapshot_loader import SnapshotLoader, compile_snapshot, is_fresh
+from confidante.loaders.yaml_loader import YamlLoader
+
+YAML = """
+app:
+  name: demo
+  started: 2024-05-01 10:30:00
+  hosts: [a, b]
+  db:
+    pool: {size: 5}
+    password: ENC::token
+other:
+  items:
+    - {when: 2024-01-02, n: 1}
+"""
+
+@pytest.fixture
+def source(tmp_path):
+    p = tmp_path / "config.yaml"
+    p.write_text(YAML, encoding="utf-8")
+    return p
+
+def test_snapshot_roundtrip(source):
+    snapshot = compile_snapshot(YamlLoader().load(str(source)), str(source))
+    data = SnapshotLoader().load(snapshot)
+    assert isinstance(data, LazyMapping)
+    assert data.to_dict() == YamlLoader().load(str(source))
+    assert data["app"]["started"] == datetime.datetime(2024, 5, 1, 10, 30)
+    assert data["other"]["items"][0]["when"] == datetime.date(2024, 1, 2)
+
+def test_snapshot_decodes_only_accessed_mappings(source):
+    data = SnapshotLoader().load(compile_snapshot(YamlLoader().load(str(source)), str(source)))
+    assert data["app"]["db"]["pool"]["size"] == 5
+    assert list(data._values) == ["app"]
+    assert "other" not in data._values
+
+def test_load_uses_fresh_snapshot(source, monkeypatch):
+    runner = CliRunner()
+    result = runner.invoke(main, ["compile", str(source)])
+    assert result.exit_code == 0
+    monkeypatch.setattr(YamlLoader, "load", lambda self, path: pytest.fail("parsed the source"))
+    conf = Confidante.load(str(source))
+    assert conf.config.app.db.pool.size == 5
+    assert conf.config.app.hosts == ["a", "b"]
+
+def test_stale_snapshot_ignored(source):
+    snapshot = compile_snapshot(YamlLoader().load(str(source)), str(source))
+    source.write_text(YAML.replace("demo", "changed"), encoding="utf-8")
+    assert not is_fresh(snapshot, str(source))
+    assert Confidante.load(str(source)).config.app.name == "changed"
+
+def test_corrupt_snapshot_falls_back_to_source(source):
+    snapshot = compile_snapshot(YamlLoader().load(str(source)), str(source))
+    with open(snapshot, "r+b") as f:
+        f.seek(os.path.getsize(snapshot) - 8)
+        f.write(b"\xff" * 8)
+    assert is_fresh(snapshot, str(source))
+    assert Confidante.load(str(source)).config.app.name == "demo"
+
+def test_sources_sharing_a_stem_get_their_own_snapshots(tmp_path):
+    json_path, yaml_path = tmp_path / "c.json", tmp_path / "c.yaml"
+    json_path.write_text('{"a": 1}', encoding="utf-8")
+    yaml_path.write_text("a: 22222", encoding="utf-8")
+    # Same size and mtime, as after touch -r or a checkout.
+    st = os.stat(json_path)
+    os.utime(yaml_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    compile_snapshot({"a": 1}, str(json_path))
+    assert Confidante.load(str(yaml_path)).config.a == 22222
+    assert Confidante.load(str(json_path)).config.a == 1
+
+def test_touched_source_still_fresh(source):
+    snapshot = compile_snapshot(YamlLoader().load(str(source)), str(source))
+    st = os.stat(source)
+    os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    assert is_fresh(snapshot, str(source))
+
+def test_save_after_snapshot_load_writes_source(source):
+    compile_snapshot(YamlLoader().load(str(source)), str(source))
+    conf = Confidante.load(str(source))
+    conf._set_nested_value(["app", "name"], "saved")
+    conf.save()
+    assert YamlLoader().load(str(source))["app"]["name"] == "saved"
@@ -0,0 +1,73 @@
+import json
+import sys
+import threading
+import time
+import pytest
+from confidante.core import Confidante
+from confidante.watch import diff_trees
+
+def test_diff_trees():
+    old = {"a": 1, "b": {"c": 2, "d": [1, 2]}, "gone": True}
+    new = {"a": 1, "b": {"c": 3, "d": [1, 2, 3]}, "added": {"x": 1}}
+    assert diff_trees(old, new) == ["added", "b.c", "b.d", "gone"]
+    assert diff_trees(old, dict(old)) == []
+
+def test_reload_swaps_tree(tmp_path):
+    p = tmp_path / "config.json"
+    p.write_text(json.dumps({"db": {"host": "a", "port": 1}}), encoding="utf-8")
+    conf = Confidante.load(str(p))
+    accessor = conf.config
+    p.write_text(json.dumps({"db": {"host": "b", "port": 1}}), encoding="utf-8")
+    assert conf.reload() == ["db.host"]
+    assert conf.config.db.host == "b"
+    assert accessor.db.host == "a"
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_watch_calls_on_change(tmp_path, use_inotify):
+    p = tmp_path / "config.json"
+    p.write_text(json.dumps({"level": "info"}), encoding="utf-8")
+    seen = []
+    changed = threading.Event()
+
+    def on_change(conf, paths):
+        seen.append((conf.config.level, paths))
+        changed.set()
+
+    conf = Confidante.watch(str(p), on_change=on_change, debounce=0.05,
+        poll_interval=0.05, use_inotify=use_inotify)
+    try:
+        # Replace the file the way editors do: write elsewhere, then rename.
+        tmp = tmp_path / "config.json.tmp"
+        tmp.write_text(json.dumps({"level": "debug"}), encoding="utf-8")
+        tmp.replace(p)
+        assert changed.wait(5)
+    finally:
+        conf.stop_watching()
+    assert seen == [("debug", ["level"])]
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+def test_watch_ignores_other_files(tmp_path):
+    p = tmp_path / "config.json"
+    p.write_text(json.dumps({"level": "info"}), encoding="utf-8")
+    log = tmp_path / "app.log"
+    changed = threading.Event()
+    conf = Confidante.watch(str(p), on_change=lambda conf, paths: changed.set(), debounce=0.05,
+        poll_interval=0.05, use_inotify=True)
+    stop = threading.Event()
+
+    def noise():
+        while not stop.is_set():
+            with open(log, "a") as f:
+                f.write("x\n")
+            time.sleep(0.01)
+    writer = threading.Thread(target=noise)
+    writer.start()
+    try:
+        time.sleep(0.1)
+        p.write_text(json.dumps({"level": "debug"}), encoding="utf-8")
+        assert changed.wait(2)
+    finally:
+        stop.set()
+        writer.join()
+        conf.stop_watching()
+    assert conf.config.level == "debug"
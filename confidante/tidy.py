@@ -1,9 +1,11 @@
 
 from typing import Any
 
+from .lazy import LazyMapping
+
 def tidy_data(data: Any) -> Any:
     # For JSON, just ensure sorted keys
-    if isinstance(data, dict):
+    if isinstance(data, (dict, LazyMapping)):
         # Sort keys recursively
         return {k: tidy_data(data[k]) for k in sorted(data.keys())}
     elif isinstance(data, list):
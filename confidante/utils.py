@@ -1,23 +1,172 @@
-from typing import Any
+from __future__ import annotations
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+from .lazy import LazyMapping
+
+_MISSING = object()
+# Values handed to an accessor's decrypt callable: ciphertexts and references.
+SECRET_PREFIXES = ("ENC::", "REF::")
 
 class ConfigAccessor:
     """
     Allows both dot notation and dict notation access.
+
+    When a ``decrypt`` callable is given, ``ENC::`` values (and ``REF::``
+    secret references) are passed through it each time they are read, so
+    secrets are decrypted on first use instead of when the configuration is
+    unlocked.
+    Accessors for nested mappings are created once and reused.
     """
-    def __init__(self, data: dict[str, Any]):
+    __slots__ = ("_data", "_decrypt", "_children")
+
+    def __init__(self, data: dict[str, Any], decrypt: Optional[Callable[[str], str]] = None):
         # Store a direct reference
         self._data = data
+        self._decrypt = decrypt
+        self._children: dict[str, ConfigAccessor] = {}
 
-    def __getattr__(self, item):
-        if item in self._data and isinstance(self._data[item], dict):
-            return ConfigAccessor(self._data[item])
-        elif item in self._data:
-            return self._data[item]
-        else:
-            raise AttributeError(f"No such configuration key: {item}")
+    def __getattribute__(self, item):
+        # Keys are looked up directly instead of after a failed normal lookup,
+        # as __getattr__ would; names the class defines still come first.
+        if item in _CLASS_NAMES:
+            return object.__getattribute__(self, item)
+        try:
+            val = _get_data(self)[item]
+        except KeyError:
+            raise AttributeError(f"No such configuration key: {item}") from None
+        return _wrap(self, item, val)
 
     def __getitem__(self, item):
-        val = self._data[item]
-        if isinstance(val, dict):
-            return ConfigAccessor(val)
+        return _wrap(self, item, _get_data(self)[item])
+
+    def _value(self, val: Any) -> Any:
+        if isinstance(val, (dict, LazyMapping)):
+            return ConfigAccessor(val, self._decrypt)
+        if self._decrypt is not None:
+            if isinstance(val, str) and val.startswith(SECRET_PREFIXES):
+                return self._decrypt(val)
+            if isinstance(val, list):
+                return _decrypt_items(val, self._decrypt)
+        return val
+
+    def get(self, path: str, default: Any = None) -> Any:
+        """Look up a dotted path such as ``"db.pool.size"``; list indexes are numbers."""
+        try:
+            return self._value(_walk(self._data, split_path(path)))
+        except (KeyError, IndexError, TypeError):
+            return default
+
+    def compile_path(self, path: str, default: Any = _MISSING) -> Callable[[], Any]:
+        """
+        Return a getter that resolves ``path`` against this accessor in a
+        single call. Missing keys return ``default``, or raise ``KeyError``
+        when no default is given.
+        """
+        keys = split_path(path)
+        data = self._data
+        value = self._value
+
+        def getter() -> Any:
+            try:
+                return value(_walk(data, keys))
+            except (KeyError, IndexError, TypeError):
+                if default is _MISSING:
+                    raise KeyError(path) from None
+                return default
+        return getter
+
+# Slot readers, which skip ConfigAccessor.__getattribute__.
+_CLASS_NAMES = frozenset(dir(ConfigAccessor))
+_get_data = ConfigAccessor._data.__get__
+_get_children = ConfigAccessor._children.__get__
+_get_decrypt = ConfigAccessor._decrypt.__get__
+
+def _wrap(accessor: ConfigAccessor, item: str, val: Any) -> Any:
+    if isinstance(val, (dict, LazyMapping)):
+        children = _get_children(accessor)
+        child = children.get(item)
+        # The identity check drops a cached child whose mapping was replaced.
+        if child is None or _get_data(child) is not val:
+            child = children[item] = ConfigAccessor(val, _get_decrypt(accessor))
+        return child
+    if _get_decrypt(accessor) is None:
         return val
+    return ConfigAccessor._value(accessor, val)
+
+def _walk(node: Any, keys: tuple[tuple[str, Optional[int]], ...]) -> Any:
+    for key, index in keys:
+        node = node[index] if index is not None and isinstance(node, list) else node[key]
+    return node
+
+@lru_cache(maxsize=1024)
+def split_path(path: str) -> tuple[tuple[str, Optional[int]], ...]:
+    # Each segment is kept as a key and, when numeric, as a list index.
+    return tuple((k, int(k) if k.isdigit() else None) for k in path.split("."))
+
+def _decrypt_items(data: Any, decrypt: Callable[[str], str]) -> Any:
+    # Lists are returned as plain values, so their secrets are resolved up front.
+    if isinstance(data, (dict, LazyMapping)):
+        return {k: _decrypt_items(v, decrypt) for k, v in data.items()}
+    elif isinstance(data, list):
+        return [_decrypt_items(i, decrypt) for i in data]
+    elif isinstance(data, str) and data.startswith(SECRET_PREFIXES):
+        return decrypt(data)
+    return data
+
+def deep_merge(base: Any, overlay: Any) -> Any:
+    """
+    Merge ``overlay`` into ``base`` without modifying either. Only the mappings
+    along the overlay's paths are copied; every other subtree is shared with
+    the inputs, which must therefore be treated as immutable.
+    """
+    if not isinstance(base, (dict, LazyMapping)) or not isinstance(overlay, (dict, LazyMapping)):
+        return overlay
+    if not overlay:
+        return base
+    if not base:
+        return overlay
+    result = dict(base)
+    for k, v in overlay.items():
+        result[k] = deep_merge(result[k], v) if k in result else v
+    return result
+
+def collect_encrypted(data: Any, leaves: list[tuple[Any, Any, str]], prefix: str = "ENC::") -> None:
+    # Append (container, key, ciphertext) for every ENC:: (or other prefix)
+    # leaf under data; the prefix is stripped from the value.
+    if isinstance(data, (dict, LazyMapping)):
+        items = data.items()
+    elif isinstance(data, list):
+        items = enumerate(data)
+    else:
+        return
+    for k, v in items:
+        if isinstance(v, str):
+            if v.startswith(prefix):
+                leaves.append((data, k, v[len(prefix):]))
+        else:
+            collect_encrypted(v, leaves, prefix)
+
+def replace_encrypted(data: Any, plaintexts: dict[str, str]) -> Any:
+    # Copy of data with ENC:: leaves replaced by plaintexts[ciphertext];
+    # containers without ENC:: leaves are returned as they are.
+    if isinstance(data, (dict, LazyMapping)):
+        items = data.items()
+    elif isinstance(data, list):
+        items = enumerate(data)
+    else:
+        return data
+    copy = None
+    for k, v in items:
+        if isinstance(v, str):
+            if not v.startswith("ENC::"):
+                continue
+            new = plaintexts[v[len("ENC::"):]]
+        else:
+            new = replace_encrypted(v, plaintexts)
+            if new is v:
+                continue
+        if copy is None:
+            copy = list(data) if isinstance(data, list) else dict(data)
+        copy[k] = new
+    return data if copy is None else copy
@@ -0,0 +1,178 @@
+from __future__ import annotations
+import os
+import select
+import struct
+import sys
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from .lazy import LazyMapping
+
+if TYPE_CHECKING:
+    from .core import Confidante
+
+ChangeCallback = Callable[["Confidante", list[str]], None]
+
+def diff_trees(old: Any, new: Any, prefix: str = "") -> list[str]:
+    """Return the dotted paths of leaves added, removed or changed between two trees."""
+    if isinstance(old, (dict, LazyMapping)) and isinstance(new, (dict, LazyMapping)):
+        changed = []
+        for k in old.keys() | new.keys():
+            path = f"{prefix}.{k}" if prefix else str(k)
+            if k not in old or k not in new:
+                changed.append(path)
+            elif old[k] is not new[k] and old[k] != new[k]:
+                changed.extend(diff_trees(old[k], new[k], path))
+        return sorted(changed)
+    return [] if old == new else [prefix]
+
+def _stamp(path: str) -> Optional[tuple[int, int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+class _Inotify:
+    # Minimal ctypes binding; editors and orchestrators usually replace files
+    # by renaming, so the containing directory is watched.
+    IN_MODIFY = 0x002
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, directory: str, name: str):
+        # ctypes.util pulls in subprocess; only pay for it when watching.
+        import ctypes
+        import ctypes.util
+        self.name = os.fsencode(name)
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE | self.IN_DELETE
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, f"inotify_add_watch failed for {directory}")
+
+    def wait(self, timeout: float) -> bool:
+        # True if an event for the watched file arrived within the timeout.
+        # Events for other files in the directory return False early.
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        return bool(ready) and self.read()
+
+    def read(self) -> bool:
+        # Drain the queue; True if any event named the watched file.
+        found = False
+        try:
+            while True:
+                buf = os.read(self.fd, 64 * 1024)
+                if not buf:
+                    break
+                pos = 0
+                while pos + self._EVENT.size <= len(buf):
+                    _, _, _, length = self._EVENT.unpack_from(buf, pos)
+                    pos += self._EVENT.size
+                    # The name is NUL-padded to ``length`` bytes.
+                    found = found or buf[pos:pos + length].rstrip(b"\0") == self.name
+                    pos += length
+        except BlockingIOError:
+            pass
+        return found
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+class ConfigWatcher:
+    """
+    Reloads a ``Confidante`` when its file changes.
+
+    inotify is used on Linux and stat polling elsewhere (or when inotify is
+    unavailable). Bursts of writes are collapsed until the file has been quiet
+    for ``debounce`` seconds. The new tree is fully parsed (and decrypted, for
+    eagerly unlocked configs) before it is swapped in, and ``on_change`` is
+    called with the dotted paths that changed.
+    """
+    def __init__(self, config: Confidante, on_change: Optional[ChangeCallback] = None,
+            debounce: float = 0.1, poll_interval: float = 1.0, use_inotify: Optional[bool] = None,
+            on_error: Optional[Callable[[Exception], None]] = None):
+        self._config = config
+        self._path = os.path.abspath(config._path)
+        self._on_change = on_change
+        self._on_error = on_error
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._inotify: Optional[_Inotify] = None
+        if use_inotify is None:
+            use_inotify = sys.platform.startswith("linux")
+        if use_inotify:
+            try:
+                self._inotify = _Inotify(*os.path.split(self._path))
+            except (OSError, AttributeError):
+                self._inotify = None
+        self._stamp = _stamp(self._path)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="confidante-watch", daemon=True)
+
+    @property
+    def backend(self) -> str:
+        return "inotify" if self._inotify is not None else "polling"
+
+    def start(self) -> ConfigWatcher:
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def _wait(self, timeout: float) -> bool:
+        if self._inotify is not None:
+            return self._inotify.wait(timeout)
+        self._stop.wait(timeout)
+        return _stamp(self._path) != self._stamp
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if not self._wait(self.poll_interval):
+                continue
+            # Debounce: wait until the file stops changing.
+            while not self._stop.is_set() and self._settle():
+                pass
+            if not self._stop.is_set():
+                self.check()
+
+    def _settle(self) -> bool:
+        # Settled once the file's own stamp holds for ``debounce``, whatever
+        # else happens in its directory.
+        before = _stamp(self._path)
+        self._stop.wait(self.debounce)
+        if self._inotify is not None:
+            self._inotify.read()
+        return _stamp(self._path) != before
+
+    def check(self) -> list[str]:
+        """Reload now if the file changed on disk; return the changed paths."""
+        stamp = _stamp(self._path)
+        if stamp is None or stamp == self._stamp:
+            return []
+        try:
+            changed = self._config.reload()
+        except Exception as e:
+            # Keep serving the previous tree, e.g. if the file is mid-write.
+            if self._on_error is not None:
+                self._on_error(e)
+            return []
+        self._stamp = stamp
+        if changed and self._on_change is not None:
+            self._on_change(self._config, changed)
+        return changed